@@ -7,12 +7,15 @@ import logging
 # Load environment variables from .env file
 load_dotenv()
 
+# Fields of localaccounts read by the projection engines
+ACCOUNT_FIELDS = {"_id": 1, "budgetId": 1, "name": 1, "balance": 1}
+
 def get_accounts_for_budget(budget_id):
     query = {
         "budgetId": budget_id
     }
-    # Execute the query and retrieve categories from localcategories
-    accounts = get_DB().localaccounts.find(query)
+    # Execute the query and retrieve accounts from localaccounts
+    accounts = get_DB().localaccounts.find(query, ACCOUNT_FIELDS)
     account_list = []
     for account in accounts:
         account_list.append(convert_objectid_to_str(account))
@@ -1,17 +1,28 @@
 import os
+import hmac
 import itertools
+from datetime import date
+from collections import OrderedDict
 from flask import Flask, jsonify, request, render_template
-from .ynab_api import get_scheduled_transactions
-from .categories_api import get_categories_for_budget
-from .budget_api import get_objectid_for_budget
-from .accounts_api import get_accounts_for_budget
-from .prediction_api import project_daily_balances_with_reasons
+from .ynab_api import circuit_breaker
+from .prediction_inputs import PredictionInputs, InputLoadError
+from .prediction_cache import get_prediction_cache, result_key, fingerprint, CACHE_INVALIDATION_TOKEN
+from .simulation_registry import get_simulation_registry, BASELINE_SCENARIO
+from .simulation_store import parse_simulation_ids, get_budget_simulations, load_stored_scenarios
+from .prediction_api import project_daily_balances_with_reasons, MAX_DAYS_AHEAD
+from .projection_engine import iter_scenarios, project_scenarios
+from .baseline_cache import get_baseline_ledger
+from .streaming import stream_projections, STREAM_FORMATS
+from .columnar import to_columnar
+from .json_provider import configure_json_provider
+from .http_caching import init_compression, not_modified, set_validators
+from .forecast_distribution import simulate_balance_distribution, validate_distribution_size, DEFAULT_PATHS
 import logging
 import json
 from flask_cors import CORS
 from dotenv import load_dotenv
-from app.auth import requires_auth
-from app.models import get_user_from_request, get_budget
+from app.auth import requires_auth, get_token_cache
+from app.models import get_user_from_request, budget_belongs_to_user
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +32,11 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+configure_json_provider(app)
+init_compression(app)
+
+# Projection engine: "vectorized" (day-offset arrays) or "reference" (dict per day)
+PREDICTION_ENGINE = os.getenv('PREDICTION_ENGINE', 'vectorized')
 
 # Setup CORS
 CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -34,24 +50,104 @@ CORS(app, resources={
 })
 
 def load_simulations_folder(folder_name="simulations"):
-    """Load all simulations from a folder containing JSON files."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    folder_path = os.path.join(base_dir, folder_name)
-
-    simulations = {"Actual Balance": None}  # Treat the baseline as a default simulation
-    if not os.path.exists(folder_path):
-        logging.warning(f"Simulation folder not found: {folder_path}")
-        return simulations
-
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith('.json'):
-            file_path = os.path.join(folder_path, file_name)
-            try:
-                with open(file_path, "r") as file:
-                    simulations[file_name] = json.load(file)
-            except Exception as e:
-                logging.warning(f"Failed to load simulation file {file_name}: {str(e)}")
-    return simulations
+    """Load all simulations from the folder registry, parsed once and reloaded when a file changes."""
+    return get_simulation_registry(folder_name).scenarios()
+
+def select_scenarios(budget_uuid, budget_id, categories, days_ahead, simulation_ids=None):
+    """
+    Collect the scenarios to project: the baseline plus the selected simulations.
+
+    Without simulation_ids all simulation files and the budget's active stored
+    simulations are used. simulation_ids is a comma separated list of stored
+    simulation ids and/or simulation file names; only those are projected.
+    Stored simulations come from the prediction cache when possible, so
+    repeated requests do not query MongoDB.
+
+    Returns:
+        Tuple of (scenario version for cache keys, OrderedDict of scenarios)
+    """
+    stored_ids, file_names = parse_simulation_ids(simulation_ids)
+    registry_version, file_scenarios = get_simulation_registry().snapshot()
+
+    scenarios = OrderedDict([(BASELINE_SCENARIO, None)])
+    if file_names is None:
+        scenarios.update(file_scenarios)
+    else:
+        for name in file_names:
+            if name in file_scenarios:
+                scenarios[name] = file_scenarios[name]
+    selected_files = list(scenarios)
+    stored = get_budget_simulations(budget_uuid, budget_id, stored_ids)
+    load_stored_scenarios(stored["simulations"], categories, days_ahead, scenarios)
+
+    return f"{registry_version}-{fingerprint([selected_files, stored['version']])}", scenarios
+
+def project_simulations(accounts, categories, future_transactions, days_ahead, simulations, baseline_ledger=None):
+    """Project the baseline and every simulation, leaving out the ones that fail."""
+    if PREDICTION_ENGINE != 'reference':
+        # Baseline is computed once, simulations are overlaid on it
+        return project_scenarios(accounts, categories, future_transactions, days_ahead, simulations,
+                                 baseline_ledger=baseline_ledger)
+
+    return dict(iter_simulation_projections(accounts, categories, future_transactions, days_ahead, simulations))
+
+def iter_simulation_projections(accounts, categories, future_transactions, days_ahead, simulations,
+                                baseline_ledger=None):
+    """Yield (name, projection) per simulation as it is computed, leaving out the ones that fail."""
+    if PREDICTION_ENGINE != 'reference':
+        yield from iter_scenarios(accounts, categories, future_transactions, days_ahead, simulations,
+                                  baseline_ledger=baseline_ledger)
+        return
+
+    for simulation_name, simulation_data in simulations.items():
+        try:
+            projection = project_daily_balances_with_reasons(
+                accounts, categories, future_transactions, days_ahead, simulation_data
+            )
+        except Exception as e:
+            logger.warning(f"Error processing simulation '{simulation_name}': {str(e)}")
+            continue
+        yield simulation_name, projection
+
+def cached_baseline_ledger(budget_uuid, inputs, loading, days_ahead, today):
+    """
+    Baseline ledger of the vectorized engine, kept across requests and rolled to the next day.
+
+    Returns None for the reference engine or when the baseline fails, the
+    engine then builds (and reports) the baseline itself.
+    """
+    if PREDICTION_ENGINE == 'reference':
+        return None
+    try:
+        return get_baseline_ledger(budget_uuid, inputs, loading.future_transactions(),
+                                   loading.future_transactions_version(), days_ahead, today)
+    except InputLoadError:
+        raise
+    except Exception as e:
+        logger.warning(f"Error loading cached baseline projection: {str(e)}")
+        return None
+
+def days_ahead_param(default, minimum=0):
+    """
+    Read the days_ahead query parameter.
+
+    Raises:
+        ValueError: When it is not an integer between minimum and MAX_DAYS_AHEAD
+    """
+    value = request.args.get('days_ahead')
+    try:
+        days_ahead = int(value) if value is not None else default
+    except ValueError:
+        raise ValueError("days_ahead must be an integer")
+    if not minimum <= days_ahead <= MAX_DAYS_AHEAD:
+        raise ValueError(f"days_ahead must be between {minimum} and {MAX_DAYS_AHEAD}")
+    return days_ahead
+
+def upstream_error_response(error):
+    """Answer a request whose MongoDB or YNAB inputs could not be loaded: 504 on timeouts, 502 otherwise."""
+    logger.error(f"Error loading prediction inputs from {error.source}: {str(error)}")
+    status = 504 if error.timed_out else 502
+    return jsonify({"message": f"Upstream {error.source} unavailable", "source": error.source}), status
 
 def generate_unique_colors():
     """Generate unique colors for the plots."""
@@ -70,48 +166,43 @@ def balance_prediction_interactive():
     # Step 2: Load simulations from folder
     simulations = load_simulations_folder()
     # Handle optional days_ahead parameter
-    days_ahead_param = request.args.get('days_ahead')
     try:
-        days_ahead = int(days_ahead_param) if days_ahead_param is not None else 300
-    except ValueError:
-        return "Invalid days_ahead query parameter, it must be an integer.", 400
+        days_ahead = days_ahead_param(300)
+    except ValueError as e:
+        return f"Invalid days_ahead query parameter, {str(e)}.", 400
 
     # Step 3: Fetch required data
     try:
-        budget_id = get_objectid_for_budget(budget_uuid)
-        future_transactions = get_scheduled_transactions(budget_uuid)
-        categories = get_categories_for_budget(budget_id)
-        accounts = get_accounts_for_budget(budget_id)
+        loading = PredictionInputs(budget_uuid)
+        inputs = loading.budget_inputs()
+        if not inputs:
+            return "Budget not found", 404
+        future_transactions = loading.future_transactions()
+        categories = inputs["categories"]
+        accounts = inputs["accounts"]
     except Exception as e:
         return f"Error fetching data: {str(e)}", 500
 
     # Step 4: Generate plot data for the baseline and all simulations
     plot_data = []
     color_generator = generate_unique_colors()
-    for simulation_name, simulation_data in simulations.items():
-        try:
-            # Get projected balances with raw numeric data
-            projected_balances = project_daily_balances_with_reasons(
-                accounts, categories, future_transactions, days_ahead, simulation_data
-            )
-        except Exception as e:
-            logging.warning(f"Error processing simulation '{simulation_name}': {str(e)}")
-            continue
-
+    # Get projected balances with raw numeric data
+    projections = project_simulations(accounts, categories, future_transactions, days_ahead, simulations)
+    for simulation_name, projected_balances in projections.items():
         # Prepare data for the plot
         dates = list(projected_balances.keys())
-        balances = [projected_balances[date]["balance"] for date in dates]  # Raw numbers
+        balances = [projected_balances[day]["balance"] for day in dates]  # Raw numbers
         hover_texts = []
 
         # Calculate hover text for each date
-        for i, date in enumerate(dates):
-            day_data = projected_balances[date]
+        for day in dates:
+            day_data = projected_balances[day]
             balance = day_data["balance"]  # Raw balance
             balance_diff = day_data.get("balance_diff", 0)  # Raw difference
             changes = day_data["changes"]
 
             # Format numbers for presentation
-            hover_text = f"Date: {date}<br>Balance: {balance:.2f}€<br>Balance Difference: {balance_diff:.2f}€"
+            hover_text = f"Date: {day}<br>Balance: {balance:.2f}€<br>Balance Difference: {balance_diff:.2f}€"
             if changes:
                 hover_text += "<br>Changes:"
                 for change in changes:
@@ -153,16 +244,25 @@ def get_prediction():
         if not budget_uuid:
             return jsonify({"message": "No budget_id provided"}), 400
 
-        days_ahead = int(request.args.get('days_ahead', 300))
-
-        # First get the MongoDB ObjectId for the budget
-        budget_id = get_objectid_for_budget(budget_uuid)
-        if not budget_id:
+        days_ahead = days_ahead_param(300)
+        stream_format = request.args.get('stream')
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({"message": f"stream must be one of {', '.join(STREAM_FORMATS)}"}), 400
+        response_format = request.args.get('format', 'nested')
+        if response_format not in ('nested', 'columnar'):
+            return jsonify({"message": "format must be nested or columnar"}), 400
+        if response_format == 'columnar' and stream_format:
+            return jsonify({"message": "format=columnar cannot be streamed"}), 400
+
+        # Start loading the scheduled transactions from YNAB while the budget, its categories
+        # and accounts are read in one round trip (both served from the cache when possible)
+        loading = PredictionInputs(budget_uuid)
+        inputs = loading.budget_inputs()
+        if not inputs:
             return jsonify({"message": "Budget not found"}), 404
 
-        # Then get the full budget document and verify ownership
-        budget = get_budget(budget_uuid, user)
-        if not budget:
+        # Verify ownership
+        if not budget_belongs_to_user(inputs["budget"], user):
             return jsonify({"message": "Budget not found or access denied"}), 404
 
         # Get YNAB connection details
@@ -170,39 +270,141 @@ def get_prediction():
         if not ynab_connection:
             return jsonify({"message": "No YNAB connection"}), 400
 
-        # Load simulations
-        simulations = load_simulations_folder()
+        # Load the requested simulations (files and stored simulations of the budget)
+        simulations_version, simulations = select_scenarios(
+            budget_uuid, inputs["budget"]["_id"], inputs["categories"], days_ahead, request.args.get('simulation_ids')
+        )
+
+        cache = get_prediction_cache()
+        today = date.today()
+        # The cached result and the ETag depend on the same inputs, so a fresh ETag never labels a stale body
+        inputs_version = fingerprint([inputs["version"], loading.future_transactions_version(), simulations_version])
+        cache_key = result_key(budget_uuid, "projection", days_ahead, today.isoformat(), PREDICTION_ENGINE,
+                               inputs_version)
+
+        # The ETag only depends on the inputs, so an unchanged prediction is answered without projecting
+        etag = fingerprint([inputs_version, days_ahead, today.isoformat(), PREDICTION_ENGINE, response_format,
+                            stream_format])
+        unchanged = not_modified(request.if_none_match, etag)
+        if unchanged is not None:
+            return unchanged
+
+        if stream_format:
+            # Send every scenario as soon as it is computed instead of building the whole response
+            results = cache.get(cache_key)
+            if results is not None:
+                return set_validators(stream_projections(results.items(), stream_format), etag)
+            projections = iter_simulation_projections(
+                inputs["accounts"], inputs["categories"], loading.future_transactions(), days_ahead, simulations,
+                cached_baseline_ledger(budget_uuid, inputs, loading, days_ahead, today)
+            )
+            return set_validators(stream_projections(projections, stream_format), etag)
+
+        # Process each simulation and collect results, reusing a finished projection of today
+        results = cache.get_or_load(
+            cache_key,
+            lambda: project_simulations(
+                inputs["accounts"], inputs["categories"], loading.future_transactions(), days_ahead, simulations,
+                cached_baseline_ledger(budget_uuid, inputs, loading, days_ahead, today)
+            )
+        )
 
-        # Fetch required data
-        future_transactions = get_scheduled_transactions(budget_uuid)
-        categories = get_categories_for_budget(budget_id)
-        accounts = get_accounts_for_budget(budget_id)
+        if response_format == 'columnar':
+            return set_validators(jsonify(to_columnar(results, today)), etag)
+        return set_validators(jsonify(results), etag)
 
-        # Process each simulation and collect results
-        results = {}
-        for simulation_name, simulation_data in simulations.items():
-            try:
-                projected_balances = project_daily_balances_with_reasons(
-                    accounts, categories, future_transactions, days_ahead, simulation_data
-                )
-                results[simulation_name] = projected_balances
-            except Exception as e:
-                logger.warning(f"Error processing simulation '{simulation_name}': {str(e)}")
-                continue
+    except ValueError as e:
+        logger.warning(f"Invalid input: {str(e)}")
+        return jsonify({"message": str(e)}), 400
+    except InputLoadError as e:
+        return upstream_error_response(e)
+    except Exception as e:
+        logger.error(f"Error generating prediction: {str(e)}")
+        return jsonify({"message": "Internal server error"}), 500
+
+@app.route('/balance-prediction/distribution')
+@requires_auth
+def get_prediction_distribution():
+    """Get Monte Carlo percentile bands of the balance prediction for a budget."""
+    try:
+        user = get_user_from_request(request)
+        if not user:
+            return jsonify({"message": "User not found"}), 401
+
+        budget_uuid = request.args.get('budget_id')
+        if not budget_uuid:
+            return jsonify({"message": "No budget_id provided"}), 400
+
+        days_ahead = days_ahead_param(365, minimum=1)
+        paths = int(request.args.get('paths', DEFAULT_PATHS))
+        seed = request.args.get('seed')
+        seed = int(seed) if seed is not None else None
+        validate_distribution_size(days_ahead, paths)
+
+        loading = PredictionInputs(budget_uuid)
+        inputs = loading.budget_inputs()
+        if not inputs:
+            return jsonify({"message": "Budget not found"}), 404
+
+        if not budget_belongs_to_user(inputs["budget"], user):
+            return jsonify({"message": "Budget not found or access denied"}), 404
 
-        return jsonify(results)
+        ynab_connection = user.get('ynab', {}).get('connection', {})
+        if not ynab_connection:
+            return jsonify({"message": "No YNAB connection"}), 400
+
+        future_transactions = loading.future_transactions()
+        categories = inputs["categories"]
+        accounts = inputs["accounts"]
+
+        distribution = simulate_balance_distribution(
+            accounts, categories, future_transactions, days_ahead, paths, seed
+        )
+
+        return jsonify(distribution)
 
     except ValueError as e:
         logger.warning(f"Invalid input: {str(e)}")
         return jsonify({"message": str(e)}), 400
+    except InputLoadError as e:
+        return upstream_error_response(e)
     except Exception as e:
-        logger.error(f"Error generating prediction: {str(e)}")
+        logger.error(f"Error generating prediction distribution: {str(e)}")
         return jsonify({"message": "Internal server error"}), 500
 
 @app.route('/health')
 def health_check():
     """Health check endpoint."""
-    return jsonify({"status": "healthy"})
+    return jsonify({
+        "status": "healthy",
+        "token_cache": get_token_cache().stats(),
+        "ynab_circuit": circuit_breaker.state,
+        "prediction_cache": get_prediction_cache().stats()
+    })
+
+@app.route('/cache/invalidate', methods=['POST'])
+def invalidate_cache():
+    """
+    Drop cached prediction inputs and results.
+
+    Called by the sync job after it updated MongoDB. The body selects what to drop:
+    {"budget_id": ...} for one budget, {"auth_id": ...} for one user, nothing for everything.
+    """
+    if not CACHE_INVALIDATION_TOKEN:
+        return jsonify({"message": "Cache invalidation is not configured"}), 403
+    token = request.headers.get('X-Cache-Token', '')
+    if not hmac.compare_digest(token.encode(), CACHE_INVALIDATION_TOKEN.encode()):
+        return jsonify({"message": "Invalid cache token"}), 401
+
+    body = request.get_json(silent=True) or {}
+    cache = get_prediction_cache()
+    if body.get('budget_id'):
+        removed = cache.invalidate_budget(body['budget_id'])
+    elif body.get('auth_id'):
+        removed = cache.invalidate_user(body['auth_id'])
+    else:
+        removed = cache.invalidate_prefix()
+    return jsonify({"invalidated": removed})
 
 # Scheduled transactions endpoint migrated to Node.js API
 
@@ -222,4 +424,5 @@ def health_check():
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # Development server only, production runs under gunicorn (see gunicorn.conf.py)
+    app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_DEBUG', '1') == '1')
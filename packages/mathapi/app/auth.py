@@ -1,21 +1,204 @@
 from functools import wraps
+from collections import OrderedDict
 from flask import request, jsonify, current_app
 import jwt
 from jwt.algorithms import RSAAlgorithm
 import requests
+import threading
+import hashlib
+import logging
+import time
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_auth0_public_key():
-    """Fetch Auth0 public key from JWKS endpoint."""
-    domain = os.getenv('AUTH0_DOMAIN')
-    jwks_url = f"https://{domain}/.well-known/jwks.json"
-    jwks = requests.get(jwks_url).json()
-    # Get the first key (usually there's only one)
-    public_key = RSAAlgorithm.from_jwk(jwks['keys'][0])
-    return public_key
+logger = logging.getLogger(__name__)
+
+# JWKS cache configuration (seconds)
+JWKS_CACHE_TTL = float(os.getenv('JWKS_CACHE_TTL', 3600))
+JWKS_MAX_STALE = float(os.getenv('JWKS_MAX_STALE', 86400))
+JWKS_MIN_REFETCH_INTERVAL = float(os.getenv('JWKS_MIN_REFETCH_INTERVAL', 30))
+JWKS_FETCH_TIMEOUT = float(os.getenv('JWKS_FETCH_TIMEOUT', 5))
+# Maximum number of verified tokens kept in memory (0 disables the cache)
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 1024))
+
+
+class JWKSCache:
+    """
+    Cache of the public signing keys of a JWKS endpoint, keyed by `kid`.
+
+    - Keys are fetched once and reused for `ttl` seconds.
+    - After the TTL the cached keys keep being served while a background
+      thread refreshes them (stale-while-revalidate).
+    - If a refresh fails, the stale keys are used for up to `max_stale` seconds.
+    - An unknown `kid` triggers a synchronous refetch, at most once every
+      `min_refetch_interval` seconds, so tokens with random kids cannot
+      hammer the endpoint.
+    """
+
+    def __init__(self, jwks_url, ttl=JWKS_CACHE_TTL, max_stale=JWKS_MAX_STALE,
+                 min_refetch_interval=JWKS_MIN_REFETCH_INTERVAL, timeout=JWKS_FETCH_TIMEOUT, clock=time.monotonic):
+        self.jwks_url = jwks_url
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.min_refetch_interval = min_refetch_interval
+        self.timeout = timeout
+        self._clock = clock
+        self._keys = {}
+        self._fetched_at = None
+        self._last_attempt = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get_key(self, kid=None):
+        """
+        Return the public key for a key id.
+
+        Without a kid the first key of the set is returned.
+
+        Raises:
+            jwt.InvalidTokenError: When no key with the given kid is known
+        """
+        now = self._clock()
+        if self._fetched_at is None or now - self._fetched_at > self.ttl + self.max_stale:
+            # Nothing usable cached: the request has to wait for the fetch
+            self.refresh()
+        elif now - self._fetched_at > self.ttl:
+            self._refresh_in_background()
+
+        keys = self._keys
+        if kid is None and keys:
+            return next(iter(keys.values()))
+        if kid in keys:
+            return keys[kid]
+
+        # The signing keys may have been rotated: refetch, rate limited
+        if self._last_attempt is None or now - self._last_attempt >= self.min_refetch_interval:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"JWKS refetch for unknown kid failed: {str(e)}")
+            if kid in self._keys:
+                return self._keys[kid]
+        raise jwt.InvalidTokenError(f"Unknown signing key id: {kid}")
+
+    def refresh(self):
+        """Fetch the key set, keeping the cached keys when the fetch fails."""
+        with self._lock:
+            self._last_attempt = self._clock()
+            try:
+                response = requests.get(self.jwks_url, timeout=self.timeout)
+                response.raise_for_status()
+                keys = {}
+                for jwk in response.json().get('keys', []):
+                    keys[jwk.get('kid')] = RSAAlgorithm.from_jwk(jwk)
+            except Exception:
+                if self._fetched_at is not None and self._clock() - self._fetched_at > self.ttl + self.max_stale:
+                    self._keys = {}
+                raise
+            self._keys = keys
+            self._fetched_at = self._clock()
+
+    def _refresh_in_background(self):
+        """Start a background refresh unless one is running or one was attempted recently."""
+        with self._lock:
+            now = self._clock()
+            if self._refreshing or (self._last_attempt is not None and
+                                    now - self._last_attempt < self.min_refetch_interval):
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Background JWKS refresh failed, serving cached keys: {str(e)}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified token payloads.
+
+    Entries are keyed by the SHA-256 hash of the token, so raw tokens are not
+    kept in memory, and expire at the token's `exp` claim. Tokens without
+    `exp` are never cached.
+    """
+
+    def __init__(self, max_size=TOKEN_CACHE_SIZE, clock=time.time):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token):
+        """Return the cached payload of a token, or None when it is unknown or expired."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token, payload):
+        """Cache the payload of a successfully verified token."""
+        expires_at = payload.get('exp')
+        if self.max_size <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+_token_cache = VerifiedTokenCache()
+
+
+def get_token_cache():
+    """Return the process-wide verified token cache."""
+    return _token_cache
+
+
+_jwks_cache = None
+_jwks_cache_lock = threading.Lock()
+
+
+def get_jwks_cache():
+    """Return the process-wide JWKS cache for the configured Auth0 domain."""
+    global _jwks_cache
+    jwks_url = f"https://{os.getenv('AUTH0_DOMAIN')}/.well-known/jwks.json"
+    with _jwks_cache_lock:
+        if _jwks_cache is None or _jwks_cache.jwks_url != jwks_url:
+            _jwks_cache = JWKSCache(jwks_url)
+        return _jwks_cache
+
+
+def get_auth0_public_key(kid=None):
+    """Get the Auth0 public key for a key id from the cached JWKS."""
+    return get_jwks_cache().get_key(kid)
+
 
 def requires_auth(f):
     """Decorator to check if request has valid JWT token."""
@@ -24,18 +207,24 @@ def requires_auth(f):
         auth_header = request.headers.get('Authorization', None)
         if not auth_header:
             return jsonify({"message": "No authorization header"}), 401
-        
+
         try:
             # Strip 'Bearer ' from token
             token = auth_header.split(' ')[1]
-            # Verify token
-            payload = jwt.decode(
-                token,
-                get_auth0_public_key(),
-                algorithms=['RS256'],
-                audience=os.getenv('AUTH0_AUDIENCE'),
-                issuer=f"https://{os.getenv('AUTH0_DOMAIN')}/"
-            )
+            # Reuse the payload of a token that was verified before and has not expired
+            token_cache = get_token_cache()
+            payload = token_cache.get(token)
+            if payload is None:
+                kid = jwt.get_unverified_header(token).get('kid')
+                # Verify token
+                payload = jwt.decode(
+                    token,
+                    get_auth0_public_key(kid),
+                    algorithms=['RS256'],
+                    audience=os.getenv('AUTH0_AUDIENCE'),
+                    issuer=f"https://{os.getenv('AUTH0_DOMAIN')}/"
+                )
+                token_cache.put(token, payload)
             # Add user info to request context
             request.auth = {"payload": payload}
             return f(*args, **kwargs)
@@ -47,5 +236,5 @@ def requires_auth(f):
         except Exception as e:
             current_app.logger.error(f"Authentication error: {str(e)}")
             return jsonify({"message": "Authentication error"}), 500
-            
-    return decorated 
\ No newline at end of file
+
+    return decorated
@@ -0,0 +1,54 @@
+from datetime import datetime
+import os
+from dotenv import load_dotenv
+from app.prediction_cache import get_prediction_cache, result_key
+from app.projection_engine import build_baseline_ledger, roll_baseline_ledger
+
+# Load environment variables
+load_dotenv()
+
+# Seconds a baseline ledger is kept; longer than a day so the first request of
+# the next day can roll it forward instead of building it again
+PREDICTION_BASELINE_TTL = float(os.getenv('PREDICTION_BASELINE_TTL', 129600))
+
+
+def baseline_key(budget_uuid, days_ahead, inputs_version, future_transactions_version):
+    """Key of the baseline ledger of a budget; it does not contain the date, so it survives midnight."""
+    return result_key(budget_uuid, "baseline", days_ahead, inputs_version, future_transactions_version)
+
+
+def get_baseline_ledger(budget_uuid, inputs, future_transactions, future_transactions_version, days_ahead,
+                        today=None):
+    """
+    Return the baseline ledger of a budget for today, from the cache when possible.
+
+    A cached ledger of an earlier day is rolled forward to today (see
+    roll_baseline_ledger) instead of being rebuilt from scratch. The key
+    contains the versions of the inputs, so a changed budget or schedule
+    builds a new baseline.
+
+    Args:
+        budget_uuid: UUID of the budget
+        inputs: Budget inputs with the "accounts", "categories" and "version"
+        future_transactions: List of scheduled future transactions
+        future_transactions_version: Version fingerprint of future_transactions
+        days_ahead: Number of days to project into the future
+        today: Date the projection starts from (defaults to the current date)
+
+    Returns:
+        ProjectionLedger starting today
+    """
+    today = today or datetime.now().date()
+    cache = get_prediction_cache()
+    key = baseline_key(budget_uuid, days_ahead, inputs["version"], future_transactions_version)
+
+    ledger = cache.get(key)
+    if ledger is not None and ledger.start_date == today:
+        return ledger
+
+    if ledger is None:
+        ledger = build_baseline_ledger(inputs["accounts"], inputs["categories"], future_transactions, days_ahead, today)
+    else:
+        ledger = roll_baseline_ledger(ledger, inputs["accounts"], inputs["categories"], future_transactions, today)
+    cache.set(key, ledger, PREDICTION_BASELINE_TTL)
+    return ledger
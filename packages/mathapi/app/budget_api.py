@@ -1,6 +1,9 @@
 from app.db import get_DB
 from bson import ObjectId
 
+# Fields of localbudgets needed to resolve a budget and check its ownership
+BUDGET_FIELDS = {"_id": 1, "uuid": 1, "users": 1}
+
 def convert_objectid_to_str(doc):
     """Recursively converts ObjectId fields in a document to strings."""
     for key, value in doc.items():
@@ -20,5 +23,5 @@ def get_objectid_for_budget(budget_uuid):
     Returns:
         ObjectId or None: The ObjectId associated with the budget UUID, or None if not found.
     """
-    budget = get_DB().localbudgets.find_one({"uuid": budget_uuid})
+    budget = get_DB().localbudgets.find_one({"uuid": budget_uuid}, {"_id": 1})
     return budget["_id"] if budget else None
\ No newline at end of file
@@ -0,0 +1,79 @@
+from collections import namedtuple
+from datetime import timedelta
+from functools import lru_cache
+import bisect
+import numpy as np
+
+# Calendar tables kept per (start date, days ahead); requests of a day share a handful of horizons
+CALENDAR_TABLE_CACHE_SIZE = 32
+
+
+class CalendarMonth(namedtuple("CalendarMonth", ["year", "month", "start_offset", "days_in_month"])):
+    """
+    A month overlapping the horizon of a calendar table.
+
+    start_offset is the day offset of the first of the month; it is negative
+    for the month the horizon starts in (unless it starts on the first).
+    """
+    __slots__ = ()
+
+    @property
+    def end_offset(self):
+        """Day offset of the last day of the month."""
+        return self.start_offset + self.days_in_month - 1
+
+    def offset_of_day(self, day):
+        """Day offset of a day of the month (1-based)."""
+        return self.start_offset + day - 1
+
+
+class CalendarTable:
+    """
+    Dates of every day in a projection horizon and the months they fall in.
+
+    Built once per start date and horizon and shared by every NEED category
+    and every stage that needs ISO dates, so months are not re-derived and
+    dates not re-formatted per category or per day.
+    """
+
+    def __init__(self, start_date, days_ahead):
+        self.start_date = start_date
+        self.days_ahead = days_ahead
+
+        start = np.datetime64(start_date, "D")
+        days = start + np.arange(days_ahead + 1)
+        self.dates = tuple(np.datetime_as_string(days).tolist())
+
+        months = np.arange(start.astype("datetime64[M]"), days[-1].astype("datetime64[M]") + 1)
+        month_starts = months.astype("datetime64[D]")
+        start_offsets = (month_starts - start).astype(np.int64).tolist()
+        days_in_month = ((months + 1).astype("datetime64[D]") - month_starts).astype(np.int64).tolist()
+        years, month_numbers = np.divmod(months.astype(np.int64), 12)
+        self.months = tuple(
+            CalendarMonth(year + 1970, month + 1, start_offset, month_days)
+            for year, month, start_offset, month_days in zip(
+                years.tolist(), month_numbers.tolist(), start_offsets, days_in_month
+            )
+        )
+        self._month_starts = start_offsets
+        self._months_by_number = {(month.year, month.month): month for month in self.months}
+
+    def date_for(self, offset):
+        """ISO date string of a day offset, also for offsets outside the horizon."""
+        if 0 <= offset <= self.days_ahead:
+            return self.dates[offset]
+        return (self.start_date + timedelta(days=offset)).isoformat()
+
+    def month(self, year, month):
+        """The CalendarMonth of a year and month, or None when it does not overlap the horizon."""
+        return self._months_by_number.get((year, month))
+
+    def month_containing(self, offset):
+        """The CalendarMonth a day offset inside the horizon falls in."""
+        return self.months[bisect.bisect_right(self._month_starts, offset) - 1]
+
+
+@lru_cache(maxsize=CALENDAR_TABLE_CACHE_SIZE)
+def get_calendar_table(start_date, days_ahead):
+    """Return the shared calendar table of a horizon."""
+    return CalendarTable(start_date, days_ahead)
@@ -7,12 +7,24 @@ import logging
 # Load environment variables from .env file
 load_dotenv()
 
+# Fields of localcategories read by the projection engines
+CATEGORY_FIELDS = {
+    "_id": 1,
+    "budgetId": 1,
+    "uuid": 1,
+    "name": 1,
+    "balance": 1,
+    "target": 1,
+    "historicalAverage": 1,
+    "typicalSpendingPattern": 1,
+}
+
 def get_categories_for_budget(budget_id):
     query = {
         "budgetId": budget_id
     }
     # Execute the query and retrieve categories from localcategories
-    categories = get_DB().localcategories.find(query)
+    categories = get_DB().localcategories.find(query, CATEGORY_FIELDS)
     categories_list = []
     for category in categories:
         categories_list.append(convert_objectid_to_str(category))
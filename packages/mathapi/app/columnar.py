@@ -0,0 +1,127 @@
+from datetime import date
+
+# Change fields whose values are deduplicated into the dictionary and referenced by index
+DICTIONARY_FIELDS = (("category", "categories"), ("reason", "reasons"), ("account", "accounts"), ("payee", "payees"))
+# Fields every change has, stored as dense columns
+DENSE_FIELDS = ("amount", "category", "reason")
+# Fields only scheduled transactions have, stored as sparse columns
+SPARSE_FIELDS = ("account", "payee", "memo", "id")
+
+
+def to_columnar(projections, start_date):
+    """
+    Convert projections to the compact columnar response format.
+
+    Every scenario becomes a set of parallel arrays:
+    - offsets, balance, balance_diff: one entry per projected day, offsets in
+      days from start_date
+    - changes.count: the number of changes of each day; the changes of all
+      days follow each other in the change columns
+    - changes.amount/category/reason: one entry per change
+    - changes.account/payee/memo/id: {"at": change positions, "value": values}
+      for the changes that have the field, also when its value is null, so
+      from_columnar restores the projections exactly
+    - changes.simulation: positions of the simulation changes
+
+    category, reason, account and payee values are indexes into the shared
+    dictionary.
+
+    Args:
+        projections: Dictionary mapping scenario names to projections ({date: day})
+        start_date: Date the projection starts from
+
+    Returns:
+        Dictionary with format, start_date, the shared dictionary and the scenarios
+    """
+    start_ordinal = start_date.toordinal()
+    dictionary = {name: [] for _, name in DICTIONARY_FIELDS}
+    indexes = {field: {} for field, _ in DICTIONARY_FIELDS}
+    dictionary_names = dict(DICTIONARY_FIELDS)
+
+    def encode(field, value):
+        if field not in indexes:
+            return value
+        index = indexes[field].get(value)
+        if index is None:
+            index = indexes[field][value] = len(dictionary[dictionary_names[field]])
+            dictionary[dictionary_names[field]].append(value)
+        return index
+
+    scenarios = {}
+    for scenario_name, projection in projections.items():
+        offsets, balances, balance_diffs, counts = [], [], [], []
+        changes = {field: [] for field in DENSE_FIELDS}
+        sparse = {field: {"at": [], "value": []} for field in SPARSE_FIELDS}
+        simulation_positions = []
+        position = 0
+
+        for day, day_entry in projection.items():
+            offsets.append(date.fromisoformat(day).toordinal() - start_ordinal)
+            balances.append(day_entry["balance"])
+            balance_diffs.append(day_entry.get("balance_diff", 0))
+            counts.append(len(day_entry["changes"]))
+            for change in day_entry["changes"]:
+                for field in DENSE_FIELDS:
+                    changes[field].append(encode(field, change.get(field)))
+                for field in SPARSE_FIELDS:
+                    if field in change:
+                        sparse[field]["at"].append(position)
+                        sparse[field]["value"].append(encode(field, change[field]))
+                if change.get("is_simulation"):
+                    simulation_positions.append(position)
+                position += 1
+
+        changes["count"] = counts
+        changes.update(sparse)
+        changes["simulation"] = simulation_positions
+        scenarios[scenario_name] = {
+            "offsets": offsets,
+            "balance": balances,
+            "balance_diff": balance_diffs,
+            "changes": changes,
+        }
+
+    return {
+        "format": "columnar",
+        "start_date": start_date.isoformat(),
+        "dictionary": dictionary,
+        "scenarios": scenarios,
+    }
+
+
+def from_columnar(document):
+    """Expand a columnar document back to {scenario: {date: day}} projections."""
+    start_ordinal = date.fromisoformat(document["start_date"]).toordinal()
+    dictionary = document["dictionary"]
+    dictionary_names = dict(DICTIONARY_FIELDS)
+
+    def decode(field, value):
+        if field in dictionary_names and value is not None:
+            return dictionary[dictionary_names[field]][value]
+        return value
+
+    projections = {}
+    for scenario_name, scenario in document["scenarios"].items():
+        columns = scenario["changes"]
+        changes = [
+            {field: decode(field, columns[field][position]) for field in DENSE_FIELDS}
+            for position in range(len(columns["amount"]))
+        ]
+        for field in SPARSE_FIELDS:
+            for position, value in zip(columns[field]["at"], columns[field]["value"]):
+                changes[position][field] = decode(field, value)
+        for position in columns["simulation"]:
+            changes[position]["is_simulation"] = True
+
+        projection = {}
+        position = 0
+        for offset, balance, balance_diff, count in zip(
+                scenario["offsets"], scenario["balance"], scenario["balance_diff"], columns["count"]):
+            projection[date.fromordinal(start_ordinal + offset).isoformat()] = {
+                "balance": balance,
+                "changes": changes[position:position + count],
+                "balance_diff": balance_diff,
+            }
+            position += count
+        projections[scenario_name] = projection
+    return projections
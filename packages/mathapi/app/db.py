@@ -1,5 +1,6 @@
 # MongoDB connection
 import os
+import threading
 from pymongo import MongoClient
 import logging
 from dotenv import load_dotenv
@@ -11,10 +12,67 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 MONGODB_URI = os.getenv("MONGODB_URI")
-logger.info(f"Connecting to MongoDB with URI: {MONGODB_URI}")
+MONGODB_DATABASE = os.getenv("MONGODB_DATABASE", "test")  # Database used by get_DB
+
+# Connection pool configuration, shared by every query of the process
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", 20))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", 0))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", 300000))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", 5000))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 5000))
+MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", 20000))
+MONGODB_READ_PREFERENCE = os.getenv("MONGODB_READ_PREFERENCE", "primary")
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the MongoClient shared by the whole process.
+
+    The client is created lazily on first use and recreated when the process
+    id changes, so workers forked by a pre-forking server never reuse the
+    parent's sockets or monitor threads.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            logger.info(f"Connecting to MongoDB with URI: {MONGODB_URI}")
+            _client = MongoClient(
+                MONGODB_URI,
+                maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                minPoolSize=MONGODB_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+                connectTimeoutMS=MONGODB_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                socketTimeoutMS=MONGODB_SOCKET_TIMEOUT_MS,
+                readPreference=MONGODB_READ_PREFERENCE,
+                connect=False
+            )
+            _client_pid = pid
+        return _client
+
+
+def reset_client():
+    """Close the shared client; the next get_client call creates a new one."""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
 
-client = MongoClient(MONGODB_URI)
-db = client["test"]  # Replace with the actual database name
 
 def get_DB():
-    return db
\ No newline at end of file
+    return get_client()[MONGODB_DATABASE]
+
+
+def get_default_DB():
+    """Return the database named in MONGODB_URI."""
+    return get_client().get_default_database()
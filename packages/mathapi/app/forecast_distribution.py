@@ -0,0 +1,187 @@
+from collections import OrderedDict
+import numpy as np
+from app.projection_engine import build_baseline_ledger
+from app.prediction_api import MILLIUNITS_PER_UNIT, MAX_DAYS_AHEAD
+
+DEFAULT_PATHS = 1000
+MAX_PATHS = 20000
+# Cap on paths x days of the balances matrix (float64, the percentiles need about as much again)
+MAX_PATH_DAYS = 10_000_000
+PERCENTILES = (5, 50, 95)
+# Relative standard deviation of scheduled transaction amounts
+SCHEDULED_AMOUNT_JITTER = 0.05
+# Relative standard deviation of NEED spending without category history, and the cap with history
+NEED_AMOUNT_JITTER = 0.15
+MAX_NEED_AMOUNT_JITTER = 1.0
+# Paths simulated at once, bounds the size of the intermediate paths x changes matrices
+PATH_CHUNK_SIZE = 1000
+
+
+def simulate_balance_distribution(accounts, categories, future_transactions, days_ahead=365, paths=DEFAULT_PATHS,
+                                  seed=None, today=None):
+    """
+    Simulate many balance paths and summarize them per day.
+
+    The baseline projection is sampled as a paths x days matrix:
+    - the initial balance is fixed
+    - scheduled transactions keep their date, their amounts are jittered
+    - NEED category spending moves within its month around the category's
+      typicalSpendingPattern and its amount varies with the category's
+      historicalAverage transaction size
+
+    Args:
+        accounts: List of account objects with balances
+        categories: List of budget categories
+        future_transactions: List of scheduled future transactions
+        days_ahead: Number of days to project into the future
+        paths: Number of simulated balance paths
+        seed: Optional seed for reproducible results
+        today: Date the projection starts from (defaults to the current date)
+
+    Returns:
+        OrderedDict mapping every ISO date in the horizon to p5, p50, p95 and
+        probability_below_zero
+    """
+    validate_distribution_size(days_ahead, paths)
+
+    ledger = build_baseline_ledger(accounts, categories, future_transactions, days_ahead, today)
+    model = _build_path_model(ledger, categories)
+    rng = np.random.default_rng(seed)
+
+    days = days_ahead + 1
+    balances = np.empty((paths, days))
+    for start in range(0, paths, PATH_CHUNK_SIZE):
+        count = min(PATH_CHUNK_SIZE, paths - start)
+        daily = _sample_daily_changes(model, count, days, rng)
+        np.cumsum(daily, axis=1, out=balances[start:start + count])
+
+    bands = np.percentile(balances, PERCENTILES, axis=0)
+    probability_below_zero = (balances < 0).mean(axis=0)
+
+    band_lists = [band.tolist() for band in bands]
+    probability_list = probability_below_zero.tolist()
+    distribution = OrderedDict()
+    for offset in range(days):
+        entry = {f"p{percentile}": band_list[offset] for percentile, band_list in zip(PERCENTILES, band_lists)}
+        entry["probability_below_zero"] = probability_list[offset]
+        distribution[ledger.date_for(offset)] = entry
+    return distribution
+
+
+def validate_distribution_size(days_ahead, paths):
+    """
+    Check the horizon and path count of a distribution before any memory is allocated for it.
+
+    Raises:
+        ValueError: When days_ahead or paths is out of range, or the balances matrix would be too large
+    """
+    if not 1 <= days_ahead <= MAX_DAYS_AHEAD:
+        raise ValueError(f"days_ahead must be between 1 and {MAX_DAYS_AHEAD}")
+    if not 1 <= paths <= MAX_PATHS:
+        raise ValueError(f"paths must be between 1 and {MAX_PATHS}")
+    if paths * (days_ahead + 1) > MAX_PATH_DAYS:
+        raise ValueError(f"paths x days must not exceed {MAX_PATH_DAYS}, lower paths or days_ahead")
+
+
+def _build_path_model(ledger, categories):
+    """
+    Split the baseline ledger into the arrays the path sampler needs.
+
+    Returns:
+        Dictionary with the fixed daily totals, the per-day standard deviation of
+        the scheduled transactions and the per-change parameters of NEED spending
+    """
+    days = ledger.days_ahead + 1
+    offsets = np.asarray(ledger.offsets, dtype=np.int64)
+    # The ledger keeps milliunits, the sampled paths are in regular units
+    amounts = np.asarray(ledger.amounts, dtype=np.int64) / MILLIUNITS_PER_UNIT
+    reasons = [change["reason"] for change in ledger.changes]
+    is_scheduled = np.array([reason == "Scheduled Transaction" for reason in reasons], dtype=bool)
+    is_need = np.array([reason not in ("Scheduled Transaction", "Initial Balance") for reason in reasons], dtype=bool)
+
+    fixed_daily = np.bincount(offsets[~is_need], weights=amounts[~is_need], minlength=days)
+    # Independent normal jitter on same-day transactions adds up to one normal per day
+    scheduled_variance = np.bincount(
+        offsets[is_scheduled],
+        weights=(amounts[is_scheduled] * SCHEDULED_AMOUNT_JITTER) ** 2,
+        minlength=days
+    )
+
+    history_by_category = {category.get("name"): category for category in categories}
+    centers, lowers, uppers, jitters = [], [], [], []
+    for index in np.flatnonzero(is_need).tolist():
+        change = ledger.changes[index]
+        offset = ledger.offsets[index]
+        calendar_month = ledger.calendar.month_containing(offset)
+        days_in_month = calendar_month.days_in_month
+        month_start = calendar_month.start_offset
+        month_end = calendar_month.end_offset
+
+        category = history_by_category.get(change["category"], {})
+        pattern = category.get("typicalSpendingPattern") or 0
+        center = offset
+        if 0 < pattern <= 1:
+            center = month_start + max(1, round(pattern * days_in_month)) - 1
+
+        centers.append(center)
+        lowers.append(max(0, month_start))
+        uppers.append(min(ledger.days_ahead, month_end))
+        jitters.append(_need_amount_jitter(abs(change["amount"]), category.get("historicalAverage")))
+
+    return {
+        "fixed_daily": fixed_daily,
+        "scheduled_std": np.sqrt(scheduled_variance),
+        "need_amounts": amounts[is_need],
+        "need_centers": np.asarray(centers, dtype=np.int32),
+        "need_lowers": np.asarray(lowers, dtype=np.int32),
+        "need_uppers": np.asarray(uppers, dtype=np.int32),
+        "need_jitters": np.asarray(jitters, dtype=np.float64),
+    }
+
+
+def _need_amount_jitter(planned_amount, historical_average):
+    """
+    Relative standard deviation of one month of NEED spending.
+
+    When the month's amount is spent in transactions of about historicalAverage
+    (milliunits), the total behaves like a sum of planned / average transactions,
+    which gives a relative deviation of sqrt(average / planned).
+    """
+    if not historical_average or historical_average <= 0 or planned_amount <= 0:
+        return NEED_AMOUNT_JITTER
+    return min(MAX_NEED_AMOUNT_JITTER, float(np.sqrt(historical_average / 1000 / planned_amount)))
+
+
+def _sample_daily_changes(model, count, days, rng):
+    """Sample a count x days matrix of daily balance changes."""
+    daily = np.tile(model["fixed_daily"], (count, 1))
+
+    scheduled_std = model["scheduled_std"]
+    jittered_days = np.flatnonzero(scheduled_std)
+    if jittered_days.size:
+        daily[:, jittered_days] += rng.standard_normal((count, jittered_days.size)) * scheduled_std[jittered_days]
+
+    need_amounts = model["need_amounts"]
+    if need_amounts.size:
+        # Random number generation dominates, so one raw 64-bit draw per path and change
+        # feeds both the timing and the amount noise
+        raw = rng.bit_generator.random_raw((count, need_amounts.size))
+        # Timing: sum of two uniform draws in 0..7, centered, gives a triangular shift of -7..7 days
+        spending_days = (raw & 7).astype(np.int32)
+        spending_days += ((raw >> 3) & 7).astype(np.int32)
+        spending_days += model["need_centers"] - 7
+        np.clip(spending_days, model["need_lowers"], model["need_uppers"], out=spending_days)
+        # Amount: the upper 32 bits as a uniform in [0, 1), scaled to mean 0 and standard deviation 1
+        factors = (raw >> 32).astype(np.float64)
+        factors *= np.sqrt(12.0) / 2 ** 32
+        factors -= np.sqrt(3.0)
+        factors *= model["need_jitters"]
+        factors += 1.0
+        # Spending never flips into income
+        np.maximum(factors, 0.0, out=factors)
+        factors *= need_amounts
+        spending_days += (np.arange(count, dtype=np.int32) * days)[:, None]
+        flat_days = spending_days.ravel()
+        daily += np.bincount(flat_days, weights=factors.ravel(), minlength=count * days).reshape(count, days)
+
+    return daily
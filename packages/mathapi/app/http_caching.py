@@ -0,0 +1,142 @@
+import gzip
+import os
+import zlib
+from dotenv import load_dotenv
+from flask import Response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Load environment variables
+load_dotenv()
+
+# Buffered responses smaller than this (bytes) are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/html", "text/plain"}
+# Preferred first when the client accepts both with the same quality
+ENCODINGS = ("br", "gzip")
+# Prediction responses may be cached but have to be revalidated with the ETag
+PREDICTION_CACHE_CONTROL = "private, no-cache"
+
+
+def choose_encoding(accept_encodings):
+    """
+    Pick the content encoding for a request.
+
+    Args:
+        accept_encodings: The request's werkzeug Accept object for Accept-Encoding
+
+    Returns:
+        "br" (only when the brotli package is installed), "gzip" or None
+    """
+    best, best_quality = None, 0
+    for encoding in ENCODINGS:
+        if encoding == "br" and brotli is None:
+            continue
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_response(response, accept_encodings):
+    """
+    Compress a response in place when the client accepts it.
+
+    Buffered bodies below COMPRESSION_MIN_SIZE are left as they are. Streamed
+    bodies are compressed chunk by chunk, each chunk flushed so the client
+    still receives the data as it is produced. A strong ETag gets the
+    encoding appended, as the compressed bytes are a different representation.
+    """
+    if response.status_code < 200 or response.status_code >= 300 or response.status_code == 204:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers:
+        return response
+    if response.direct_passthrough:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _iter_compressed(response.iter_encoded(), encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESSION_MIN_SIZE:
+            return response
+        response.set_data(_compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _iter_compressed(chunks, encoding):
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+
+    # wbits 16 + MAX_WBITS writes the gzip header and trailer
+    compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def init_compression(app):
+    """Compress the responses of a Flask app according to the request's Accept-Encoding."""
+
+    @app.after_request
+    def _compress_response(response):
+        return compress_response(response, request.accept_encodings)
+
+    return app
+
+
+def not_modified(if_none_match, etag):
+    """
+    Answer a conditional request without building the response.
+
+    Args:
+        if_none_match: The request's werkzeug ETags for If-None-Match
+        etag: Strong ETag of the current representation (without encoding suffix)
+
+    Returns:
+        A 304 response when If-None-Match names the ETag in its identity or any
+        compressed form, otherwise None
+    """
+    if not if_none_match:
+        return None
+    for tag in [etag] + [f"{etag}-{encoding}" for encoding in ENCODINGS]:
+        if if_none_match.star_tag or if_none_match.contains(tag):
+            response = Response(status=304)
+            response.set_etag(tag)
+            response.headers['Cache-Control'] = PREDICTION_CACHE_CONTROL
+            response.vary.add('Accept-Encoding')
+            return response
+    return None
+
+
+def set_validators(response, etag):
+    """Attach the ETag and revalidation headers to a prediction response."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = PREDICTION_CACHE_CONTROL
+    return response
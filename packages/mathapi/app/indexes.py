@@ -0,0 +1,84 @@
+"""
+Ensure the MongoDB indexes the service depends on exist.
+
+Usage:
+    python -m app.indexes           # create missing indexes
+    python -m app.indexes --check   # only report missing indexes (exit code 1 if any)
+"""
+import argparse
+import logging
+import sys
+from app.db import get_DB, get_default_DB
+from app.scheduled_transaction_store import SCHEDULED_TRANSACTION_COLLECTION
+from app.simulation_store import SIMULATION_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+# (database getter, collection, index keys) for every query of the service
+REQUIRED_INDEXES = [
+    (get_DB, "localbudgets", [("uuid", 1)]),
+    (get_DB, "localcategories", [("budgetId", 1)]),
+    (get_DB, "localaccounts", [("budgetId", 1)]),
+    (get_default_DB, "users", [("authId", 1)]),
+    (get_DB, SCHEDULED_TRANSACTION_COLLECTION, [("budgetId", 1)]),
+    (get_DB, SIMULATION_COLLECTION, [("budgetId", 1), ("isActive", 1)]),
+]
+
+
+def _is_covered(required_keys, index_information):
+    """An existing index covers the query when the required keys are its prefix."""
+    for index in index_information.values():
+        keys = [(field, direction) for field, direction in index["key"]]
+        if keys[:len(required_keys)] == required_keys:
+            return True
+    return False
+
+
+def find_missing_indexes():
+    """
+    Check every required index against the indexes of its collection.
+
+    Returns:
+        List of (database getter, collection, index keys) tuples without a covering index
+    """
+    missing = []
+    for get_database, collection_name, keys in REQUIRED_INDEXES:
+        collection = get_database()[collection_name]
+        if not _is_covered(keys, collection.index_information()):
+            missing.append((get_database, collection_name, keys))
+    return missing
+
+
+def ensure_indexes(create=True):
+    """
+    Report missing indexes and create them unless `create` is False.
+
+    Returns:
+        List of (database name, collection, index keys) of the indexes that were missing
+    """
+    report = []
+    for get_database, collection_name, keys in find_missing_indexes():
+        database = get_database()
+        logger.warning(f"Missing index {keys} on {database.name}.{collection_name}")
+        if create:
+            name = database[collection_name].create_index(keys)
+            logger.info(f"Created index {name} on {database.name}.{collection_name}")
+        report.append((database.name, collection_name, keys))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ensure the MongoDB indexes of the math API exist.")
+    parser.add_argument("--check", action="store_true", help="only report missing indexes")
+    args = parser.parse_args(argv)
+
+    missing = ensure_indexes(create=not args.check)
+    if not missing:
+        logger.info("All required indexes exist")
+        return 0
+    return 1 if args.check else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
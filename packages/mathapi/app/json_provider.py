@@ -0,0 +1,73 @@
+import json
+import os
+from dotenv import load_dotenv
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is not installed
+    orjson = None
+
+# Load environment variables
+load_dotenv()
+
+# "orjson" (used when installed) or "default" for Flask's stdlib provider
+JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'orjson')
+
+
+def _default(value):
+    """Serialize the types orjson passes through the same way Flask's provider does."""
+    return DefaultJSONProvider.default(value)
+
+
+def encode(value, sort_keys=False, indent=False):
+    """
+    Encode a value to JSON bytes with orjson, or the stdlib when it is not installed.
+
+    Dates and datetimes are passed through to Flask's serializer, so they keep
+    the HTTP date format of jsonify.
+    """
+    if orjson is None:
+        return json.dumps(value, default=_default, sort_keys=sort_keys, indent=2 if indent else None,
+                          separators=None if indent else (",", ":")).encode()
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(value, default=_default, option=option)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider serializing with orjson.
+
+    Follows the sort_keys and compact settings of the default provider. Unlike
+    the stdlib encoder, non-ASCII characters are written as UTF-8 instead of
+    escaped and NaN/Infinity become null.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Options for the stdlib encoder (cls, separators, ...) are honoured by falling back
+            return super().dumps(obj, **kwargs)
+        return encode(obj, sort_keys=self.sort_keys).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs or orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(encode(obj, sort_keys=self.sort_keys, indent=indent) + b"\n",
+                                        mimetype=self.mimetype)
+
+
+def configure_json_provider(app):
+    """Install the fast JSON provider on a Flask app unless disabled or orjson is missing."""
+    if JSON_PROVIDER == 'orjson' and orjson is not None:
+        app.json_provider_class = FastJSONProvider
+        app.json = FastJSONProvider(app)
+    return app.json
@@ -1,7 +1,7 @@
-from pymongo import MongoClient
 from bson.objectid import ObjectId
-import os
 from dotenv import load_dotenv
+from app.db import get_default_DB
+from app.prediction_cache import get_prediction_cache, user_key
 import logging
 
 load_dotenv()
@@ -9,18 +9,15 @@ load_dotenv()
 # Setup logging
 logger = logging.getLogger(__name__)
 
-try:
-    client = MongoClient(os.getenv('MONGODB_URI'))
-    db = client.get_default_database()
-    logger.info("Successfully connected to MongoDB")
-except Exception as e:
-    logger.error(f"Failed to connect to MongoDB: {str(e)}")
-    raise
+# Fields of users needed to authorize a request and reach its YNAB connection
+USER_FIELDS = {"_id": 1, "authId": 1, "ynab": 1}
 
 def get_user_by_auth_id(auth_id):
     """Get user from MongoDB by Auth0 ID."""
     try:
-        return db.users.find_one({"authId": auth_id})
+        return get_prediction_cache().get_or_load(
+            user_key(auth_id), lambda: get_default_DB().users.find_one({"authId": auth_id}, USER_FIELDS)
+        )
     except Exception as e:
         logger.error(f"Error fetching user {auth_id}: {str(e)}")
         return None
@@ -47,29 +44,13 @@ def get_user_from_request(request):
         logger.error(f"Error getting user from request: {str(e)}")
         return None
 
-def get_budget(budget_uuid, user):
-    """Get budget by UUID and verify it belongs to user."""
-    try:
-        logger.info(f"Looking for budget with uuid: {budget_uuid}")
-        logger.info(f"User data: {user}")
-        
-        budget = db.localbudgets.find_one({"uuid": budget_uuid})
-        if not budget:
-            logger.warning(f"Budget with uuid {budget_uuid} not found in database")
-            return None
-            
-        logger.info(f"Found budget: {budget}")
-        
-        # Verify budget belongs to user by checking if user._id is in the users array
-        user_id = user.get('_id')
-        budget_users = budget.get('users', [])
-        logger.info(f"Checking if user {user_id} is in budget users: {budget_users}")
-        
-        if not any(str(uid) == str(user_id) for uid in budget_users):
-            logger.warning(f"Budget {budget_uuid} does not belong to user {user_id}")
-            return None
-            
-        return budget
-    except Exception as e:
-        logger.error(f"Error fetching budget {budget_uuid}: {str(e)}")
-        return None 
\ No newline at end of file
+def budget_belongs_to_user(budget, user):
+    """Verify budget belongs to user by checking if user._id is in the users array."""
+    user_id = user.get('_id')
+    budget_users = budget.get('users', [])
+    logger.info(f"Checking if user {user_id} is in budget users: {budget_users}")
+
+    if not any(str(uid) == str(user_id) for uid in budget_users):
+        logger.warning(f"Budget {budget.get('uuid')} does not belong to user {user_id}")
+        return False
+    return True
@@ -1,11 +1,11 @@
-from datetime import datetime, timedelta
-from app.budget_api import get_objectid_for_budget
+from datetime import datetime
+from app.prediction_inputs import load_budget_inputs, load_inputs_concurrently, MONGO_INPUT_TIMEOUT, YNAB_INPUT_TIMEOUT
 from app.ynab_api import get_scheduled_transactions
-from app.categories_api import get_categories_for_budget
-from app.accounts_api import get_accounts_for_budget
+from app.recurrence import expand_scheduled_transactions
+from app.calendar_table import get_calendar_table
 from collections import OrderedDict
-import calendar
 import logging
+import time
 
 CADENCE_CONFIG = {
     1: {"type": "monthly", "interval": 1},       # Monthly cadence
@@ -14,6 +14,22 @@ CADENCE_CONFIG = {
     # Add other cadence configurations as needed
 }
 
+# YNAB amounts are integer milliunits; the engines compute in milliunits and only
+# the changes and balances they return are in regular units
+MILLIUNITS_PER_UNIT = 1000
+# Longest horizon (in days) the prediction endpoints accept
+MAX_DAYS_AHEAD = 1825
+
+
+def to_milliunits(amount):
+    """Convert an amount in regular units to integer milliunits."""
+    return int(round(amount * MILLIUNITS_PER_UNIT))
+
+
+def to_units(milliunits):
+    """Convert milliunits to regular units for the response."""
+    return milliunits / MILLIUNITS_PER_UNIT
+
 
 def projected_balances_for_budget(budget_uuid, days_ahead=300, simulations=None):
     """
@@ -27,10 +43,16 @@ def projected_balances_for_budget(budget_uuid, days_ahead=300, simulations=None)
     Returns:
         Dictionary containing daily projections with changes and balances
     """
-    budget_id = get_objectid_for_budget(budget_uuid)
-    future_transactions = get_scheduled_transactions(budget_uuid)
-    categories = get_categories_for_budget(budget_id)
-    accounts = get_accounts_for_budget(budget_id)
+    # MongoDB and YNAB are queried concurrently, the YNAB fetch gives up when the wait for it ends
+    ynab_deadline = time.monotonic() + YNAB_INPUT_TIMEOUT
+    loaded = load_inputs_concurrently({
+        "mongo": (lambda: load_budget_inputs(budget_uuid), MONGO_INPUT_TIMEOUT),
+        "ynab": (lambda: get_scheduled_transactions(budget_uuid, ynab_deadline), YNAB_INPUT_TIMEOUT),
+    })
+    inputs = loaded["mongo"] or {"categories": [], "accounts": []}
+    future_transactions = loaded["ynab"]
+    categories = inputs["categories"]
+    accounts = inputs["accounts"]
     
     # Perform balance prediction logic here
     projected_balances = project_daily_balances_with_reasons(accounts, categories, future_transactions, days_ahead, simulations)
@@ -51,16 +73,23 @@ def project_daily_balances_with_reasons(accounts, categories, future_transaction
     Returns:
         OrderedDict containing daily projections sorted by date
     """
+    calendar_table = get_calendar_table(datetime.now().date(), days_ahead)
     initial_balance = calculate_initial_balance(accounts)
-    daily_projection = initialize_daily_projection(initial_balance, days_ahead)
+    daily_projection = initialize_daily_projection(initial_balance, days_ahead, calendar_table)
 
-    scheduled_dates_by_category = add_future_transactions_to_projection(daily_projection, future_transactions)
+    scheduled_amounts_by_category = {}
+    scheduled_dates_by_category = add_future_transactions_to_projection(
+        daily_projection, future_transactions, scheduled_amounts_by_category
+    )
 
-    process_need_categories(daily_projection, categories, scheduled_dates_by_category, days_ahead)
+    process_need_categories(
+        daily_projection, categories, scheduled_dates_by_category, days_ahead, scheduled_amounts_by_category,
+        calendar_table
+    )
 
     add_simulations_to_projection(daily_projection, simulations)
 
-    calculate_running_balance(daily_projection, initial_balance, days_ahead)
+    calculate_running_balance(daily_projection, initial_balance, days_ahead, calendar_table)
     projected_balances = {date: data for date, data in daily_projection.items() if data["changes"]}
     sorted_projected_balances = OrderedDict(sorted(projected_balances.items(), key=lambda item: item[0]))
     
@@ -68,25 +97,31 @@ def project_daily_balances_with_reasons(accounts, categories, future_transaction
 
 
 def calculate_initial_balance(accounts):
-    """Calculate the total initial balance across all accounts (in thousands)."""
-    return sum(account['balance'] for account in accounts) / 1000  # Convert to thousands
+    """Calculate the total initial balance across all accounts (in regular units)."""
+    return to_units(initial_balance_milliunits(accounts))
+
 
+def initial_balance_milliunits(accounts):
+    """Calculate the total initial balance across all accounts in milliunits."""
+    return sum(account['balance'] for account in accounts)
 
-def initialize_daily_projection(initial_balance, days_ahead):
+
+def initialize_daily_projection(initial_balance, days_ahead, calendar_table=None):
     """
     Initialize the daily projection dictionary with empty entries.
     
     Args:
         initial_balance: Starting balance for the projection
         days_ahead: Number of days to project into the future
+        calendar_table: Optional calendar table of the horizon (defaults to the one starting today)
         
     Returns:
         Dictionary with initialized daily entries
     """
+    calendar_table = calendar_table or get_calendar_table(datetime.now().date(), days_ahead)
     daily_projection = {}
     # Start with current day (day 0) up to days_ahead
-    current_date = datetime.now().date()
-    daily_projection[current_date.isoformat()] = {
+    daily_projection[calendar_table.dates[0]] = {
         "balance": 0,  # Start with 0, balance will be calculated later
         "changes": [{
             "reason": "Initial Balance",
@@ -96,8 +131,7 @@ def initialize_daily_projection(initial_balance, days_ahead):
     }
     
     # Add the following days
-    for day in range(1, days_ahead + 1):
-        date = (current_date + timedelta(days=day)).isoformat()
+    for date in calendar_table.dates[1:days_ahead + 1]:
         daily_projection[date] = {
             "balance": 0,  # Start with 0, balance will be calculated later
             "changes": []
@@ -105,43 +139,81 @@ def initialize_daily_projection(initial_balance, days_ahead):
     return daily_projection
 
 
-def add_future_transactions_to_projection(daily_projection, future_transactions):
+def add_future_transactions_to_projection(daily_projection, future_transactions, scheduled_amounts_by_category=None):
     """
-    Add scheduled future transactions to the daily projection.
+    Add every occurrence of the scheduled future transactions to the daily projection.
     
     Args:
         daily_projection: Dictionary containing daily projections
         future_transactions: List of scheduled transactions
+        scheduled_amounts_by_category: Optional dictionary that is filled with the
+            (category name, year, month) -> scheduled amount index of the placed transactions
         
     Returns:
         Dictionary mapping category names to sets of scheduled dates
     """
     scheduled_dates_by_category = {}
-    for txn in future_transactions:
-        transaction_date = datetime.strptime(txn['date_next'], '%Y-%m-%d').date().isoformat()
-        category_name = txn['category_name']
-        amount = txn['amount'] / 1000  # Convert to thousands
-
-        if transaction_date in daily_projection:
-            daily_projection[transaction_date]["changes"].append({
-                "reason": "Scheduled Transaction",
-                "amount": amount,  # Keep raw numeric value
-                "category": category_name,
-                "account": txn['account_name'],
-                "payee": txn['payee_name'],
-                "memo": txn['memo'],
-                "id": txn.get('id', '')  # Make id optional
-            })
+    placed_transactions = []
+    if daily_projection:
+        # The projection covers consecutive days starting at its first date
+        start_date = datetime.strptime(next(iter(daily_projection)), '%Y-%m-%d').date()
+        calendar_table = get_calendar_table(start_date, len(daily_projection) - 1)
+        transaction_indexes, offsets = expand_scheduled_transactions(
+            future_transactions, start_date, calendar_table.days_ahead
+        )
+        for index, offset in zip(transaction_indexes.tolist(), offsets.tolist()):
+            change = scheduled_transaction_change(future_transactions[index])
+            transaction_date = calendar_table.dates[offset]
+            category_name = change["category"]
+
+            daily_projection[transaction_date]["changes"].append(change)
 
             if category_name not in scheduled_dates_by_category:
                 scheduled_dates_by_category[category_name] = set()
             scheduled_dates_by_category[category_name].add(transaction_date)
+            placed_transactions.append((transaction_date, category_name, future_transactions[index]['amount']))
+
+    if scheduled_amounts_by_category is not None:
+        scheduled_amounts_by_category.update(index_scheduled_amounts(placed_transactions))
 
     return scheduled_dates_by_category
 
 
-def process_need_categories(daily_projection, categories, scheduled_dates_by_category, days_ahead):
-    """Process all categories with NEED type goals."""
+def scheduled_transaction_change(txn):
+    """Build the projection change of a scheduled transaction."""
+    return {
+        "reason": "Scheduled Transaction",
+        "amount": to_units(txn['amount']),
+        "category": txn['category_name'],
+        "account": txn['account_name'],
+        "payee": txn['payee_name'],
+        "memo": txn['memo'],
+        "id": txn.get('id', '')  # Make id optional
+    }
+
+
+def index_scheduled_amounts(placed_transactions):
+    """
+    Sum scheduled transaction amounts per category and month.
+
+    Args:
+        placed_transactions: Iterable of (ISO date, category name, milliunits) tuples
+
+    Returns:
+        Dictionary mapping (category name, year, month) to the absolute scheduled amount in milliunits
+    """
+    scheduled_amounts = {}
+    # Integer sums do not depend on the order the transactions are added in
+    for transaction_date, category_name, amount in placed_transactions:
+        key = (category_name, int(transaction_date[:4]), int(transaction_date[5:7]))
+        scheduled_amounts[key] = scheduled_amounts.get(key, 0) + abs(amount)  # Use abs() since changes are negative
+    return scheduled_amounts
+
+
+def process_need_categories(daily_projection, categories, scheduled_dates_by_category, days_ahead,
+                            scheduled_amounts_by_category=None, calendar_table=None):
+    """Process all categories with NEED type goals, sharing one calendar table."""
+    calendar_table = calendar_table or get_calendar_table(datetime.now().date(), days_ahead)
     for category in categories:
         target = category.get("target")
 
@@ -151,11 +223,14 @@ def process_need_categories(daily_projection, categories, scheduled_dates_by_cat
                 category,
                 target,
                 scheduled_dates_by_category,
-                days_ahead
+                days_ahead,
+                scheduled_amounts_by_category,
+                calendar_table
             )
 
 
-def process_need_category(daily_projection, category, target, scheduled_dates_by_category, days_ahead):
+def process_need_category(daily_projection, category, target, scheduled_dates_by_category, days_ahead,
+                          scheduled_amounts_by_category=None, calendar_table=None):
     """
     Process a single NEED category and its spending targets.
     
@@ -165,13 +240,10 @@ def process_need_category(daily_projection, category, target, scheduled_dates_by
         target: Target configuration for the category
         scheduled_dates_by_category: Dictionary of already scheduled dates
         days_ahead: Number of days to project into the future
+        scheduled_amounts_by_category: Optional (category name, year, month) -> scheduled amount index
+        calendar_table: Optional calendar table of the horizon (defaults to the one starting today)
     """
-    target_amount = target.get("goal_target", 0) / 1000  # Convert to thousands
-    current_balance = category.get("balance", 0) / 1000  # Convert to thousands
-    global_overall_left = target.get("goal_overall_left")  # This could be None
-    if global_overall_left is None:  # Explicitly handle None
-        global_overall_left = 0
-    global_overall_left /= 1000  # Convert to thousands
+    current_balance, target_amount, global_overall_left = need_category_amounts(category, target)
 
     # Pass the current balance to apply_need_category_spending
     # That function will determine if the balance should be used (only for current month)
@@ -182,24 +254,110 @@ def process_need_category(daily_projection, category, target, scheduled_dates_by
         current_balance,
         target_amount,
         days_ahead,
-        global_overall_left
+        global_overall_left,
+        scheduled_amounts_by_category,
+        calendar_table
     )
 
 
-def apply_need_category_spending(daily_projection, category, target, current_balance, target_amount, days_ahead, global_overall_left):
+def need_category_amounts(category, target):
+    """
+    Convert the milliunit amounts of a NEED category to regular units.
+
+    Returns:
+        Tuple of (current_balance, target_amount, global_overall_left)
+    """
+    return tuple(to_units(amount) for amount in need_category_milliunits(category, target))
+
+
+def need_category_milliunits(category, target):
+    """
+    Read the milliunit amounts of a NEED category.
+
+    Returns:
+        Tuple of (current_balance, target_amount, global_overall_left) in milliunits
+    """
+    target_amount = target.get("goal_target", 0)
+    current_balance = category.get("balance", 0)
+    global_overall_left = target.get("goal_overall_left")  # This could be None
+    if global_overall_left is None:  # Explicitly handle None
+        global_overall_left = 0
+    return current_balance, target_amount, global_overall_left
+
+
+def apply_need_category_spending(daily_projection, category, target, current_balance, target_amount, days_ahead, global_overall_left,
+                                 scheduled_amounts_by_category=None, calendar_table=None):
     """
     Apply spending patterns for a NEED category based on its target configuration.
     
     Args:
         daily_projection: Dictionary containing daily projections
         category: Category object with target information
+        target: Target configuration for the category
+        current_balance: Current balance in the category (in regular units)
+        target_amount: Target amount for the category (in regular units)
+        days_ahead: Number of days to project into the future
+        global_overall_left: Remaining amount in the overall goal (in regular units)
+        scheduled_amounts_by_category: Optional (category name, year, month) -> scheduled milliunits
+            index; without it the scheduled amounts are summed from the projection itself
+        calendar_table: Optional calendar table of the horizon (defaults to the one starting today)
+    """
+    calendar_table = calendar_table or get_calendar_table(datetime.now().date(), days_ahead)
+
+    def scheduled_amount_for_month(year, month):
+        if scheduled_amounts_by_category is not None:
+            return scheduled_amounts_by_category.get((category["name"], year, month), 0)
+
+        calendar_month = calendar_table.month(year, month)
+        scheduled_amount = 0
+        for offset in range(calendar_month.start_offset, calendar_month.end_offset + 1):
+            check_date = calendar_table.date_for(offset)
+            if check_date in daily_projection:
+                for change in daily_projection[check_date]["changes"]:
+                    if change["reason"] == "Scheduled Transaction" and change["category"] == category["name"]:
+                        scheduled_amount += abs(to_milliunits(change["amount"]))  # Use abs() since changes are negative
+        return scheduled_amount
+
+    for spending_offset, amount, reason in plan_need_category_spending(
+        target,
+        to_milliunits(current_balance),
+        to_milliunits(target_amount),
+        days_ahead,
+        to_milliunits(global_overall_left),
+        scheduled_amount_for_month,
+        calendar_table=calendar_table
+    ):
+        apply_transaction(daily_projection, calendar_table.date_for(spending_offset), to_units(amount), category["name"], reason)
+
+
+def plan_need_category_spending(target, current_balance, target_amount, days_ahead, global_overall_left,
+                                scheduled_amount_for_month, today=None, calendar_table=None, months=None):
+    """
+    Plan the spending of a NEED category without touching a projection.
+
+    Every month overlapping the horizon of the calendar table is planned.
+    The planned day offsets are not limited to the projection window; callers
+    drop the offsets that fall outside of it. All amounts are integer milliunits.
+
+    Args:
         target: Target configuration for the category
         current_balance: Current balance in the category
         target_amount: Target amount for the category
         days_ahead: Number of days to project into the future
         global_overall_left: Remaining amount in the overall goal
+        scheduled_amount_for_month: Callable taking (year, month) and returning the
+            absolute milliunits already scheduled for the category in that month
+        today: Date the projection starts from (defaults to the current date)
+        calendar_table: Calendar table of the horizon, shared by all categories
+            (defaults to the one of today and days_ahead)
+        months: Optional subset of the calendar table's months to plan; every
+            month is planned on its own, so a subset plans the same spending
+            for those months as a full run
+
+    Yields:
+        Tuples of (spending day offset, amount, reason)
     """
-    today = datetime.now().date()
+    calendar_table = calendar_table or get_calendar_table(today or datetime.now().date(), days_ahead)
     applied_months = set()
     cadence_interval = None
     cadence_config = None
@@ -221,44 +379,37 @@ def apply_need_category_spending(daily_projection, category, target, current_bal
     if goal_target_month:
         goal_target_month = datetime.strptime(goal_target_month, '%Y-%m-%d').date()
 
-    for month_offset in range((days_ahead // 30) + 1):
+    for calendar_month in (months if months is not None else calendar_table.months):
         # Determine target year and month
-        target_year = today.year + ((today.month - 1 + month_offset) // 12)
-        target_month = ((today.month - 1 + month_offset) % 12) + 1
-        target_date = datetime(target_year, target_month, 1).date()
+        target_year = calendar_month.year
+        target_month = calendar_month.month
+        target_date = (target_year, target_month)
 
-        # Determine spending date
-        days_in_month = calendar.monthrange(target_year, target_month)[1]
+        # Determine spending day
+        days_in_month = calendar_month.days_in_month
         spending_day = goal_day if goal_day and 1 <= goal_day <= days_in_month else days_in_month
-        spending_date = datetime(target_year, target_month, spending_day).date()
-        date_str = spending_date.isoformat()
+        spending_offset = calendar_month.offset_of_day(spending_day)
 
         # Skip if already applied for this cadence period
         if target_date in applied_months:
             continue
 
-        is_current_month = today.year == target_year and today.month == target_month
+        # The horizon starts in the first month of the calendar table
+        is_current_month = calendar_month.start_offset <= 0
 
         # Calculate scheduled transactions for this month
-        month_start = datetime(target_year, target_month, 1).date()
-        month_end = datetime(target_year, target_month, days_in_month).date()
-        scheduled_amount = 0
-        for day in range(days_in_month):
-            check_date = (month_start + timedelta(days=day)).isoformat()
-            if check_date in daily_projection:
-                for change in daily_projection[check_date]["changes"]:
-                    if change["reason"] == "Scheduled Transaction" and change["category"] == category["name"]:
-                        scheduled_amount += abs(change["amount"])  # Use abs() since changes are negative
+        scheduled_amount = scheduled_amount_for_month(target_year, target_month)
 
         # Handle yearly cadence (goal_cadence 13) separately
         if goal_cadence == 13:  # Yearly cadence
-            if goal_target_month and spending_date >= goal_target_month:
+            spending_day_key = (target_year, target_month, spending_day)
+            if goal_target_month and spending_day_key >= (goal_target_month.year, goal_target_month.month, goal_target_month.day):
                 # Only apply if we're at or past the target month
-                if spending_date.month == goal_target_month.month and spending_date.year >= goal_target_month.year:
+                if target_month == goal_target_month.month and target_year >= goal_target_month.year:
                     remaining_amount = global_overall_left if global_overall_left > 0 else target_amount
                     remaining_amount = max(0, remaining_amount - scheduled_amount)
                     if remaining_amount > 0:
-                        apply_transaction(daily_projection, date_str, remaining_amount, category["name"], "Yearly Payment")
+                        yield spending_offset, remaining_amount, "Yearly Payment"
                     applied_months.add(target_date)
             continue
 
@@ -275,19 +426,18 @@ def apply_need_category_spending(daily_projection, category, target, current_bal
                     goal_spending_day = goal_day
                 else:
                     goal_spending_day = goal_target_month.day if goal_target_month.day <= days_in_month else days_in_month
-                goal_spending_date = datetime(target_year, target_month, goal_spending_day).date()
-                goal_date_str = goal_spending_date.isoformat()
+                goal_spending_offset = calendar_month.offset_of_day(goal_spending_day)
 
                 # Use goal_overall_funded if goal_overall_left is 0 (fully funded)
                 if global_overall_left > 0:
                     remaining_amount = max(0, global_overall_left - scheduled_amount)
                 else:
                     # When fully funded, use the funded amount from the category
-                    goal_overall_funded = target.get("goal_overall_funded", 0) / 1000  # Convert to thousands
+                    goal_overall_funded = target.get("goal_overall_funded", 0)
                     remaining_amount = max(0, goal_overall_funded - scheduled_amount)
 
                 if remaining_amount > 0:
-                    apply_transaction(daily_projection, goal_date_str, remaining_amount, category["name"], "Goal Target Payment")
+                    yield goal_spending_offset, remaining_amount, "Goal Target Payment"
                 applied_months.add(target_date)
                 continue
             elif target_month_year > goal_month_year and cadence_interval:
@@ -295,8 +445,7 @@ def apply_need_category_spending(daily_projection, category, target, current_bal
                 if months_since_goal % cadence_interval == 0:
                     # For recurring payments, use the same day as the original goal
                     recurring_spending_day = goal_target_month.day if goal_target_month.day <= days_in_month else days_in_month
-                    recurring_spending_date = datetime(target_year, target_month, recurring_spending_day).date()
-                    recurring_date_str = recurring_spending_date.isoformat()
+                    recurring_spending_offset = calendar_month.offset_of_day(recurring_spending_day)
 
                     remaining_amount = max(0, target_amount - scheduled_amount)
                     if remaining_amount > 0:
@@ -305,7 +454,7 @@ def apply_need_category_spending(daily_projection, category, target, current_bal
                             reason = f"Recurring Spending ({cadence_config['type'].capitalize()} every {goal_cadence_frequency})"
                         else:
                             reason = f"Recurring Spending ({cadence_config['type'].capitalize()})"
-                        apply_transaction(daily_projection, recurring_date_str, remaining_amount, category["name"], reason)
+                        yield recurring_spending_offset, remaining_amount, reason
                     applied_months.add(target_date)
                 continue
 
@@ -315,16 +464,16 @@ def apply_need_category_spending(daily_projection, category, target, current_bal
             # Calculate effective balance after scheduled transactions for current month
             effective_balance = max(0, current_balance - scheduled_amount)
             if effective_balance > 0:
-                apply_transaction(daily_projection, date_str, effective_balance, category["name"], "Current Month Balance")
+                yield spending_offset, effective_balance, "Current Month Balance"
             elif remaining_amount > 0:
-                apply_transaction(daily_projection, date_str, remaining_amount, category["name"], "Current Month Target")
+                yield spending_offset, remaining_amount, "Current Month Target"
             continue
 
         # If no goal_target_month is provided, apply spending at the specific day or end of the month
         if not goal_target_month and not is_current_month:
             remaining_amount = max(0, target_amount - scheduled_amount)
             if remaining_amount > 0:
-                apply_transaction(daily_projection, date_str, remaining_amount, category["name"], "Future Month Target")
+                yield spending_offset, remaining_amount, "Future Month Target"
 
 
 def apply_transaction(daily_projection, date_str, amount, category_name, reason):
@@ -345,7 +494,7 @@ def add_simulations_to_projection(daily_projection, simulations):
 
     for sim in simulations:
         sim_date = sim["date"]
-        sim_amount = float(sim["amount"])  # Convert string to float
+        sim_amount = to_units(simulation_milliunits(sim))
         sim_reason = sim.get("reason", "Simulation")
         sim_category = sim.get("category", "Miscellaneous")
 
@@ -358,7 +507,12 @@ def add_simulations_to_projection(daily_projection, simulations):
             })
 
 
-def calculate_running_balance(daily_projection, initial_balance, days_ahead):
+def simulation_milliunits(sim):
+    """Amount of a simulation entry (a string or number in regular units) in milliunits."""
+    return to_milliunits(float(sim["amount"]))
+
+
+def calculate_running_balance(daily_projection, initial_balance, days_ahead, calendar_table=None):
     """
     Calculate running balances for each day in the projection.
     
@@ -366,15 +520,17 @@ def calculate_running_balance(daily_projection, initial_balance, days_ahead):
         daily_projection: Dictionary containing daily projections
         initial_balance: Starting balance for the calculation
         days_ahead: Number of days to calculate balances for
+        calendar_table: Optional calendar table of the horizon (defaults to the one starting today)
     """
+    calendar_table = calendar_table or get_calendar_table(datetime.now().date(), days_ahead)
     running_balance = 0  # Start with 0 since initial_balance is already added as a change
-    for day in range(days_ahead + 1):
-        current_date = (datetime.now().date() + timedelta(days=day)).isoformat()
+    for current_date in calendar_table.dates[:days_ahead + 1]:
         day_entry = daily_projection[current_date]
 
-        # Apply changes and calculate new balance
-        day_entry["balance_diff"] = sum(change["amount"] for change in day_entry["changes"])
-        running_balance += day_entry["balance_diff"]
+        # Apply changes and calculate new balance, summing exact milliunits
+        balance_diff = sum(to_milliunits(change["amount"]) for change in day_entry["changes"])
+        running_balance += balance_diff
 
         # Update balance
-        day_entry["balance"] = running_balance
\ No newline at end of file
+        day_entry["balance_diff"] = to_units(balance_diff)
+        day_entry["balance"] = to_units(running_balance)
@@ -0,0 +1,216 @@
+from collections import OrderedDict
+import threading
+import hashlib
+import logging
+import pickle
+import json
+import time
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "memory" (per process), "redis" (shared by all workers) or "none"
+PREDICTION_CACHE_BACKEND = os.getenv('PREDICTION_CACHE_BACKEND', 'memory')
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', 300))
+PREDICTION_CACHE_SIZE = int(os.getenv('PREDICTION_CACHE_SIZE', 256))
+PREDICTION_CACHE_REDIS_URL = os.getenv('PREDICTION_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+PREDICTION_CACHE_NAMESPACE = os.getenv('PREDICTION_CACHE_NAMESPACE', 'mathapi:')
+# Shared secret the sync job sends to invalidate cached budgets
+CACHE_INVALIDATION_TOKEN = os.getenv('CACHE_INVALIDATION_TOKEN')
+
+
+class MemoryCacheBackend:
+    """Bounded in-process LRU cache with a TTL per entry."""
+
+    def __init__(self, max_size=PREDICTION_CACHE_SIZE, clock=time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def size(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisCacheBackend:
+    """
+    Cache in a Redis-compatible server, shared by all workers.
+
+    Values are pickled, so the server must only be reachable by this service.
+    """
+
+    def __init__(self, url=PREDICTION_CACHE_REDIS_URL, namespace=PREDICTION_CACHE_NAMESPACE):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("PREDICTION_CACHE_BACKEND=redis requires the redis package") from e
+        self._client = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def get(self, key):
+        raw = self._client.get(self.namespace + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self.namespace + key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), px=max(1, int(ttl * 1000)))
+
+    def delete_prefix(self, prefix):
+        keys = list(self._client.scan_iter(match=self.namespace + prefix + "*", count=500))
+        if keys:
+            self._client.delete(*keys)
+        return len(keys)
+
+    def size(self):
+        return None
+
+
+class PredictionCache:
+    """
+    Cache of prediction inputs and results.
+
+    All keys of a budget share the "budget:<uuid>:" prefix so everything cached
+    for it can be invalidated at once. Backend errors are logged and treated as misses, the
+    cache never fails a request.
+    """
+
+    def __init__(self, backend, ttl=PREDICTION_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Guards the counters; the backends lock their own entries, so reads are not serialized here
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for a key, or None."""
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Prediction cache read failed: {str(e)}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Return the cached value for a key, or load, cache and return it.
+
+        Loaded values that are None are not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        value = loader()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Cache a value for a key (for ttl seconds, defaults to the cache TTL)."""
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, value, ttl if ttl is not None else self.ttl)
+        except Exception as e:
+            logger.warning(f"Prediction cache write failed: {str(e)}")
+
+    def invalidate_budget(self, budget_uuid):
+        """Drop the cached inputs and results of a budget."""
+        return self.invalidate_prefix(f"budget:{budget_uuid}:")
+
+    def invalidate_user(self, auth_id):
+        """Drop the cached user document of an Auth0 user."""
+        return self.invalidate_prefix(f"user:{auth_id}:")
+
+    def invalidate_prefix(self, prefix=""):
+        """Drop all cached entries whose key starts with prefix (everything by default)."""
+        if self.backend is None:
+            return 0
+        try:
+            return self.backend.delete_prefix(prefix)
+        except Exception as e:
+            logger.warning(f"Prediction cache invalidation failed: {str(e)}")
+            return 0
+
+    def stats(self):
+        size = self.backend.size() if self.backend is not None else 0
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {"backend": PREDICTION_CACHE_BACKEND, "hits": hits, "misses": misses, "size": size}
+
+
+def inputs_key(budget_uuid):
+    return f"budget:{budget_uuid}:inputs"
+
+
+def result_key(budget_uuid, kind, *parts):
+    """Key of a finished result of a budget, e.g. result_key(uuid, "projection", days_ahead, date, simulations hash)."""
+    return ":".join([f"budget:{budget_uuid}:{kind}"] + [str(part) for part in parts])
+
+
+def user_key(auth_id):
+    return f"user:{auth_id}:profile"
+
+
+def fingerprint(value):
+    """Stable short hash of a JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """Return the process-wide prediction cache for the configured backend."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if PREDICTION_CACHE_BACKEND == 'redis':
+                backend = RedisCacheBackend()
+            elif PREDICTION_CACHE_BACKEND == 'none':
+                backend = None
+            else:
+                backend = MemoryCacheBackend()
+            _cache = PredictionCache(backend)
+        return _cache
@@ -0,0 +1,234 @@
+from app.budget_api import convert_objectid_to_str, BUDGET_FIELDS
+from app.categories_api import CATEGORY_FIELDS
+from app.accounts_api import ACCOUNT_FIELDS
+from app.db import get_DB
+from app.ynab_api import get_scheduled_transactions
+from app.prediction_cache import get_prediction_cache, inputs_key, result_key, fingerprint
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dotenv import load_dotenv
+import threading
+import logging
+import time
+import os
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Threads per process and per source (MongoDB, YNAB) that load the inputs of requests concurrently
+PREDICTION_INPUT_WORKERS = int(os.getenv('PREDICTION_INPUT_WORKERS', 8))
+# Seconds a request waits for each source, counted from the moment its load was started.
+# The YNAB fetch itself is cut off at the same deadline, retries included
+MONGO_INPUT_TIMEOUT = float(os.getenv('MONGO_INPUT_TIMEOUT', 10))
+YNAB_INPUT_TIMEOUT = float(os.getenv('YNAB_INPUT_TIMEOUT', 20))
+
+
+class InputLoadError(RuntimeError):
+    """Loading the inputs from one upstream source failed or timed out."""
+
+    def __init__(self, source, message, timed_out=False):
+        super().__init__(f"{source}: {message}")
+        self.source = source
+        self.timed_out = timed_out
+
+
+def budget_inputs_pipeline(budget_uuid):
+    """
+    Aggregation on localbudgets that resolves a budget by UUID and joins its
+    categories and accounts, projected to the fields the projection uses.
+    """
+    return [
+        {"$match": {"uuid": budget_uuid}},
+        {"$limit": 1},
+        {"$project": BUDGET_FIELDS},
+        {"$lookup": {
+            "from": "localcategories",
+            "localField": "_id",
+            "foreignField": "budgetId",
+            "pipeline": [{"$project": CATEGORY_FIELDS}],
+            "as": "categories",
+        }},
+        {"$lookup": {
+            "from": "localaccounts",
+            "localField": "_id",
+            "foreignField": "budgetId",
+            "pipeline": [{"$project": ACCOUNT_FIELDS}],
+            "as": "accounts",
+        }},
+    ]
+
+
+def load_budget_inputs(budget_uuid):
+    """
+    Fetch a budget with its categories and accounts in a single round trip.
+
+    Args:
+        budget_uuid: The UUID of the budget
+
+    Returns:
+        Dictionary with the budget document ("budget", ObjectIds kept for the
+        ownership check), its "categories" and "accounts" (ObjectIds converted
+        to strings) and a "version" fingerprint of that data, or None if the
+        budget does not exist
+    """
+    documents = list(get_DB().localbudgets.aggregate(budget_inputs_pipeline(budget_uuid)))
+    if not documents:
+        logger.warning(f"Budget with uuid {budget_uuid} not found in database")
+        return None
+
+    budget = documents[0]
+    categories = [convert_objectid_to_str(category) for category in budget.pop("categories", [])]
+    accounts = [convert_objectid_to_str(account) for account in budget.pop("accounts", [])]
+    return {
+        "budget": budget,
+        "categories": categories,
+        "accounts": accounts,
+        "version": fingerprint([categories, accounts]),
+    }
+
+
+def load_future_transactions(budget_uuid, deadline=None):
+    """
+    Fetch the scheduled transactions of a budget, giving up on YNAB at the deadline (see ynab_api.fetch).
+
+    Returns:
+        Dictionary with the "transactions" and a "version" fingerprint of them
+
+    Raises:
+        RuntimeError: When YNAB returned an error, so that it is never cached
+    """
+    result = get_scheduled_transactions(budget_uuid, deadline)
+    if isinstance(result, dict) and "error" in result:
+        raise RuntimeError(f"Error fetching scheduled transactions: {result['error']}")
+    return {"transactions": result, "version": fingerprint(result)}
+
+
+def get_budget_inputs(budget_uuid):
+    """Budget, categories and accounts of a budget, served from the prediction cache when possible."""
+    return get_prediction_cache().get_or_load(inputs_key(budget_uuid), lambda: load_budget_inputs(budget_uuid))
+
+
+def _get_future_transaction_entry(budget_uuid, deadline=None):
+    """Scheduled transactions of a budget and their "version", served from the prediction cache when possible."""
+    return get_prediction_cache().get_or_load(
+        result_key(budget_uuid, "future_transactions"), lambda: load_future_transactions(budget_uuid, deadline)
+    )
+
+
+_executors = {}
+_executors_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_input_executor(source):
+    """
+    Return the thread pool that loads prediction inputs from a source.
+
+    Every source has its own pool, so loads of a slow source that are still
+    running after their request timed out cannot keep the loads of the other
+    source waiting for a thread. The pools are recreated when the process id
+    changes, since threads do not survive a fork into a worker process.
+    """
+    global _executors, _executors_pid
+    pid = os.getpid()
+    with _executor_lock:
+        if _executors_pid != pid:
+            _executors = {}
+            _executors_pid = pid
+        if source not in _executors:
+            _executors[source] = ThreadPoolExecutor(
+                max_workers=PREDICTION_INPUT_WORKERS, thread_name_prefix=f"prediction-inputs-{source}"
+            )
+        return _executors[source]
+
+
+def reset_input_executor():
+    """Shut the input thread pools down; the next load creates new ones."""
+    global _executors, _executors_pid
+    with _executor_lock:
+        if _executors_pid == os.getpid():
+            for executor in _executors.values():
+                executor.shutdown(wait=False, cancel_futures=True)
+        _executors = {}
+        _executors_pid = None
+
+
+class InputLoad:
+    """A load of one upstream source running on the thread pool of that source."""
+
+    def __init__(self, source, loader, timeout, clock=time.monotonic):
+        self.source = source
+        self.timeout = timeout
+        self._clock = clock
+        self._deadline = clock() + timeout
+        self._future = get_input_executor(source).submit(loader)
+
+    def result(self):
+        """
+        Wait for the load until its deadline and return its result.
+
+        Raises:
+            InputLoadError: When the loader raised or did not finish in time
+        """
+        try:
+            return self._future.result(timeout=max(0.0, self._deadline - self._clock()))
+        except FutureTimeoutError:
+            # Only a load still waiting for a thread can be cancelled, a running one finishes in the background
+            self._future.cancel()
+            raise InputLoadError(self.source, f"timed out after {self.timeout:g}s", timed_out=True)
+        except InputLoadError:
+            raise
+        except Exception as e:
+            raise InputLoadError(self.source, str(e)) from e
+
+
+class PredictionInputs:
+    """
+    Budget inputs and scheduled transactions of a budget, loaded concurrently.
+
+    Both loads start on construction. Callers first wait for the MongoDB inputs
+    (to answer 404s and check ownership) while YNAB is still being fetched, and
+    only wait for the scheduled transactions when they need them, so the
+    latency is that of the slowest source instead of the sum of both.
+    """
+
+    def __init__(self, budget_uuid, mongo_timeout=None, ynab_timeout=None):
+        self.budget_uuid = budget_uuid
+        mongo_timeout = mongo_timeout if mongo_timeout is not None else MONGO_INPUT_TIMEOUT
+        ynab_timeout = ynab_timeout if ynab_timeout is not None else YNAB_INPUT_TIMEOUT
+        # The YNAB fetch gives up when the request stops waiting for it
+        ynab_deadline = time.monotonic() + ynab_timeout
+        self._budget = InputLoad("mongo", lambda: get_budget_inputs(budget_uuid), mongo_timeout)
+        self._future_transactions = InputLoad(
+            "ynab", lambda: _get_future_transaction_entry(budget_uuid, ynab_deadline), ynab_timeout
+        )
+
+    def budget_inputs(self):
+        """Same as get_budget_inputs, raises InputLoadError when MongoDB failed or timed out."""
+        return self._budget.result()
+
+    def future_transactions(self):
+        """Scheduled transactions of the budget, raises InputLoadError when YNAB failed or timed out."""
+        return self._future_transactions.result()["transactions"]
+
+    def future_transactions_version(self):
+        """Fingerprint of the scheduled transactions, raises InputLoadError when YNAB failed or timed out."""
+        return self._future_transactions.result()["version"]
+
+
+def load_inputs_concurrently(loaders):
+    """
+    Run independent input loaders concurrently and wait for all of them.
+
+    Args:
+        loaders: Dictionary mapping source names to (loader, timeout) tuples
+
+    Returns:
+        Dictionary mapping source names to the loader results
+
+    Raises:
+        InputLoadError: For the first source (in the order of loaders) that failed or timed out
+    """
+    loads = [InputLoad(source, loader, timeout) for source, (loader, timeout) in loaders.items()]
+    return {load.source: load.result() for load in loads}
@@ -0,0 +1,487 @@
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
+import logging
+import numpy as np
+from app.prediction_api import (
+    index_scheduled_amounts,
+    initial_balance_milliunits,
+    need_category_milliunits,
+    plan_need_category_spending,
+    scheduled_transaction_change,
+    simulation_milliunits,
+    to_milliunits,
+    to_units,
+    MILLIUNITS_PER_UNIT,
+)
+from app.recurrence import expand_scheduled_transactions
+from app.calendar_table import get_calendar_table
+
+logger = logging.getLogger(__name__)
+
+
+class ProjectionLedger:
+    """
+    Array-backed store of the changes in a balance projection.
+
+    Every change is recorded against an integer day offset from the start date
+    instead of an ISO date key, so the horizon never has to be materialized as
+    one dictionary entry per day. Amounts are kept as integer milliunits and
+    daily totals and running balances are exact int64 NumPy sums over the dense
+    day axis; they are only converted to regular units in to_projection. ISO
+    dates and the per-day dictionaries are only built for the days that
+    actually have changes, read from the shared calendar table of the horizon.
+    """
+
+    def __init__(self, start_date, days_ahead):
+        self.start_date = start_date
+        self.days_ahead = days_ahead
+        self.calendar = get_calendar_table(start_date, days_ahead)
+        self.offsets = []
+        self.amounts = []
+        self.changes = []
+        # What the baseline was built from, so roll_baseline_ledger can shift it to a later day:
+        # (transaction indexes, day offsets) of the scheduled occurrences and
+        # (category index, day offset, change, milliunits) of the NEED spending
+        self.scheduled_occurrences = None
+        self.need_entries = []
+
+    def offset_for(self, day):
+        """Return the day offset of a date, or None when it falls outside the horizon."""
+        offset = (day - self.start_date).days
+        if 0 <= offset <= self.days_ahead:
+            return offset
+        return None
+
+    def offset_for_iso(self, date_str):
+        """Return the day offset of an ISO date string, or None when it is not a projection day."""
+        try:
+            day = date.fromisoformat(date_str)
+        except (TypeError, ValueError):
+            return None
+        # Only canonical YYYY-MM-DD strings match a projection day
+        if day.isoformat() != date_str:
+            return None
+        return self.offset_for(day)
+
+    def offset_for_ordinal(self, ordinal):
+        """Return the day offset of a proleptic Gregorian ordinal, or None when it falls outside the horizon."""
+        offset = ordinal - self.start_date.toordinal()
+        if 0 <= offset <= self.days_ahead:
+            return offset
+        return None
+
+    def add(self, offset, change, milliunits=None):
+        """Record a change on the given day offset; milliunits defaults to the change amount."""
+        self.offsets.append(offset)
+        self.amounts.append(milliunits if milliunits is not None else to_milliunits(change["amount"]))
+        self.changes.append(change)
+
+    def add_many(self, offsets, amounts, changes):
+        """Record a batch of changes given as parallel sequences, amounts in milliunits."""
+        self.offsets.extend(offsets)
+        self.amounts.extend(amounts)
+        self.changes.extend(changes)
+
+    def daily_totals(self):
+        """Sum the changes per day into an int64 milliunit array covering the whole horizon."""
+        totals = np.zeros(self.days_ahead + 1, dtype=np.int64)
+        np.add.at(totals, np.asarray(self.offsets, dtype=np.int64), np.asarray(self.amounts, dtype=np.int64))
+        return totals
+
+    def changes_by_offset(self):
+        """Group the changes per day offset, in ascending offset and insertion order."""
+        order = np.argsort(np.asarray(self.offsets, dtype=np.int64), kind="stable")
+        changes_by_offset = OrderedDict()
+        for index in order.tolist():
+            changes_by_offset.setdefault(self.offsets[index], []).append(self.changes[index])
+        return changes_by_offset
+
+    def date_for(self, offset):
+        """Return the ISO date string of a day offset."""
+        return self.calendar.date_for(offset)
+
+    def to_projection(self, balance_diffs=None, changes_by_offset=None):
+        """
+        Materialize the ledger in the JSON shape of the projection endpoints.
+
+        Args:
+            balance_diffs: daily_totals() of the ledger when already computed
+            changes_by_offset: changes_by_offset() of the ledger when already computed
+
+        Returns:
+            OrderedDict mapping ISO dates to balance, balance_diff and changes,
+            containing only the days that have changes
+        """
+        balance_diffs = self.daily_totals() if balance_diffs is None else balance_diffs
+        changes_by_offset = self.changes_by_offset() if changes_by_offset is None else changes_by_offset
+        balances = np.cumsum(balance_diffs)
+
+        balance_list = (balances / MILLIUNITS_PER_UNIT).tolist()
+        balance_diff_list = (balance_diffs / MILLIUNITS_PER_UNIT).tolist()
+        projection = OrderedDict()
+        for offset, changes in changes_by_offset.items():
+            projection[self.date_for(offset)] = {
+                "balance": balance_list[offset],
+                "changes": changes,
+                "balance_diff": balance_diff_list[offset]
+            }
+        return projection
+
+
+def project_daily_balances_vectorized(accounts, categories, future_transactions, days_ahead=30, simulations=None,
+                                      today=None):
+    """
+    Project daily balances with detailed reasons for changes on a day-offset axis.
+
+    Produces the same output as project_daily_balances_with_reasons.
+
+    Args:
+        accounts: List of account objects with balances
+        categories: List of budget categories
+        future_transactions: List of scheduled future transactions
+        days_ahead: Number of days to project into the future
+        simulations: Optional list of simulation scenarios
+        today: Date the projection starts from (defaults to the current date)
+
+    Returns:
+        OrderedDict containing daily projections sorted by date
+    """
+    ledger = build_baseline_ledger(accounts, categories, future_transactions, days_ahead, today)
+    add_simulations_to_ledger(ledger, simulations)
+
+    return ledger.to_projection()
+
+
+def project_scenarios(accounts, categories, future_transactions, days_ahead, scenarios, today=None,
+                      baseline_ledger=None):
+    """
+    Project the baseline once and derive every simulation scenario from it.
+
+    Each scenario only adds its simulation changes to the baseline daily totals
+    and re-accumulates the running balance from its first affected day onward.
+    Days before that are shared with the baseline projection. A scenario that
+    fails is logged and left out of the result; a baseline that fails raises.
+
+    Args:
+        accounts: List of account objects with balances
+        categories: List of budget categories
+        future_transactions: List of scheduled future transactions
+        days_ahead: Number of days to project into the future
+        scenarios: Dictionary mapping scenario names to simulation lists (or None for the baseline)
+        today: Date the projection starts from (defaults to the current date)
+        baseline_ledger: Optional baseline ledger already built from these inputs
+            (e.g. a cached one), used instead of building it again
+
+    Returns:
+        OrderedDict mapping scenario names to projections, in the order of scenarios
+    """
+    return OrderedDict(iter_scenarios(
+        accounts, categories, future_transactions, days_ahead, scenarios, today, baseline_ledger
+    ))
+
+
+def iter_scenarios(accounts, categories, future_transactions, days_ahead, scenarios, today=None,
+                   baseline_ledger=None):
+    """
+    Generator version of project_scenarios.
+
+    Every scenario is computed only when the previous one has been consumed,
+    so a caller that streams the projections out holds one of them at a time.
+
+    Yields:
+        (scenario name, projection) tuples in the order of scenarios
+
+    Raises:
+        RuntimeError: If the baseline projection cannot be built
+    """
+    try:
+        ledger = baseline_ledger or build_baseline_ledger(accounts, categories, future_transactions, days_ahead, today)
+    except Exception as e:
+        # Every scenario depends on the baseline, so the whole projection fails instead of coming back empty
+        raise RuntimeError(f"Error processing baseline projection: {str(e)}") from e
+
+    baseline = BaselineProjection(ledger)
+    for scenario_name, simulations in scenarios.items():
+        try:
+            projection = baseline.with_simulations(simulations)
+        except Exception as e:
+            logger.warning(f"Error processing simulation '{scenario_name}': {str(e)}")
+            continue
+        yield scenario_name, projection
+
+
+class BaselineProjection:
+    """Materialized baseline projection that simulation scenarios are overlaid on."""
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self.balance_diffs = ledger.daily_totals()
+        self.balances = np.cumsum(self.balance_diffs)
+        self.changes_by_offset = ledger.changes_by_offset()
+        self.projection = ledger.to_projection(self.balance_diffs, self.changes_by_offset)
+
+    def with_simulations(self, simulations):
+        """
+        Overlay simulation changes on the baseline.
+
+        Returns:
+            OrderedDict in the same shape as the baseline projection
+        """
+        simulation_changes = simulation_changes_for_ledger(self.ledger, simulations)
+        if not simulation_changes:
+            return self.projection
+
+        balance_diffs = self.balance_diffs.copy()
+        changes_by_offset = {}
+        for offset, change, milliunits in simulation_changes:
+            balance_diffs[offset] += milliunits
+            changes_by_offset.setdefault(offset, []).append(change)
+
+        # Days before the first affected one keep their baseline balance
+        first_offset = min(changes_by_offset)
+        previous_balance = self.balances[first_offset - 1] if first_offset > 0 else 0
+        balances = previous_balance + np.cumsum(balance_diffs[first_offset:])
+
+        offsets = sorted(set(self.changes_by_offset) | set(changes_by_offset))
+        balance_list = (balances / MILLIUNITS_PER_UNIT).tolist()
+        balance_diff_list = (balance_diffs / MILLIUNITS_PER_UNIT).tolist()
+        projection = OrderedDict()
+        for offset in offsets:
+            date_str = self.ledger.date_for(offset)
+            if offset < first_offset:
+                projection[date_str] = self.projection[date_str]
+                continue
+            projection[date_str] = {
+                "balance": balance_list[offset - first_offset],
+                "changes": self.changes_by_offset.get(offset, []) + changes_by_offset.get(offset, []),
+                "balance_diff": balance_diff_list[offset]
+            }
+        return projection
+
+
+def build_baseline_ledger(accounts, categories, future_transactions, days_ahead, today=None):
+    """Build the ledger with the initial balance, scheduled transactions and NEED category spending."""
+    ledger = ProjectionLedger(today or datetime.now().date(), days_ahead)
+
+    add_initial_balance_to_ledger(ledger, accounts)
+    scheduled_amounts = add_future_transactions_to_ledger(ledger, future_transactions)
+    add_need_categories_to_ledger(ledger, categories, scheduled_amounts)
+    return ledger
+
+
+def roll_baseline_ledger(ledger, accounts, categories, future_transactions, today=None):
+    """
+    Shift a baseline ledger built on an earlier day to start today.
+
+    The inputs must be the ones the ledger was built from. Moving the start
+    forward only drops the past days and exposes new days at the end, so the
+    scheduled occurrences still ahead are shifted and only the new tail is
+    expanded. NEED spending is only re-planned for the new current month
+    (whose past scheduled transactions no longer count) and the months of
+    the new tail; the other months keep their planned spending. The result
+    equals build_baseline_ledger for today. When the ledger cannot be
+    shifted (it starts later, or today is beyond its horizon) the baseline is
+    built from scratch.
+
+    Returns:
+        ProjectionLedger starting today with the same days_ahead
+    """
+    today = today or datetime.now().date()
+    days_ahead = ledger.days_ahead
+    shift = (today - ledger.start_date).days
+    if shift == 0:
+        return ledger
+    if not 0 < shift <= days_ahead or ledger.scheduled_occurrences is None:
+        return build_baseline_ledger(accounts, categories, future_transactions, days_ahead, today)
+
+    rolled = ProjectionLedger(today, days_ahead)
+    add_initial_balance_to_ledger(rolled, accounts)
+
+    tail_start = days_ahead - shift + 1
+    months = [month for month in rolled.calendar.months if month.start_offset <= 0 or month.end_offset >= tail_start]
+
+    previous_indexes, previous_offsets = ledger.scheduled_occurrences
+    ahead = previous_offsets >= shift
+    tail_indexes, tail_offsets = expand_scheduled_transactions(
+        future_transactions, today + timedelta(days=tail_start), shift - 1
+    )
+    transaction_indexes = np.concatenate((previous_indexes[ahead], tail_indexes))
+    offsets = np.concatenate((previous_offsets[ahead] - shift, tail_offsets + tail_start))
+    order = np.lexsort((offsets, transaction_indexes))
+    scheduled_amounts = add_scheduled_occurrences_to_ledger(
+        rolled, future_transactions, transaction_indexes[order], offsets[order], months
+    )
+
+    replanned_months = {(month.year, month.month) for month in months}
+    need_entries = []
+    for category_index, offset, change, milliunits in ledger.need_entries:
+        offset -= shift
+        if offset < 0:
+            continue
+        month = rolled.calendar.month_containing(offset)
+        if (month.year, month.month) not in replanned_months:
+            need_entries.append((category_index, offset, change, milliunits))
+    need_entries.extend(plan_need_entries(rolled, categories, scheduled_amounts, months))
+    # Same order as a fresh build: per category, by date
+    need_entries.sort(key=lambda entry: (entry[0], entry[1]))
+    for entry in need_entries:
+        add_need_entry_to_ledger(rolled, entry)
+    return rolled
+
+
+def add_initial_balance_to_ledger(ledger, accounts):
+    """Add the total balance of the accounts on the first day."""
+    initial_balance = initial_balance_milliunits(accounts)
+    ledger.add(0, {
+        "reason": "Initial Balance",
+        "amount": to_units(initial_balance),
+        "category": "Starting Balance"
+    }, initial_balance)
+
+
+def add_future_transactions_to_ledger(ledger, future_transactions):
+    """
+    Add every occurrence of the scheduled future transactions to the ledger.
+
+    Returns:
+        Dictionary mapping (category name, year, month) to the absolute
+        scheduled milliunits of that category in that month
+    """
+    transaction_indexes, offsets = expand_scheduled_transactions(
+        future_transactions, ledger.start_date, ledger.days_ahead
+    )
+    return add_scheduled_occurrences_to_ledger(ledger, future_transactions, transaction_indexes, offsets)
+
+
+def add_scheduled_occurrences_to_ledger(ledger, future_transactions, transaction_indexes, offsets, months=None):
+    """
+    Add expanded scheduled transaction occurrences to the ledger.
+
+    Args:
+        ledger: ProjectionLedger to add to
+        future_transactions: List of scheduled transactions
+        transaction_indexes: Transaction index of every occurrence
+        offsets: Day offset of every occurrence
+        months: Optional CalendarMonths to limit the returned index to
+
+    Returns:
+        Dictionary mapping (category name, year, month) to the absolute
+        scheduled milliunits of that category in that month
+    """
+    ledger.scheduled_occurrences = (transaction_indexes, offsets)
+    if not len(offsets):
+        return {}
+
+    # One change per scheduled transaction, shared by all of its occurrences
+    transaction_changes = [scheduled_transaction_change(txn) for txn in future_transactions]
+    transaction_amounts = np.array([txn['amount'] for txn in future_transactions], dtype=np.int64)
+
+    index_list = transaction_indexes.tolist()
+    changes = [transaction_changes[index] for index in index_list]
+    amounts = transaction_amounts[transaction_indexes].tolist()
+    offset_list = offsets.tolist()
+    ledger.add_many(offset_list, amounts, changes)
+
+    if months is not None:
+        in_months = np.zeros(ledger.days_ahead + 1, dtype=bool)
+        for month in months:
+            in_months[max(0, month.start_offset):month.end_offset + 1] = True
+        selected = np.flatnonzero(in_months[offsets]).tolist()
+        changes = [changes[position] for position in selected]
+        amounts = [amounts[position] for position in selected]
+        offset_list = [offset_list[position] for position in selected]
+
+    dates = ledger.calendar.dates
+    return index_scheduled_amounts(
+        (dates[offset], change["category"], amount) for offset, change, amount in zip(offset_list, changes, amounts)
+    )
+
+
+def add_need_categories_to_ledger(ledger, categories, scheduled_amounts):
+    """Plan the spending of all NEED categories and add it to the ledger."""
+    for entry in plan_need_entries(ledger, categories, scheduled_amounts):
+        add_need_entry_to_ledger(ledger, entry)
+
+
+def plan_need_entries(ledger, categories, scheduled_amounts, months=None):
+    """
+    Plan the spending of all NEED categories inside the ledger's horizon.
+
+    Args:
+        ledger: ProjectionLedger whose horizon is planned
+        categories: List of budget categories
+        scheduled_amounts: (category name, year, month) -> scheduled milliunits index
+        months: Optional CalendarMonths to plan (defaults to every month of the horizon)
+
+    Yields:
+        (category index, day offset, change, milliunits) tuples
+    """
+    for category_index, category in enumerate(categories):
+        target = category.get("target")
+        if not target or target.get("goal_type") != "NEED":
+            continue
+
+        category_name = category["name"]
+        current_balance, target_amount, global_overall_left = need_category_milliunits(category, target)
+
+        def scheduled_amount_for_month(year, month):
+            return scheduled_amounts.get((category_name, year, month), 0)
+
+        for offset, amount, reason in plan_need_category_spending(
+            target,
+            current_balance,
+            target_amount,
+            ledger.days_ahead,
+            global_overall_left,
+            scheduled_amount_for_month,
+            calendar_table=ledger.calendar,
+            months=months
+        ):
+            if 0 <= offset <= ledger.days_ahead:
+                yield category_index, offset, {
+                    "reason": reason,
+                    "amount": to_units(-amount),  # Negative for expenses
+                    "category": category_name
+                }, -amount
+
+
+def add_need_entry_to_ledger(ledger, entry):
+    """Add a planned NEED spending entry to the ledger."""
+    category_index, offset, change, milliunits = entry
+    ledger.need_entries.append(entry)
+    ledger.add(offset, change, milliunits)
+
+
+def add_simulations_to_ledger(ledger, simulations):
+    """Add simulation scenarios to the ledger."""
+    for offset, change, milliunits in simulation_changes_for_ledger(ledger, simulations):
+        ledger.add(offset, change, milliunits)
+
+
+def simulation_changes_for_ledger(ledger, simulations):
+    """
+    Convert simulation entries to changes on the ledger's day axis.
+
+    Returns:
+        List of (day offset, change, milliunits) tuples for the simulations inside the horizon
+    """
+    if not simulations:
+        return []
+
+    simulation_changes = []
+    for sim in simulations:
+        # Simulations from the registry carry their day ordinal, others are parsed here
+        ordinal = sim.get("ordinal")
+        offset = ledger.offset_for_ordinal(ordinal) if ordinal is not None else ledger.offset_for_iso(sim["date"])
+        sim_milliunits = simulation_milliunits(sim)
+        sim_reason = sim.get("reason", "Simulation")
+        sim_category = sim.get("category", "Miscellaneous")
+
+        if offset is not None:
+            simulation_changes.append((offset, {
+                "amount": to_units(sim_milliunits),
+                "category": sim_category,
+                "reason": sim_reason,
+                "is_simulation": True
+            }, sim_milliunits))
+    return simulation_changes
@@ -0,0 +1,144 @@
+from datetime import date
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# YNAB scheduled transaction frequencies that repeat every fixed number of days
+FREQUENCY_DAYS = {
+    "daily": 1,
+    "weekly": 7,
+    "everyOtherWeek": 14,
+    "every4Weeks": 28,
+}
+# Frequencies that repeat every number of months on the same day of the month
+FREQUENCY_MONTHS = {
+    "monthly": 1,
+    "everyOtherMonth": 2,
+    "every3Months": 3,
+    "every4Months": 4,
+    "twiceAYear": 6,
+    "yearly": 12,
+    "everyOtherYear": 24,
+}
+# twiceAMonth repeats monthly on the day of date_first and on the day half a month away from it
+TWICE_A_MONTH = "twiceAMonth"
+HALF_MONTH_DAYS = 15
+ONCE_FREQUENCIES = {None, "never"}
+
+
+def expand_scheduled_transactions(future_transactions, start_date, days_ahead):
+    """
+    Expand YNAB scheduled transactions into all their occurrences inside the horizon.
+
+    A transaction first occurs on `date_next` and then repeats according to
+    its `frequency`. Month based frequencies keep the day of month of
+    `date_first` (limited to the length of shorter months). Occurrences before
+    start_date are skipped; a one-off transaction dated before it is dropped.
+    The occurrences of all transactions are generated at once as day offset
+    arrays, without a Python loop per occurrence.
+
+    Args:
+        future_transactions: List of scheduled transactions
+        start_date: Date of day offset 0
+        days_ahead: Last day offset of the horizon
+
+    Returns:
+        Tuple of (transaction indexes, day offsets) int64 arrays, ordered by
+        transaction and then by date
+    """
+    start = np.datetime64(start_date, "D")
+    day_series = ([], [], [], [])  # transaction index, first offset, step in days, recurring
+    month_series = ([], [], [], [], [])  # transaction index, first offset, step in months, day of month, is date_next
+
+    for index, txn in enumerate(future_transactions):
+        next_date = date.fromisoformat(txn["date_next"][:10])
+        first_offset = (next_date - start_date).days
+        frequency = txn.get("frequency")
+
+        if frequency in FREQUENCY_DAYS:
+            _append(day_series, index, first_offset, FREQUENCY_DAYS[frequency], True)
+        elif frequency in FREQUENCY_MONTHS or frequency == TWICE_A_MONTH:
+            anchor_day = date.fromisoformat((txn.get("date_first") or txn["date_next"])[:10]).day
+            if frequency == TWICE_A_MONTH:
+                other_day = anchor_day + HALF_MONTH_DAYS if anchor_day <= HALF_MONTH_DAYS else anchor_day - HALF_MONTH_DAYS
+                # date_next is the occurrence on the nearer of the two days; the other day still occurs in its month
+                next_on_anchor = abs(next_date.day - anchor_day) <= abs(next_date.day - other_day)
+                _append(month_series, index, first_offset, 1, anchor_day, next_on_anchor)
+                _append(month_series, index, first_offset, 1, other_day, not next_on_anchor)
+            else:
+                _append(month_series, index, first_offset, FREQUENCY_MONTHS[frequency], anchor_day, True)
+        else:
+            if frequency not in ONCE_FREQUENCIES:
+                logger.warning(f"Unknown frequency '{frequency}' of scheduled transaction {txn.get('id', '')}, placed once")
+            _append(day_series, index, first_offset, 1, False)
+
+    day_indexes, day_offsets = _expand_day_series(day_series, days_ahead)
+    month_indexes, month_offsets = _expand_month_series(month_series, start, days_ahead)
+
+    transaction_indexes = np.concatenate((day_indexes, month_indexes))
+    offsets = np.concatenate((day_offsets, month_offsets))
+    order = np.lexsort((offsets, transaction_indexes))
+    return transaction_indexes[order], offsets[order]
+
+
+def _append(series, *values):
+    for column, value in zip(series, values):
+        column.append(value)
+
+
+def _repeat_series(counts):
+    """
+    Enumerate the occurrences of series with the given occurrence counts.
+
+    Returns:
+        Tuple of (series index, occurrence number within the series) arrays
+    """
+    series = np.repeat(np.arange(len(counts)), counts)
+    series_starts = np.cumsum(counts) - counts
+    occurrence = np.arange(int(counts.sum())) - np.repeat(series_starts, counts)
+    return series, occurrence
+
+
+def _expand_day_series(day_series, days_ahead):
+    indexes, first_offsets, steps, recurring = (np.asarray(column, dtype=np.int64) for column in day_series)
+    recurring = recurring.astype(bool)
+
+    # Skip the occurrences of recurring transactions that are already in the past
+    skipped = np.where(recurring & (first_offsets < 0), -(first_offsets // steps), 0)
+    first_offsets = first_offsets + skipped * steps
+
+    counts = np.where(first_offsets <= days_ahead, (days_ahead - first_offsets) // steps + 1, 0)
+    counts = np.where(recurring, counts, (first_offsets >= 0) & (first_offsets <= days_ahead)).astype(np.int64)
+    counts = np.maximum(counts, 0)
+
+    series, occurrence = _repeat_series(counts)
+    return indexes[series], first_offsets[series] + occurrence * steps[series]
+
+
+def _expand_month_series(month_series, start, days_ahead):
+    indexes, first_offsets, steps, anchor_days, is_next = (np.asarray(column, dtype=np.int64) for column in month_series)
+    is_next = is_next.astype(bool)
+    if not len(indexes):
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    # Months are counted as numpy month numbers (months since 1970-01)
+    first_months = (start + first_offsets).astype("datetime64[M]").astype(np.int64)
+    last_month = (start + days_ahead).astype("datetime64[M]").astype(np.int64)
+    counts = np.maximum((last_month - first_months) // steps + 1, 0)
+
+    series, occurrence = _repeat_series(counts)
+    months = (first_months[series] + occurrence * steps[series]).astype("datetime64[M]")
+    month_starts = months.astype("datetime64[D]")
+    days_in_month = ((months + 1).astype("datetime64[D]") - month_starts).astype(np.int64)
+    days = month_starts + (np.minimum(anchor_days[series], days_in_month) - 1)
+    offsets = (days - start).astype(np.int64)
+
+    # The first occurrence is date_next itself, even when it was moved away from the usual day
+    first_occurrence = is_next[series] & (occurrence == 0)
+    offsets = np.where(first_occurrence, first_offsets[series], offsets)
+    after_next = np.where(is_next[series], offsets >= first_offsets[series], offsets > first_offsets[series])
+
+    keep = after_next & (offsets >= 0) & (offsets <= days_ahead)
+    return indexes[series][keep], offsets[keep]
@@ -0,0 +1,137 @@
+from collections import OrderedDict
+import threading
+import logging
+import os
+from dotenv import load_dotenv
+from app.db import get_DB
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Where synced scheduled transactions are kept: "memory" (per process) or "mongo" (shared by all workers)
+SCHEDULED_TRANSACTION_STORE = os.getenv('SCHEDULED_TRANSACTION_STORE', 'memory')
+SCHEDULED_TRANSACTION_COLLECTION = 'ynabscheduledtransactions'
+
+
+class MemoryScheduledTransactionStore:
+    """Per-process store of the synced scheduled transactions of each budget."""
+
+    def __init__(self):
+        self._budgets = {}
+        self._lock = threading.Lock()
+
+    def get(self, budget_uuid):
+        """
+        Return the stored state of a budget.
+
+        Returns:
+            Tuple of (server_knowledge, OrderedDict of transactions by id), or
+            (None, empty OrderedDict) when the budget was never synced
+        """
+        with self._lock:
+            server_knowledge, transactions = self._budgets.get(budget_uuid, (None, OrderedDict()))
+            return server_knowledge, OrderedDict(transactions)
+
+    def put(self, budget_uuid, server_knowledge, transactions):
+        with self._lock:
+            self._budgets[budget_uuid] = (server_knowledge, OrderedDict(transactions))
+
+    def advance_server_knowledge(self, budget_uuid, previous_knowledge, server_knowledge):
+        """Move a budget to a newer server_knowledge without changes, if it is still at previous_knowledge."""
+        with self._lock:
+            stored = self._budgets.get(budget_uuid)
+            if stored is not None and stored[0] == previous_knowledge:
+                self._budgets[budget_uuid] = (server_knowledge, stored[1])
+
+    def clear(self, budget_uuid=None):
+        with self._lock:
+            if budget_uuid is None:
+                self._budgets.clear()
+            else:
+                self._budgets.pop(budget_uuid, None)
+
+
+class MongoScheduledTransactionStore:
+    """
+    Store of synced scheduled transactions shared by all workers, one document per budget.
+
+    The transactions and the server knowledge they correspond to are written
+    together, so a concurrent writer can at worst leave an older, consistent
+    state behind; the next delta request then simply catches up from there.
+    """
+
+    def __init__(self, collection_name=SCHEDULED_TRANSACTION_COLLECTION):
+        self.collection_name = collection_name
+
+    def _collection(self):
+        return get_DB()[self.collection_name]
+
+    def get(self, budget_uuid):
+        document = self._collection().find_one({"budgetId": budget_uuid}, {"_id": 0})
+        if not document:
+            return None, OrderedDict()
+        transactions = OrderedDict((txn["id"], txn) for txn in document.get("transactions", []))
+        return document.get("serverKnowledge"), transactions
+
+    def put(self, budget_uuid, server_knowledge, transactions):
+        self._collection().replace_one(
+            {"budgetId": budget_uuid},
+            {
+                "budgetId": budget_uuid,
+                "serverKnowledge": server_knowledge,
+                "transactions": list(transactions.values()),
+            },
+            upsert=True
+        )
+
+    def advance_server_knowledge(self, budget_uuid, previous_knowledge, server_knowledge):
+        """
+        Move a budget to a newer server_knowledge without rewriting its transactions.
+
+        Only applies while the document is still at previous_knowledge, so it
+        never relabels transactions another worker wrote in the meantime.
+        """
+        self._collection().update_one(
+            {"budgetId": budget_uuid, "serverKnowledge": previous_knowledge},
+            {"$set": {"serverKnowledge": server_knowledge}}
+        )
+
+    def clear(self, budget_uuid=None):
+        query = {} if budget_uuid is None else {"budgetId": budget_uuid}
+        self._collection().delete_many(query)
+
+
+_store = None
+
+
+def get_scheduled_transaction_store():
+    """Return the process-wide scheduled transaction store."""
+    global _store
+    if _store is None:
+        if SCHEDULED_TRANSACTION_STORE == 'mongo':
+            _store = MongoScheduledTransactionStore()
+        else:
+            _store = MemoryScheduledTransactionStore()
+    return _store
+
+
+def apply_scheduled_transaction_delta(transactions, delta):
+    """
+    Merge a delta of scheduled transactions into the stored ones.
+
+    Args:
+        transactions: OrderedDict of stored transactions by id, updated in place
+        delta: Scheduled transactions returned by YNAB; entries with `deleted`
+            set are tombstones and remove the stored transaction
+
+    Returns:
+        The updated OrderedDict
+    """
+    for txn in delta:
+        if txn.get("deleted"):
+            transactions.pop(txn["id"], None)
+        else:
+            transactions[txn["id"]] = txn
+    return transactions
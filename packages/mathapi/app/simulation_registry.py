@@ -0,0 +1,160 @@
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import hashlib
+import logging
+import math
+import json
+import time
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BASELINE_SCENARIO = "Actual Balance"
+# Seconds between checks of the simulation files for changes
+SIMULATION_RELOAD_INTERVAL = float(os.getenv('SIMULATION_RELOAD_INTERVAL', 2))
+
+
+def normalize_simulation(entries):
+    """
+    Validate a simulation and convert it to the form the engines use.
+
+    Every entry gets a float amount, a canonical ISO date, its day ordinal
+    (date.toordinal(), from which the engines derive the day offset without
+    parsing) and the default reason and category.
+
+    Args:
+        entries: List of simulation entries with "date" and "amount"
+
+    Returns:
+        List of normalized entries
+
+    Raises:
+        ValueError: When the simulation is not a list or an entry is invalid
+    """
+    if not isinstance(entries, list):
+        raise ValueError("A simulation must be a list of entries")
+
+    normalized = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Simulation entry {index} must be an object")
+        try:
+            sim_date = datetime.strptime(str(entry["date"]), '%Y-%m-%d').date()
+        except (KeyError, ValueError):
+            raise ValueError(f"Simulation entry {index} needs a date in YYYY-MM-DD format")
+        try:
+            amount = float(entry["amount"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Simulation entry {index} needs a numeric amount")
+        if not math.isfinite(amount):
+            raise ValueError(f"Simulation entry {index} needs a finite amount")
+
+        normalized.append({
+            "date": sim_date.isoformat(),
+            "ordinal": sim_date.toordinal(),
+            "amount": amount,
+            "reason": entry.get("reason", "Simulation"),
+            "category": entry.get("category", "Miscellaneous"),
+        })
+    return normalized
+
+
+class SimulationRegistry:
+    """
+    Simulations of a folder of JSON files, parsed and validated once.
+
+    The folder is checked at most every `reload_interval` seconds and only
+    reloaded when a file was added, removed or its mtime or size changed.
+    Invalid files are logged and left out.
+    """
+
+    def __init__(self, folder_path, reload_interval=SIMULATION_RELOAD_INTERVAL, clock=time.monotonic):
+        self.folder_path = folder_path
+        self.reload_interval = reload_interval
+        self._clock = clock
+        self._signature = None
+        self._checked_at = None
+        self._scenarios = OrderedDict([(BASELINE_SCENARIO, None)])
+        self._version = None
+        self._lock = threading.Lock()
+
+    def scenarios(self):
+        """
+        Return the baseline and all simulations by name.
+
+        The returned dictionary is shared, callers must not modify it.
+        """
+        self._refresh()
+        return self._scenarios
+
+    @property
+    def version(self):
+        """Content hash of the loaded simulations, identical across processes."""
+        self._refresh()
+        return self._version
+
+    def snapshot(self):
+        """Return (version, scenarios) as one consistent pair."""
+        self._refresh()
+        with self._lock:
+            return self._version, self._scenarios
+
+    def _refresh(self):
+        now = self._clock()
+        if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+                return
+            self._checked_at = now
+            signature = self._folder_signature()
+            if signature != self._signature:
+                self._load(signature)
+
+    def _folder_signature(self):
+        if not os.path.isdir(self.folder_path):
+            return ()
+        signature = []
+        with os.scandir(self.folder_path) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    stat = entry.stat()
+                    signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(signature))
+
+    def _load(self, signature):
+        if not os.path.isdir(self.folder_path):
+            logger.warning(f"Simulation folder not found: {self.folder_path}")
+
+        scenarios = OrderedDict([(BASELINE_SCENARIO, None)])  # Treat the baseline as a default simulation
+        for file_name, _, _ in signature:
+            file_path = os.path.join(self.folder_path, file_name)
+            try:
+                with open(file_path, "r") as file:
+                    scenarios[file_name] = normalize_simulation(json.load(file))
+            except Exception as e:
+                logger.warning(f"Failed to load simulation file {file_name}: {str(e)}")
+
+        encoded = json.dumps(scenarios, sort_keys=True, separators=(",", ":")).encode()
+        self._version = hashlib.sha256(encoded).hexdigest()[:16]
+        self._scenarios = scenarios
+        self._signature = signature
+        logger.info(f"Loaded {len(scenarios) - 1} simulations (version {self._version})")
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_simulation_registry(folder_name="simulations"):
+    """Return the process-wide registry of a simulations folder next to this module."""
+    with _registries_lock:
+        if folder_name not in _registries:
+            base_dir = os.path.dirname(os.path.abspath(__file__))
+            _registries[folder_name] = SimulationRegistry(os.path.join(base_dir, folder_name))
+        return _registries[folder_name]
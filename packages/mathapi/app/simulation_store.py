@@ -0,0 +1,166 @@
+from collections import OrderedDict
+from datetime import datetime, date, timedelta
+import logging
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.db import get_DB
+from app.prediction_api import to_units
+from app.prediction_cache import get_prediction_cache, result_key, fingerprint
+from app.simulation_registry import normalize_simulation
+
+logger = logging.getLogger(__name__)
+
+# Collection of the Simulation model of the Node API
+SIMULATION_COLLECTION = 'simulations'
+SIMULATION_FIELDS = {"_id": 1, "name": 1, "isActive": 1, "categoryChanges": 1}
+
+
+def parse_simulation_ids(value):
+    """
+    Split a comma separated simulation_ids parameter.
+
+    Returns:
+        Tuple of (list of ObjectIds of stored simulations, list of other names such
+        as simulation file names), or (None, None) when no ids were given
+    """
+    if not value:
+        return None, None
+    object_ids, names = [], []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            object_ids.append(ObjectId(item))
+        except (InvalidId, TypeError):
+            names.append(item)
+    return object_ids, names
+
+
+def find_budget_simulations(budget_id, simulation_ids=None):
+    """
+    Fetch the stored simulations of a budget.
+
+    Without simulation_ids the active simulations are returned, served by the
+    (budgetId, isActive) index; with ids only those simulations of the budget.
+
+    Args:
+        budget_id: ObjectId (or its string) of the budget
+        simulation_ids: Optional list of simulation ObjectIds
+
+    Returns:
+        List of simulation documents
+    """
+    query = {"budgetId": ObjectId(budget_id)}
+    if simulation_ids is None:
+        query["isActive"] = True
+    else:
+        if not simulation_ids:
+            return []
+        query["_id"] = {"$in": simulation_ids}
+    return list(get_DB()[SIMULATION_COLLECTION].find(query, SIMULATION_FIELDS))
+
+
+def get_budget_simulations(budget_uuid, budget_id, simulation_ids=None):
+    """
+    Stored simulations of a budget, served from the prediction cache when possible.
+
+    They are cached under the keys of the budget, so invalidating the budget
+    also drops its simulations.
+
+    Args:
+        budget_uuid: UUID of the budget
+        budget_id: ObjectId (or its string) of the budget
+        simulation_ids: Optional list of simulation ObjectIds (defaults to the active simulations)
+
+    Returns:
+        Dictionary with the "simulations" documents and a "version" fingerprint of them
+    """
+    selection = "active" if simulation_ids is None else fingerprint(sorted(str(_id) for _id in simulation_ids))
+
+    def load():
+        simulations = find_budget_simulations(budget_id, simulation_ids)
+        return {"simulations": simulations, "version": fingerprint(simulations)}
+
+    return get_prediction_cache().get_or_load(result_key(budget_uuid, "simulations", selection), load)
+
+
+def simulation_entries(simulation, categories, today, days_ahead):
+    """
+    Convert the category changes of a stored simulation to simulation entries.
+
+    A category change sets the monthly amount of a category to `targetAmount`
+    (regular units) between its start and end date. Every month in that range,
+    limited to the projection horizon, gets one entry with the difference
+    from the category's own goal target, dated on the first day of the month
+    (or the start date in the first month).
+
+    Returns:
+        List of normalized simulation entries
+    """
+    categories_by_uuid = {category.get("uuid"): category for category in categories}
+    horizon_end = today + timedelta(days=days_ahead)
+    entries = []
+    for change in simulation.get("categoryChanges", []):
+        category = categories_by_uuid.get(change.get("categoryUuid"))
+        if category is None:
+            logger.warning(f"Simulation '{simulation.get('name')}' refers to unknown category {change.get('categoryUuid')}")
+            continue
+
+        target = category.get("target") or {}
+        # goal_target is in milliunits, targetAmount in regular units
+        current_amount = to_units(target.get("goal_target") or 0)
+        difference = current_amount - float(change.get("targetAmount") or 0)
+        if difference == 0:
+            continue
+
+        start = max(_as_date(change.get("startDate")) or today, today)
+        end = min(_as_date(change.get("endDate")) or horizon_end, horizon_end)
+        day = start
+        while day <= end:
+            entries.append({
+                "date": day.isoformat(),
+                "amount": difference,
+                "reason": f"Simulation: {simulation.get('name')}",
+                "category": category.get("name", "Miscellaneous"),
+            })
+            day = (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return normalize_simulation(entries)
+
+
+def load_stored_scenarios(simulations, categories, days_ahead, scenarios=None, today=None):
+    """
+    Convert stored simulations of a budget to scenarios for the projection engines.
+
+    Args:
+        simulations: Simulation documents, see get_budget_simulations
+        categories: Categories of the budget
+        days_ahead: Number of days to project into the future
+        scenarios: Optional OrderedDict the scenarios are added to, names already
+            in use get the simulation id appended
+        today: Date the projection starts from (defaults to the current date)
+
+    Returns:
+        OrderedDict mapping scenario names to simulation entries
+    """
+    today = today or datetime.now().date()
+    scenarios = scenarios if scenarios is not None else OrderedDict()
+    for simulation in simulations:
+        name = simulation.get("name") or str(simulation["_id"])
+        if name in scenarios:
+            name = f"{name} ({simulation['_id']})"
+        try:
+            scenarios[name] = simulation_entries(simulation, categories, today, days_ahead)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Skipping invalid simulation '{name}': {str(e)}")
+    return scenarios
+
+
+def _as_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00')).date()
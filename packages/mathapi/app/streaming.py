@@ -0,0 +1,78 @@
+import logging
+from flask import Response
+from app.json_provider import encode
+
+logger = logging.getLogger(__name__)
+
+STREAM_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+# Encoded days are buffered up to this many characters before a chunk is sent
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_object(projections, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Encode projections as one JSON object {scenario: {date: day}}, in chunks.
+
+    Each scenario is encoded day by day as soon as the projections iterable
+    yields it, so neither all projections nor the whole string are ever held
+    in memory.
+
+    Args:
+        projections: Iterable of (scenario name, projection) tuples
+
+    Yields:
+        String chunks of the JSON document
+    """
+    parts = ["{"]
+    size = 1
+    first_scenario = True
+    for scenario_name, projection in projections:
+        parts.append(("" if first_scenario else ",") + _dumps(scenario_name) + ":{")
+        first_scenario = False
+        first_day = True
+        for day, day_entry in projection.items():
+            encoded = ("" if first_day else ",") + _dumps(day) + ":" + _dumps(day_entry)
+            first_day = False
+            parts.append(encoded)
+            size += len(encoded)
+            if size >= chunk_size:
+                yield "".join(parts)
+                parts = []
+                size = 0
+        parts.append("}")
+    parts.append("}")
+    yield "".join(parts)
+
+
+def iter_ndjson(projections):
+    """
+    Encode projections as newline delimited JSON, one line per scenario.
+
+    Yields:
+        Lines of the form {"scenario": name, "projection": {date: day}}
+    """
+    for scenario_name, projection in projections:
+        yield _dumps({"scenario": scenario_name, "projection": projection}) + "\n"
+
+
+def _dumps(value):
+    return encode(value).decode()
+
+
+def stream_projections(projections, stream_format):
+    """
+    Build a streamed Flask response for projections.
+
+    Args:
+        projections: Iterable of (scenario name, projection) tuples, typically a
+            generator that computes each scenario on demand
+        stream_format: "json" or "ndjson"
+    """
+    if stream_format == "ndjson":
+        body = iter_ndjson(projections)
+    else:
+        body = iter_json_object(projections)
+    return Response(body, mimetype=STREAM_FORMATS[stream_format])
@@ -0,0 +1,35 @@
+import pytest
+from app import app as app_module
+from app.app import days_ahead_param
+from app.prediction_api import MAX_DAYS_AHEAD
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("", 300),
+    ("?days_ahead=0", 0),
+    (f"?days_ahead={MAX_DAYS_AHEAD}", MAX_DAYS_AHEAD),
+])
+def test_days_ahead_param_accepts_the_horizon_range(query, expected):
+    with app_module.app.test_request_context(f"/balance-prediction/data{query}"):
+        assert days_ahead_param(300) == expected
+
+
+@pytest.mark.parametrize("query", ["?days_ahead=-1", f"?days_ahead={MAX_DAYS_AHEAD + 1}", "?days_ahead=ten"])
+def test_days_ahead_param_rejects_values_out_of_range(query):
+    with app_module.app.test_request_context(f"/balance-prediction/data{query}"):
+        with pytest.raises(ValueError):
+            days_ahead_param(300)
+
+
+def test_days_ahead_param_minimum():
+    with app_module.app.test_request_context("/balance-prediction/distribution?days_ahead=0"):
+        with pytest.raises(ValueError):
+            days_ahead_param(365, minimum=1)
+
+
+def test_interactive_prediction_rejects_negative_days_ahead(monkeypatch):
+    monkeypatch.setattr(app_module, "PredictionInputs", pytest.fail)
+
+    response = app_module.app.test_client().get("/balance-prediction/interactive?budget_id=budget-1&days_ahead=-1")
+
+    assert response.status_code == 400
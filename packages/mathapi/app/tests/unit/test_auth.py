@@ -0,0 +1,209 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from flask import Flask, jsonify, request
+from jwt.algorithms import RSAAlgorithm
+from app import auth
+from app.auth import JWKSCache, VerifiedTokenCache, requires_auth
+
+
+def _rsa_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_key, jwk
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope="module")
+def signing_keys():
+    return {kid: _rsa_key(kid) for kid in ("key-1", "key-2")}
+
+
+@pytest.fixture
+def jwks_server(signing_keys):
+    """Local JWKS endpoint serving the keys listed in `state["kids"]`."""
+    state = {"kids": ["key-1"], "requests": 0, "fail": False}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            if state["fail"]:
+                self.send_response(503)
+                self.end_headers()
+                return
+            body = json.dumps({"keys": [signing_keys[kid][1] for kid in state["kids"]]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}/.well-known/jwks.json"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_jwks_cache_reuses_keys_within_ttl(jwks_server):
+    clock = FakeClock()
+    cache = JWKSCache(jwks_server["url"], ttl=60, clock=clock)
+
+    first = cache.get_key("key-1")
+    clock.now += 30
+    second = cache.get_key("key-1")
+
+    assert first is second
+    assert jwks_server["requests"] == 1
+
+
+def test_jwks_cache_refetches_unknown_kid_rate_limited(jwks_server):
+    clock = FakeClock()
+    cache = JWKSCache(jwks_server["url"], ttl=600, min_refetch_interval=30, clock=clock)
+    cache.get_key("key-1")
+
+    # Key rotation: the new kid is fetched once the refetch interval has passed
+    jwks_server["kids"] = ["key-1", "key-2"]
+    with pytest.raises(jwt.InvalidTokenError):
+        cache.get_key("key-2")
+    assert jwks_server["requests"] == 1
+
+    clock.now += 31
+    assert cache.get_key("key-2") is not None
+    assert jwks_server["requests"] == 2
+
+    with pytest.raises(jwt.InvalidTokenError):
+        cache.get_key("unknown")
+    assert jwks_server["requests"] == 2
+
+
+def test_jwks_cache_serves_stale_keys_when_refresh_fails(jwks_server):
+    clock = FakeClock()
+    cache = JWKSCache(jwks_server["url"], ttl=60, max_stale=600, min_refetch_interval=0, clock=clock)
+    key = cache.get_key("key-1")
+
+    jwks_server["fail"] = True
+    clock.now += 120
+    with pytest.raises(Exception):
+        cache.refresh()
+    assert cache.get_key("key-1") is key
+
+    # Past the maximum staleness the keys are no longer trusted
+    clock.now += 600
+    with pytest.raises(Exception):
+        cache.get_key("key-1")
+
+
+def test_jwks_cache_refreshes_in_background_after_ttl(jwks_server):
+    clock = FakeClock()
+    cache = JWKSCache(jwks_server["url"], ttl=60, min_refetch_interval=0, clock=clock)
+    cache.get_key("key-1")
+
+    jwks_server["kids"] = ["key-2"]
+    clock.now += 61
+    # The expired key is still served while the refresh runs
+    assert cache.get_key("key-1") is not None
+    for thread in threading.enumerate():
+        if thread.name == "jwks-refresh":
+            thread.join(timeout=5)
+
+    assert jwks_server["requests"] == 2
+    assert cache.get_key("key-2") is not None
+
+
+@pytest.fixture
+def protected_app(jwks_server, monkeypatch):
+    monkeypatch.setenv("AUTH0_DOMAIN", "tenant.example.com")
+    monkeypatch.setenv("AUTH0_AUDIENCE", "https://api.example.com")
+    cache = JWKSCache(jwks_server["url"])
+    monkeypatch.setattr(auth, "get_jwks_cache", lambda: cache)
+    token_cache = VerifiedTokenCache()
+    monkeypatch.setattr(auth, "get_token_cache", lambda: token_cache)
+
+    app = Flask(__name__)
+
+    @app.route("/protected")
+    @requires_auth
+    def protected():
+        return jsonify(request.auth["payload"])
+
+    return app.test_client()
+
+
+def _token(signing_keys, kid, **claims):
+    payload = {
+        "sub": "auth0|user",
+        "aud": "https://api.example.com",
+        "iss": "https://tenant.example.com/",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+    }
+    payload.update(claims)
+    return jwt.encode(payload, signing_keys[kid][0], algorithm="RS256", headers={"kid": kid})
+
+
+def test_requires_auth_verifies_token_with_cached_jwks(protected_app, signing_keys, jwks_server):
+    token = _token(signing_keys, "key-1")
+
+    for _ in range(3):
+        response = protected_app.get("/protected", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert response.get_json()["sub"] == "auth0|user"
+
+    assert jwks_server["requests"] == 1
+
+
+def test_requires_auth_rejects_token_signed_with_unknown_key(protected_app, signing_keys):
+    token = _token(signing_keys, "key-2")
+
+    response = protected_app.get("/protected", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 401
+
+
+def test_verified_token_cache_expires_and_evicts():
+    clock = FakeClock()
+    cache = VerifiedTokenCache(max_size=2, clock=clock)
+
+    cache.put("token-a", {"sub": "a", "exp": clock.now + 10})
+    cache.put("token-b", {"sub": "b", "exp": clock.now + 100})
+    cache.put("no-exp", {"sub": "c"})
+    assert cache.get("token-a")["sub"] == "a"
+
+    # token-b is least recently used and gets evicted
+    cache.put("token-c", {"sub": "c", "exp": clock.now + 100})
+    assert cache.get("token-b") is None
+    assert cache.get("no-exp") is None
+
+    clock.now += 11
+    assert cache.get("token-a") is None
+    assert cache.get("token-c")["sub"] == "c"
+    assert cache.stats() == {"hits": 2, "misses": 3, "size": 1}
+
+
+def test_requires_auth_skips_verification_for_cached_token(protected_app, signing_keys, monkeypatch):
+    token = _token(signing_keys, "key-1")
+
+    first = protected_app.get("/protected", headers={"Authorization": f"Bearer {token}"})
+    monkeypatch.setattr(auth.jwt, "decode", lambda *args, **kwargs: pytest.fail("token verified twice"))
+    second = protected_app.get("/protected", headers={"Authorization": f"Bearer {token}"})
+
+    assert first.status_code == second.status_code == 200
+    assert second.get_json()["sub"] == "auth0|user"
+    assert auth.get_token_cache().stats()["hits"] == 1
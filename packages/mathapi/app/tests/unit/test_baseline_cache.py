@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+import pytest
+from app import baseline_cache
+from app.baseline_cache import get_baseline_ledger
+from app.prediction_cache import MemoryCacheBackend, PredictionCache
+from app.projection_engine import build_baseline_ledger
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = PredictionCache(MemoryCacheBackend(max_size=10), ttl=60)
+    monkeypatch.setattr(baseline_cache, "get_prediction_cache", lambda: cache)
+    return cache
+
+
+def _inputs(version="v1"):
+    categories = [{"name": "Rent", "balance": 0, "target": {
+        "goal_type": "NEED", "goal_target": 950000, "goal_cadence": 1,
+        "goal_cadence_frequency": 1, "goal_day": 1, "goal_overall_left": 950000}}]
+    return {"accounts": [{"balance": 1500000}], "categories": categories, "version": version}
+
+
+def _future_transactions(today):
+    return [{"date_next": (today + timedelta(days=3)).isoformat(), "category_name": "Groceries",
+             "amount": -40000, "account_name": "Checking", "payee_name": "Shop", "memo": None,
+             "frequency": "weekly", "id": "weekly"}]
+
+
+def test_baseline_is_reused_on_the_same_day(cache, monkeypatch):
+    today = date(2026, 1, 30)
+    future_transactions = _future_transactions(today)
+    first = get_baseline_ledger("budget-1", _inputs(), future_transactions, "ft1", 60, today)
+
+    monkeypatch.setattr(baseline_cache, "build_baseline_ledger", pytest.fail)
+    assert get_baseline_ledger("budget-1", _inputs(), future_transactions, "ft1", 60, today) is first
+
+
+def test_baseline_of_an_earlier_day_is_rolled_forward(cache, monkeypatch):
+    today = date(2026, 1, 30)
+    tomorrow = today + timedelta(days=1)
+    future_transactions = _future_transactions(today)
+    get_baseline_ledger("budget-1", _inputs(), future_transactions, "ft1", 60, today)
+
+    rolls = []
+    roll = baseline_cache.roll_baseline_ledger
+    monkeypatch.setattr(baseline_cache, "roll_baseline_ledger", lambda *args: rolls.append(args[-1]) or roll(*args))
+    ledger = get_baseline_ledger("budget-1", _inputs(), future_transactions, "ft1", 60, tomorrow)
+
+    assert rolls == [tomorrow]
+    expected = build_baseline_ledger(_inputs()["accounts"], _inputs()["categories"], future_transactions, 60, tomorrow)
+    assert ledger.to_projection() == expected.to_projection()
+    # The rolled baseline replaces the cached one
+    assert get_baseline_ledger("budget-1", _inputs(), future_transactions, "ft1", 60, tomorrow) is ledger
+
+
+def test_changed_inputs_build_a_new_baseline(cache):
+    today = date(2026, 1, 30)
+    future_transactions = _future_transactions(today)
+    first = get_baseline_ledger("budget-1", _inputs(), future_transactions, "ft1", 60, today)
+
+    assert get_baseline_ledger("budget-1", _inputs("v2"), future_transactions, "ft1", 60, today) is not first
+    assert get_baseline_ledger("budget-1", _inputs(), future_transactions, "ft2", 60, today) is not first
+    assert cache.invalidate_budget("budget-1") == 3
@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+from app.calendar_table import get_calendar_table, CalendarTable
+from app.prediction_api import plan_need_category_spending
+
+
+def test_calendar_table_dates_and_months():
+    table = CalendarTable(date(2027, 1, 20), 45)
+
+    assert table.dates[0] == "2027-01-20"
+    assert table.dates[-1] == "2027-03-06"
+    assert len(table.dates) == 46
+    assert [(month.year, month.month) for month in table.months] == [(2027, 1), (2027, 2), (2027, 3)]
+
+    january, february, march = table.months
+    assert january.start_offset == -19 and january.end_offset == 11
+    assert february.start_offset == 12 and february.days_in_month == 28
+    assert table.dates[february.offset_of_day(28)] == "2027-02-28"
+    assert march.start_offset == 40 and march.end_offset == 70
+
+
+def test_calendar_table_lookups():
+    table = CalendarTable(date(2027, 12, 30), 40)
+
+    assert table.date_for(2) == "2028-01-01"
+    assert table.date_for(-1) == "2027-12-29"
+    assert table.date_for(41) == (date(2027, 12, 30) + timedelta(days=41)).isoformat()
+    assert table.month(2028, 1).start_offset == 2
+    assert table.month(2028, 3) is None
+    assert table.month_containing(1).month == 12
+    assert table.month_containing(2).month == 1
+    assert table.month_containing(40).month == 2
+
+
+def test_calendar_table_is_shared_per_horizon():
+    assert get_calendar_table(date(2027, 1, 1), 300) is get_calendar_table(date(2027, 1, 1), 300)
+    assert get_calendar_table(date(2027, 1, 1), 300) is not get_calendar_table(date(2027, 1, 2), 300)
+
+
+def test_need_spending_covers_every_month_of_the_horizon():
+    # 30 days from January 31st end on March 2nd, a month more than days_ahead // 30 + 1 covers
+    table = get_calendar_table(date(2027, 1, 31), 30)
+    target = {"goal_type": "NEED", "goal_day": 1}
+
+    planned = list(plan_need_category_spending(target, 0, 100, 30, 0, lambda year, month: 0, calendar_table=table))
+
+    assert [table.date_for(offset) for offset, amount, reason in planned] == ["2027-01-01", "2027-02-01", "2027-03-01"]
+    assert planned[0][2] == "Current Month Target"
+    assert planned[-1][2] == "Future Month Target"
@@ -0,0 +1,53 @@
+import json
+from datetime import date
+from app.columnar import from_columnar, to_columnar
+from app.projection_engine import project_scenarios
+
+TODAY = date(2026, 10, 16)
+ACCOUNTS = [{"balance": 1500000}]
+TRANSACTIONS = [
+    {"date_next": f"2026-{month:02d}-20", "amount": -250000, "category_name": "Rent",
+     "account_name": "Checking", "payee_name": "Landlord", "memo": None, "id": f"t{month}"}
+    for month in (10, 11, 12)
+]
+SCENARIOS = {
+    "Actual Balance": None,
+    "raise.json": [{"date": "2026-10-25", "amount": "300", "reason": "Simulation: raise", "category": "Salary"}],
+}
+
+
+def _projections():
+    return project_scenarios(ACCOUNTS, [], TRANSACTIONS, 90, SCENARIOS, today=TODAY)
+
+
+def test_columnar_deduplicates_strings_and_uses_offsets():
+    document = to_columnar(_projections(), TODAY)
+
+    assert document["start_date"] == "2026-10-16"
+    assert document["dictionary"]["categories"] == ["Starting Balance", "Rent", "Salary"]
+    assert document["dictionary"]["payees"] == ["Landlord"]
+    baseline = document["scenarios"]["Actual Balance"]
+    assert baseline["offsets"][:2] == [0, 4]
+    assert baseline["changes"]["category"] == [0, 1, 1, 1]
+    assert baseline["changes"]["count"] == [1, 1, 1, 1]
+    assert baseline["changes"]["payee"] == {"at": [1, 2, 3], "value": [0, 0, 0]}
+    assert baseline["changes"]["memo"] == {"at": [1, 2, 3], "value": [None, None, None]}
+    assert len(document["scenarios"]["raise.json"]["changes"]["simulation"]) == 1
+
+
+def test_columnar_round_trips_to_the_nested_format():
+    projections = _projections()
+
+    expanded = from_columnar(json.loads(json.dumps(to_columnar(projections, TODAY))))
+
+    assert expanded == projections
+    for scenario_name, projection in projections.items():
+        assert list(expanded[scenario_name]) == list(projection)
+    # Null fields such as the memo are kept
+    assert expanded["Actual Balance"]["2026-10-20"]["changes"][0]["memo"] is None
+
+
+def test_columnar_is_smaller_than_nested():
+    projections = _projections()
+
+    assert len(json.dumps(to_columnar(projections, TODAY))) < len(json.dumps(projections))
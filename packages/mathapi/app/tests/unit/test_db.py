@@ -0,0 +1,39 @@
+import pytest
+from app import db
+
+
+@pytest.fixture
+def fresh_client(monkeypatch):
+    monkeypatch.setattr(db, "MONGODB_URI", "mongodb://localhost:27017/budget-ai")
+    db.reset_client()
+    yield
+    db.reset_client()
+
+
+def test_get_client_is_shared(fresh_client):
+    client = db.get_client()
+
+    assert db.get_client() is client
+    assert db.get_DB().client is client
+    assert db.get_default_DB().client is client
+    assert db.get_default_DB().name == "budget-ai"
+
+
+def test_get_client_applies_pool_settings(fresh_client, monkeypatch):
+    monkeypatch.setattr(db, "MONGODB_MAX_POOL_SIZE", 7)
+    monkeypatch.setattr(db, "MONGODB_READ_PREFERENCE", "secondaryPreferred")
+
+    client = db.get_client()
+
+    assert client.options.pool_options.max_pool_size == 7
+    assert client.read_preference.mongos_mode == "secondaryPreferred"
+
+
+def test_get_client_recreated_after_fork(fresh_client, monkeypatch):
+    parent_client = db.get_client()
+
+    monkeypatch.setattr(db.os, "getpid", lambda: -1)
+    child_client = db.get_client()
+
+    assert child_client is not parent_client
+    assert db.get_client() is child_client
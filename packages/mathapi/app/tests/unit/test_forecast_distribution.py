@@ -0,0 +1,99 @@
+import pytest
+from datetime import datetime, timedelta
+from app.forecast_distribution import simulate_balance_distribution
+
+
+@pytest.fixture
+def distribution_inputs():
+    today = datetime(2025, 3, 10).date()
+    accounts = [{"balance": 1000000}]  # €1000
+    categories = [{
+        "name": "Groceries",
+        "balance": 0,
+        "historicalAverage": 40000,  # €40 per transaction
+        "typicalSpendingPattern": 0.5,
+        "target": {
+            "goal_type": "NEED",
+            "goal_target": 400000,  # €400 per month
+            "goal_cadence": 1,
+            "goal_cadence_frequency": 1,
+            "goal_day": None,
+            "goal_overall_left": 0
+        }
+    }]
+    future_transactions = [{
+        "date_next": (today + timedelta(days=5)).isoformat(),
+        "category_name": "Rent",
+        "amount": -700000,  # €700
+        "account_name": "Checking",
+        "payee_name": "Landlord",
+        "memo": None
+    }]
+    return today, accounts, categories, future_transactions
+
+
+def test_distribution_without_uncertainty_is_the_balance():
+    today = datetime(2025, 3, 10).date()
+
+    distribution = simulate_balance_distribution([{"balance": -5000}], [], [], 10, paths=50, today=today)
+
+    assert len(distribution) == 11
+    for day in distribution.values():
+        assert day == {"p5": -5.0, "p50": -5.0, "p95": -5.0, "probability_below_zero": 1.0}
+
+
+def test_distribution_bands_are_ordered(distribution_inputs):
+    today, accounts, categories, future_transactions = distribution_inputs
+
+    distribution = simulate_balance_distribution(
+        accounts, categories, future_transactions, 90, paths=2000, seed=7, today=today
+    )
+
+    assert list(distribution.keys())[0] == today.isoformat()
+    assert list(distribution.keys())[-1] == (today + timedelta(days=90)).isoformat()
+    for day in distribution.values():
+        assert day["p5"] <= day["p50"] <= day["p95"]
+        assert 0.0 <= day["probability_below_zero"] <= 1.0
+
+    # Rent and three months of groceries exceed the starting balance for most paths
+    last_day = distribution[(today + timedelta(days=90)).isoformat()]
+    assert last_day["p50"] == pytest.approx(1000 - 700 - 3 * 400, abs=150)
+    assert last_day["probability_below_zero"] > 0.9
+
+
+def test_distribution_keeps_need_spending_in_its_month(distribution_inputs):
+    today, accounts, categories, future_transactions = distribution_inputs
+
+    distribution = simulate_balance_distribution(
+        accounts, categories, future_transactions, 90, paths=500, seed=1, today=today
+    )
+
+    # March spending is done by the end of March, April spending has not started on April 1st
+    end_of_march = distribution["2025-03-31"]
+    first_of_april = distribution["2025-04-01"]
+    assert end_of_march["p5"] == first_of_april["p5"]
+    assert end_of_march["p95"] == first_of_april["p95"]
+
+
+def test_distribution_is_reproducible_with_seed(distribution_inputs):
+    today, accounts, categories, future_transactions = distribution_inputs
+
+    first = simulate_balance_distribution(accounts, categories, future_transactions, 60, paths=300, seed=3, today=today)
+    second = simulate_balance_distribution(accounts, categories, future_transactions, 60, paths=300, seed=3, today=today)
+
+    assert first == second
+
+
+def test_distribution_rejects_invalid_path_count(distribution_inputs):
+    today, accounts, categories, future_transactions = distribution_inputs
+
+    with pytest.raises(ValueError):
+        simulate_balance_distribution(accounts, categories, future_transactions, 30, paths=0, today=today)
+
+
+@pytest.mark.parametrize("days_ahead, paths", [(0, 100), (-5, 100), (1826, 100), (1825, 20000)])
+def test_distribution_rejects_oversized_requests(distribution_inputs, days_ahead, paths):
+    today, accounts, categories, future_transactions = distribution_inputs
+
+    with pytest.raises(ValueError):
+        simulate_balance_distribution(accounts, categories, future_transactions, days_ahead, paths=paths, today=today)
@@ -0,0 +1,61 @@
+import logging
+import os
+import runpy
+from app import db, ynab_api, prediction_inputs
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "..", "gunicorn.conf.py")
+
+
+class FakeWorker:
+    pid = 4242
+    log = logging.getLogger("gunicorn.test")
+
+
+def test_config_preloads_threaded_workers():
+    config = runpy.run_path(CONFIG_PATH)
+
+    assert config["preload_app"] is True
+    assert config["worker_class"] == "gthread"
+    assert config["workers"] >= 1
+    assert config["max_requests_jitter"] > 0
+
+
+def test_default_workers_follow_the_container_cpu_limit(tmp_path):
+    config = runpy.run_path(CONFIG_PATH)
+    (tmp_path / "cpu.max").write_text("150000 100000\n")
+
+    assert config["cgroup_cpu_limit"](str(tmp_path)) == 1.5
+    assert config["available_cpus"](str(tmp_path)) == min(2, len(os.sched_getaffinity(0)))
+
+
+def test_cgroup_cpu_limit_without_quota(tmp_path):
+    config = runpy.run_path(CONFIG_PATH)
+    assert config["cgroup_cpu_limit"](str(tmp_path)) is None
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert config["cgroup_cpu_limit"](str(tmp_path)) is None
+
+    (tmp_path / "cpu.max").unlink()
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("200000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert config["cgroup_cpu_limit"](str(tmp_path)) == 2.0
+
+
+def test_post_fork_drops_clients_inherited_from_the_master(monkeypatch):
+    monkeypatch.setattr(db, "MONGODB_URI", "mongodb://localhost:27017/budget-ai")
+    master_client = db.get_client()
+    master_session = ynab_api.get_session()
+    master_executor = prediction_inputs.get_input_executor("ynab")
+    config = runpy.run_path(CONFIG_PATH)
+
+    monkeypatch.setattr(os, "getpid", lambda: FakeWorker.pid)
+    config["post_fork"](None, FakeWorker())
+
+    assert db.get_client() is not master_client
+    assert ynab_api.get_session() is not master_session
+    assert prediction_inputs.get_input_executor("ynab") is not master_executor
+    monkeypatch.undo()
+    db.reset_client()
+    ynab_api.reset_session()
+    prediction_inputs.reset_input_executor()
@@ -0,0 +1,109 @@
+import gzip
+import json
+import pytest
+from flask import Flask, Response, jsonify, request
+from app import http_caching
+from app.http_caching import init_compression, not_modified, set_validators
+
+ETAG = "abc123"
+PAYLOAD = {"Actual Balance": {f"2026-10-{day:02d}": {"balance": 1000.0, "changes": []} for day in range(1, 31)}}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    init_compression(app)
+
+    @app.route('/data')
+    def data():
+        unchanged = not_modified(request.if_none_match, ETAG)
+        if unchanged is not None:
+            return unchanged
+        return set_validators(jsonify(PAYLOAD), ETAG)
+
+    @app.route('/small')
+    def small():
+        return jsonify({"status": "healthy"})
+
+    @app.route('/stream')
+    def stream():
+        return Response((json.dumps({"line": i}) + "\n" for i in range(3)), mimetype="application/x-ndjson")
+
+    return app.test_client()
+
+
+def test_large_response_is_gzipped_when_accepted(client):
+    response = client.get('/data', headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert json.loads(gzip.decompress(response.data)) == PAYLOAD
+    assert response.headers["ETag"] == f'"{ETAG}-gzip"'
+
+
+def test_response_is_not_compressed_without_accept_encoding(client):
+    response = client.get('/data')
+
+    assert "Content-Encoding" not in response.headers
+    assert response.json == PAYLOAD
+    assert response.headers["ETag"] == f'"{ETAG}"'
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+
+def test_small_response_is_not_compressed(client):
+    response = client.get('/small', headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.json == {"status": "healthy"}
+
+
+def test_brotli_is_only_chosen_when_installed(client, monkeypatch):
+    monkeypatch.setattr(http_caching, "brotli", None)
+
+    response = client.get('/data', headers={"Accept-Encoding": "br, gzip;q=0.5"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_brotli_is_preferred_when_accepted(client):
+    brotli = pytest.importorskip("brotli")
+
+    response = client.get('/data', headers={"Accept-Encoding": "gzip;q=0.5, br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert json.loads(brotli.decompress(response.data)) == PAYLOAD
+    assert response.headers["ETag"] == f'"{ETAG}-br"'
+
+
+def test_streamed_response_is_brotli_compressed_incrementally(client):
+    brotli = pytest.importorskip("brotli")
+
+    response = client.get('/stream', headers={"Accept-Encoding": "br"})
+
+    assert response.headers["Content-Encoding"] == "br"
+    lines = brotli.decompress(response.data).decode().splitlines()
+    assert [json.loads(line)["line"] for line in lines] == [0, 1, 2]
+
+
+def test_streamed_response_is_compressed_incrementally(client):
+    response = client.get('/stream', headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert [json.loads(line)["line"] for line in lines] == [0, 1, 2]
+
+
+@pytest.mark.parametrize("if_none_match", [f'"{ETAG}"', f'"{ETAG}-gzip"', '*'])
+def test_matching_if_none_match_returns_not_modified(client, if_none_match):
+    response = client.get('/data', headers={"If-None-Match": if_none_match, "Accept-Encoding": "gzip"})
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"].strip('"').startswith(ETAG)
+
+
+def test_stale_if_none_match_returns_the_data(client):
+    response = client.get('/data', headers={"If-None-Match": '"outdated"'})
+
+    assert response.status_code == 200
+    assert response.json == PAYLOAD
@@ -0,0 +1,55 @@
+from app import indexes
+
+
+class FakeCollection:
+    def __init__(self, index_information):
+        self._index_information = index_information
+        self.created = []
+
+    def index_information(self):
+        return self._index_information
+
+    def create_index(self, keys):
+        self.created.append(keys)
+        return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+class FakeDatabase(dict):
+    name = "budget-ai"
+
+
+def _fake_database():
+    id_index = {"_id_": {"key": [("_id", 1)]}}
+    return FakeDatabase(
+        localbudgets=FakeCollection({**id_index, "uuid_1": {"key": [("uuid", 1)], "unique": True}}),
+        localcategories=FakeCollection({**id_index, "budgetId_1_name_1": {"key": [("budgetId", 1), ("name", 1)]}}),
+        localaccounts=FakeCollection(dict(id_index)),
+        users=FakeCollection(dict(id_index)),
+        ynabscheduledtransactions=FakeCollection({**id_index, "budgetId_1": {"key": [("budgetId", 1)]}}),
+        simulations=FakeCollection(dict(id_index)),
+    )
+
+
+def test_ensure_indexes_reports_and_creates_missing(monkeypatch):
+    database = _fake_database()
+    monkeypatch.setattr(indexes, "REQUIRED_INDEXES", [
+        (lambda: database, collection, keys) for _, collection, keys in indexes.REQUIRED_INDEXES
+    ])
+
+    missing = indexes.ensure_indexes()
+
+    assert [collection for _, collection, _ in missing] == ["localaccounts", "users", "simulations"]
+    assert database["localaccounts"].created == [[("budgetId", 1)]]
+    assert database["users"].created == [[("authId", 1)]]
+    assert database["simulations"].created == [[("budgetId", 1), ("isActive", 1)]]
+    assert database["localbudgets"].created == database["localcategories"].created == []
+
+
+def test_check_mode_does_not_create(monkeypatch):
+    database = _fake_database()
+    monkeypatch.setattr(indexes, "REQUIRED_INDEXES", [
+        (lambda: database, collection, keys) for _, collection, keys in indexes.REQUIRED_INDEXES
+    ])
+
+    assert indexes.main(["--check"]) == 1
+    assert database["users"].created == []
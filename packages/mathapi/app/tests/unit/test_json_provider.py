@@ -0,0 +1,51 @@
+import json
+from collections import OrderedDict
+from datetime import date
+import numpy as np
+import pytest
+from flask import Flask
+from app import json_provider
+from app.json_provider import FastJSONProvider, configure_json_provider, encode
+
+PAYLOAD = OrderedDict([
+    ("Actual Balance", OrderedDict([
+        ("2026-10-16", {"balance": 1234.5600000000002, "changes": [{"amount": -0.001, "category": "Café"}],
+                        "balance_diff": np.float64(1.5)}),
+    ])),
+    ("generated", date(2026, 10, 16)),
+])
+
+
+@pytest.fixture
+def fast_app():
+    app = Flask(__name__)
+    configure_json_provider(app)
+    return app
+
+
+def test_fast_provider_matches_default_provider(fast_app):
+    default_app = Flask(__name__)
+    assert isinstance(fast_app.json, FastJSONProvider)
+
+    with fast_app.app_context():
+        fast = fast_app.json.response(PAYLOAD)
+    with default_app.app_context():
+        default = default_app.json.response(PAYLOAD)
+
+    assert fast.mimetype == default.mimetype == "application/json"
+    assert json.loads(fast.get_data()) == json.loads(default.get_data())
+    # Dates keep the HTTP date format of jsonify, keys stay sorted
+    assert json.loads(fast.get_data())["generated"] == "Fri, 16 Oct 2026 00:00:00 GMT"
+    assert list(json.loads(fast.get_data())["Actual Balance"]["2026-10-16"]) == ["balance", "balance_diff", "changes"]
+
+
+def test_fast_provider_round_trips_with_loads(fast_app):
+    with fast_app.app_context():
+        assert fast_app.json.loads(fast_app.json.dumps({"a": [1, 2.5, None]})) == {"a": [1, 2.5, None]}
+
+
+def test_encode_falls_back_to_stdlib(monkeypatch):
+    fast = json.loads(encode(PAYLOAD, sort_keys=True))
+    monkeypatch.setattr(json_provider, "orjson", None)
+
+    assert json.loads(encode(PAYLOAD, sort_keys=True)) == fast
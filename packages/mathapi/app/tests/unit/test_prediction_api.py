@@ -78,6 +78,39 @@ def test_add_future_transactions_to_projection():
     assert "Groceries" in result
     assert base_date.isoformat() in result["Groceries"]
 
+def test_add_future_transactions_builds_scheduled_amount_index():
+    base_date = datetime.now().date()
+    later_date = base_date + timedelta(days=40)
+    daily_projection = {
+        (base_date + timedelta(days=day)).isoformat(): {"balance": 0, "changes": []}
+        for day in range(41)
+    }
+
+    def txn(date, category, amount):
+        return {
+            "date_next": date.isoformat(),
+            "category_name": category,
+            "amount": amount,
+            "account_name": "Checking",
+            "payee_name": "Payee",
+            "memo": None
+        }
+
+    future_transactions = [
+        txn(base_date, "Groceries", -50000),
+        txn(base_date, "Groceries", -25000),
+        txn(later_date, "Groceries", -10000),
+        txn(base_date + timedelta(days=400), "Groceries", -99000),  # Outside the projection
+    ]
+
+    scheduled_amounts = {}
+    add_future_transactions_to_projection(daily_projection, future_transactions, scheduled_amounts)
+
+    assert scheduled_amounts[("Groceries", base_date.year, base_date.month)] == 75000  # milliunits
+    assert scheduled_amounts[("Groceries", later_date.year, later_date.month)] == 10000
+    assert len(scheduled_amounts) == 2
+
+
 def test_add_simulations_to_projection():
     # Setup test data
     base_date = datetime.now().date()
@@ -833,3 +866,39 @@ def test_current_month_salary_prediction_with_balance(base_projection):
     assert len(next_month_changes) == 1, "Should have salary entry for next month 4th"
     assert next_month_changes[0]["amount"] == -7348.21, "Next month salary should use full target amount"
     assert next_month_changes[0]["reason"] == "Future Month Target", "Next month should be marked as Future Month Target"
+
+
+def test_spending_with_scheduled_amount_index(base_projection):
+    """The scheduled amount index gives the same result as scanning the projection."""
+    base_date = datetime.now().date()
+    next_month = (base_date.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+    category = {
+        "name": "Monthly Bills",
+        "target": {
+            "goal_type": "NEED",
+            "goal_target": 100000,  # €100 target
+            "goal_cadence": 1,
+            "goal_cadence_frequency": 1,
+            "goal_day": 1
+        }
+    }
+    scheduled_amounts = {("Monthly Bills", next_month.year, next_month.month): 50000}  # milliunits
+
+    apply_need_category_spending(
+        base_projection,
+        category,
+        category["target"],
+        0,  # current_balance
+        100.0,  # target_amount
+        60,  # days_ahead
+        100.0,  # global_overall_left
+        scheduled_amounts
+    )
+
+    changes = [c for c in base_projection[next_month.isoformat()]["changes"]
+              if c["category"] == "Monthly Bills"]
+
+    assert len(changes) == 1
+    assert changes[0]["reason"] == "Future Month Target"
+    assert changes[0]["amount"] == -50.0  # Remaining amount to reach target
@@ -0,0 +1,108 @@
+import threading
+import pytest
+from app import app as app_module
+from app.prediction_cache import MemoryCacheBackend, PredictionCache, inputs_key, result_key, user_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_backend_expires_and_evicts():
+    clock = FakeClock()
+    backend = MemoryCacheBackend(max_size=2, clock=clock)
+
+    backend.set("a", 1, ttl=10)
+    backend.set("b", 2, ttl=100)
+    assert backend.get("a") == 1
+    # b is least recently used and gets evicted
+    backend.set("c", 3, ttl=100)
+    assert backend.get("b") is None
+
+    clock.now += 11
+    assert backend.get("a") is None
+    assert backend.get("c") == 3
+
+
+def test_get_or_load_caches_until_budget_is_invalidated():
+    cache = PredictionCache(MemoryCacheBackend(max_size=10), ttl=60)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"accounts": []}
+
+    for _ in range(3):
+        assert cache.get_or_load(inputs_key("budget-1"), loader) == {"accounts": []}
+    cache.get_or_load(result_key("budget-1", "projection", 300), loader)
+    cache.get_or_load(result_key("budget-10", "projection", 300), loader)
+    assert len(loads) == 3
+
+    assert cache.invalidate_budget("budget-1") == 2
+    cache.get_or_load(inputs_key("budget-1"), loader)
+    cache.get_or_load(result_key("budget-10", "projection", 300), loader)
+    assert len(loads) == 4
+    assert cache.stats()["hits"] == 3
+
+
+def test_get_or_load_does_not_cache_missing_values_or_errors():
+    cache = PredictionCache(MemoryCacheBackend(max_size=10), ttl=60)
+
+    assert cache.get_or_load(user_key("auth0|unknown"), lambda: None) is None
+    with pytest.raises(RuntimeError):
+        cache.get_or_load(inputs_key("budget-1"), lambda: (_ for _ in ()).throw(RuntimeError("YNAB down")))
+
+    assert cache.backend.size() == 0
+
+
+def test_hits_and_misses_are_counted_across_threads():
+    cache = PredictionCache(MemoryCacheBackend(max_size=10), ttl=60)
+    cache.set("hit", 1)
+
+    def read():
+        for _ in range(1000):
+            cache.get("hit")
+            cache.get("miss")
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.stats()["hits"] == 8000
+    assert cache.stats()["misses"] == 8000
+
+
+@pytest.fixture
+def invalidation_client(monkeypatch):
+    cache = PredictionCache(MemoryCacheBackend(max_size=10), ttl=60)
+    monkeypatch.setattr(app_module, "get_prediction_cache", lambda: cache)
+    monkeypatch.setattr(app_module, "CACHE_INVALIDATION_TOKEN", "sync-secret")
+    cache.get_or_load(inputs_key("budget-1"), lambda: {"accounts": []})
+    cache.get_or_load(inputs_key("budget-2"), lambda: {"accounts": []})
+    cache.get_or_load(user_key("auth0|user"), lambda: {"authId": "auth0|user"})
+    return app_module.app.test_client(), cache
+
+
+def test_invalidation_endpoint_requires_token(invalidation_client):
+    client, cache = invalidation_client
+
+    response = client.post("/cache/invalidate", json={"budget_id": "budget-1"}, headers={"X-Cache-Token": "wrong"})
+
+    assert response.status_code == 401
+    assert cache.backend.size() == 3
+
+
+def test_invalidation_endpoint_drops_budget_and_user_entries(invalidation_client):
+    client, cache = invalidation_client
+    headers = {"X-Cache-Token": "sync-secret"}
+
+    assert client.post("/cache/invalidate", json={"budget_id": "budget-1"}, headers=headers).get_json() == {"invalidated": 1}
+    assert client.post("/cache/invalidate", json={"auth_id": "auth0|user"}, headers=headers).get_json() == {"invalidated": 1}
+    assert client.post("/cache/invalidate", headers=headers).get_json() == {"invalidated": 1}
+    assert cache.backend.size() == 0
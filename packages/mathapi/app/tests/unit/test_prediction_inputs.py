@@ -0,0 +1,178 @@
+import threading
+import time
+import pytest
+from bson import ObjectId
+from app import prediction_inputs
+from app.models import budget_belongs_to_user
+from app.prediction_inputs import load_budget_inputs, load_inputs_concurrently, PredictionInputs, InputLoadError
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return iter(self.documents)
+
+
+class FakeDB:
+    def __init__(self, documents):
+        self.localbudgets = FakeCollection(documents)
+
+
+def test_load_budget_inputs_uses_one_aggregation(monkeypatch):
+    budget_id = ObjectId()
+    user_id = ObjectId()
+    fake_db = FakeDB([{
+        "_id": budget_id,
+        "uuid": "budget-uuid",
+        "users": [user_id],
+        "categories": [{"_id": ObjectId(), "budgetId": budget_id, "name": "Groceries", "balance": 100000}],
+        "accounts": [{"_id": ObjectId(), "budgetId": budget_id, "name": "Checking", "balance": 500000}],
+    }])
+    monkeypatch.setattr(prediction_inputs, "get_DB", lambda: fake_db)
+
+    inputs = load_budget_inputs("budget-uuid")
+
+    assert len(fake_db.localbudgets.pipelines) == 1
+    pipeline = fake_db.localbudgets.pipelines[0]
+    assert pipeline[0] == {"$match": {"uuid": "budget-uuid"}}
+    assert [stage["$lookup"]["from"] for stage in pipeline if "$lookup" in stage] == ["localcategories", "localaccounts"]
+
+    assert inputs["categories"][0]["budgetId"] == str(budget_id)
+    assert inputs["accounts"][0]["balance"] == 500000
+    assert "categories" not in inputs["budget"]
+    assert budget_belongs_to_user(inputs["budget"], {"_id": user_id})
+    assert not budget_belongs_to_user(inputs["budget"], {"_id": ObjectId()})
+
+
+def test_load_budget_inputs_returns_none_for_unknown_budget(monkeypatch):
+    monkeypatch.setattr(prediction_inputs, "get_DB", lambda: FakeDB([]))
+
+    assert load_budget_inputs("missing") is None
+
+
+def test_budget_inputs_version_follows_the_data(monkeypatch):
+    budget_id = ObjectId()
+    document = {
+        "_id": budget_id,
+        "uuid": "budget-uuid",
+        "users": [],
+        "categories": [{"_id": ObjectId(), "budgetId": budget_id, "name": "Groceries", "balance": 100000}],
+        "accounts": [],
+    }
+    monkeypatch.setattr(prediction_inputs, "get_DB", lambda: FakeDB([dict(document)]))
+    version = load_budget_inputs("budget-uuid")["version"]
+    assert load_budget_inputs("budget-uuid")["version"] == version
+
+    document["categories"] = [dict(document["categories"][0], balance=90000)]
+    assert load_budget_inputs("budget-uuid")["version"] != version
+
+
+def test_prediction_inputs_load_mongo_and_ynab_concurrently(monkeypatch):
+    # Each loader waits for the other one, so a sequential load would break the barrier
+    barrier = threading.Barrier(2, timeout=2)
+
+    def budget_inputs(budget_uuid):
+        barrier.wait()
+        return {"budget": {"uuid": budget_uuid}, "categories": [], "accounts": [], "version": "v1"}
+
+    def future_transaction_entry(budget_uuid, deadline):
+        barrier.wait()
+        return {"transactions": [{"id": "txn"}], "version": "v2"}
+
+    monkeypatch.setattr(prediction_inputs, "get_budget_inputs", budget_inputs)
+    monkeypatch.setattr(prediction_inputs, "_get_future_transaction_entry", future_transaction_entry)
+
+    loading = PredictionInputs("budget-uuid")
+
+    assert loading.budget_inputs()["budget"] == {"uuid": "budget-uuid"}
+    assert loading.future_transactions() == [{"id": "txn"}]
+    assert loading.future_transactions_version() == "v2"
+
+
+def test_missing_budget_does_not_wait_for_ynab(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(prediction_inputs, "get_budget_inputs", lambda budget_uuid: None)
+    monkeypatch.setattr(prediction_inputs, "_get_future_transaction_entry", lambda budget_uuid, deadline: release.wait(2))
+
+    started = time.monotonic()
+    assert PredictionInputs("missing").budget_inputs() is None
+    assert time.monotonic() - started < 1
+    release.set()
+
+
+def test_slow_source_times_out(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(prediction_inputs, "get_budget_inputs", lambda budget_uuid: {"categories": []})
+    monkeypatch.setattr(prediction_inputs, "_get_future_transaction_entry", lambda budget_uuid, deadline: release.wait(2))
+
+    loading = PredictionInputs("budget-uuid", ynab_timeout=0.05)
+
+    assert loading.budget_inputs() == {"categories": []}
+    with pytest.raises(InputLoadError) as error:
+        loading.future_transactions()
+    assert error.value.source == "ynab"
+    assert error.value.timed_out
+    release.set()
+
+
+def test_timed_out_ynab_loads_do_not_hold_up_mongo(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(prediction_inputs, "PREDICTION_INPUT_WORKERS", 1)
+    prediction_inputs.reset_input_executor()
+    monkeypatch.setattr(prediction_inputs, "get_budget_inputs", lambda budget_uuid: {"categories": []})
+    monkeypatch.setattr(prediction_inputs, "_get_future_transaction_entry", lambda budget_uuid, deadline: release.wait(2))
+
+    try:
+        # The only YNAB thread is still busy with the first, abandoned request
+        with pytest.raises(InputLoadError):
+            PredictionInputs("budget-uuid", ynab_timeout=0.05).future_transactions()
+        started = time.monotonic()
+        assert PredictionInputs("budget-uuid", mongo_timeout=1).budget_inputs() == {"categories": []}
+        assert time.monotonic() - started < 1
+    finally:
+        release.set()
+        prediction_inputs.reset_input_executor()
+
+
+def test_ynab_fetch_gets_the_deadline_of_the_request(monkeypatch):
+    deadlines = []
+    monkeypatch.setattr(prediction_inputs, "get_budget_inputs", lambda budget_uuid: {"categories": []})
+    monkeypatch.setattr(
+        prediction_inputs, "_get_future_transaction_entry",
+        lambda budget_uuid, deadline: deadlines.append(deadline) or {"transactions": [], "version": "v"}
+    )
+
+    started = time.monotonic()
+    PredictionInputs("budget-uuid", ynab_timeout=5).future_transactions()
+
+    assert started + 5 <= deadlines[0] <= time.monotonic() + 5
+
+
+def test_failing_source_is_reported(monkeypatch):
+    def unreachable(budget_uuid, deadline):
+        raise RuntimeError("Error fetching scheduled transactions: HTTP error occurred")
+
+    monkeypatch.setattr(prediction_inputs, "get_budget_inputs", lambda budget_uuid: {"categories": []})
+    monkeypatch.setattr(prediction_inputs, "_get_future_transaction_entry", unreachable)
+
+    loading = PredictionInputs("budget-uuid")
+
+    assert loading.budget_inputs() == {"categories": []}
+    with pytest.raises(InputLoadError) as error:
+        loading.future_transactions_version()
+    assert error.value.source == "ynab"
+    assert not error.value.timed_out
+    assert "HTTP error occurred" in str(error.value)
+
+
+def test_load_inputs_concurrently_returns_every_source():
+    results = load_inputs_concurrently({
+        "mongo": (lambda: "budget", 1),
+        "ynab": (lambda: ["txn"], 1),
+    })
+
+    assert results == {"mongo": "budget", "ynab": ["txn"]}
@@ -0,0 +1,230 @@
+import pytest
+from datetime import datetime, timedelta
+from app.prediction_api import project_daily_balances_with_reasons
+from app.prediction_cache import MemoryCacheBackend, PredictionCache
+from app.projection_engine import (
+    ProjectionLedger,
+    build_baseline_ledger,
+    project_daily_balances_vectorized,
+    project_scenarios,
+    roll_baseline_ledger,
+)
+
+
+def _scheduled(date, category, amount, txn_id):
+    return {
+        "date_next": date.isoformat(),
+        "category_name": category,
+        "amount": amount,
+        "account_name": "Checking",
+        "payee_name": f"Payee {txn_id}",
+        "memo": None,
+        "id": txn_id
+    }
+
+
+@pytest.fixture
+def prediction_inputs():
+    """Accounts, categories, scheduled transactions and simulations relative to today."""
+    today = datetime.now().date()
+    next_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+    accounts = [{"balance": 1523456}, {"balance": -230110}, {"balance": 77}]
+    future_transactions = [
+        _scheduled(today, "Groceries", -45120, "t1"),
+        _scheduled(today + timedelta(days=3), "Rent", -950000, "t2"),
+        _scheduled(today + timedelta(days=3), "Groceries", -12340, "t3"),
+        _scheduled(next_month, "Rent", -950000, "t4"),
+        _scheduled(next_month + timedelta(days=10), "Salary", 3100000, "t5"),
+        _scheduled(today - timedelta(days=2), "Groceries", -5000, "past"),
+        _scheduled(today + timedelta(days=4000), "Rent", -950000, "beyond"),
+    ]
+    categories = [
+        {"name": "Groceries", "balance": 188350, "target": {
+            "goal_type": "NEED", "goal_target": 600000, "goal_cadence": 1,
+            "goal_cadence_frequency": 1, "goal_day": None, "goal_overall_left": 0}},
+        {"name": "Rent", "balance": 0, "target": {
+            "goal_type": "NEED", "goal_target": 950000, "goal_cadence": 1,
+            "goal_cadence_frequency": 1, "goal_day": 1, "goal_overall_left": 950000}},
+        {"name": "Insurance", "balance": 0, "target": {
+            "goal_type": "NEED", "goal_target": 300000, "goal_cadence": 3,
+            "goal_target_month": (today + timedelta(days=60)).replace(day=1).isoformat(),
+            "goal_day": 15, "goal_overall_left": 300000}},
+        {"name": "Yearly Tax", "balance": 0, "target": {
+            "goal_type": "NEED", "goal_target": 1200000, "goal_cadence": 13,
+            "goal_cadence_frequency": 1,
+            "goal_target_month": (today + timedelta(days=90)).replace(day=1).isoformat(),
+            "goal_day": 20, "goal_overall_left": 1150000}},
+        {"name": "Savings", "balance": 10000, "target": {"goal_type": "MF", "goal_target": 50000}},
+        {"name": "No Target", "balance": 0},
+    ]
+    simulations = [
+        {"date": (today + timedelta(days=3)).isoformat(), "amount": "-100.10", "reason": "Trip", "category": "Fun"},
+        {"date": (today + timedelta(days=45)).isoformat(), "amount": "250"},
+        {"date": (today + timedelta(days=5000)).isoformat(), "amount": "-1"},
+    ]
+    return accounts, categories, future_transactions, simulations
+
+
+@pytest.mark.parametrize("days_ahead", [0, 30, 300, 1800])
+def test_vectorized_projection_matches_reference(prediction_inputs, days_ahead):
+    accounts, categories, future_transactions, simulations = prediction_inputs
+
+    expected = project_daily_balances_with_reasons(accounts, categories, future_transactions, days_ahead)
+    result = project_daily_balances_vectorized(accounts, categories, future_transactions, days_ahead)
+
+    assert list(result.keys()) == list(expected.keys())
+    assert result == expected
+
+
+def test_vectorized_projection_matches_reference_with_simulations(prediction_inputs):
+    accounts, categories, future_transactions, simulations = prediction_inputs
+
+    expected = project_daily_balances_with_reasons(accounts, categories, future_transactions, 300, simulations)
+    result = project_daily_balances_vectorized(accounts, categories, future_transactions, 300, simulations)
+
+    assert result == expected
+    assert any(change.get("is_simulation") for day in result.values() for change in day["changes"])
+
+
+@pytest.mark.parametrize("days_ahead", [30, 400])
+def test_vectorized_projection_matches_reference_with_recurring_transactions(prediction_inputs, days_ahead):
+    accounts, categories, future_transactions, _ = prediction_inputs
+    today = datetime.now().date()
+    future_transactions = future_transactions + [
+        dict(_scheduled(today + timedelta(days=2), "Groceries", -30000, "weekly"), frequency="weekly"),
+        dict(_scheduled(today + timedelta(days=5), "Rent", -950000, "monthly"), frequency="monthly"),
+        dict(_scheduled(today + timedelta(days=1), "Salary", 1500000, "twice"), frequency="twiceAMonth"),
+    ]
+
+    expected = project_daily_balances_with_reasons(accounts, categories, future_transactions, days_ahead)
+    result = project_daily_balances_vectorized(accounts, categories, future_transactions, days_ahead)
+
+    assert result == expected
+    weekly_days = [day for day, entry in result.items() if any(c.get("id") == "weekly" for c in entry["changes"])]
+    assert len(weekly_days) == (days_ahead - 2) // 7 + 1
+
+
+@pytest.mark.parametrize("days_ahead", [30, 400])
+@pytest.mark.parametrize("shift", [1, 3, 20])
+def test_rolled_baseline_matches_fresh_build(prediction_inputs, days_ahead, shift):
+    accounts, categories, future_transactions, _ = prediction_inputs
+    today = datetime.now().date()
+    future_transactions = future_transactions + [
+        dict(_scheduled(today + timedelta(days=2), "Groceries", -30000, "weekly"), frequency="weekly"),
+        dict(_scheduled(today + timedelta(days=5), "Rent", -950000, "monthly"), frequency="monthly"),
+        dict(_scheduled(today + timedelta(days=1), "Salary", 1500000, "twice"), frequency="twiceAMonth"),
+        dict(_scheduled(today + timedelta(days=20), "Fun", -20000, "daily"), frequency="daily"),
+    ]
+    later = today + timedelta(days=shift)
+
+    ledger = build_baseline_ledger(accounts, categories, future_transactions, days_ahead, today)
+    rolled = roll_baseline_ledger(ledger, accounts, categories, future_transactions, later)
+    expected = build_baseline_ledger(accounts, categories, future_transactions, days_ahead, later)
+
+    assert rolled.start_date == later
+    assert rolled.to_projection() == expected.to_projection()
+    assert rolled.need_entries == expected.need_entries
+    # The rolled ledger can be rolled again
+    again = roll_baseline_ledger(rolled, accounts, categories, future_transactions, later + timedelta(days=1))
+    fresh = build_baseline_ledger(accounts, categories, future_transactions, days_ahead, later + timedelta(days=1))
+    assert again.to_projection() == fresh.to_projection()
+
+
+def test_roll_baseline_ledger_outside_horizon_builds_from_scratch(prediction_inputs):
+    accounts, categories, future_transactions, _ = prediction_inputs
+    today = datetime.now().date()
+    ledger = build_baseline_ledger(accounts, categories, future_transactions, 10, today)
+
+    assert roll_baseline_ledger(ledger, accounts, categories, future_transactions, today) is ledger
+    for later in (today + timedelta(days=11), today - timedelta(days=1)):
+        rolled = roll_baseline_ledger(ledger, accounts, categories, future_transactions, later)
+        expected = build_baseline_ledger(accounts, categories, future_transactions, 10, later)
+        assert rolled.to_projection() == expected.to_projection()
+
+
+def test_long_horizon_balances_are_exact_milliunit_sums():
+    today = datetime.now().date()
+    daily_coffee = dict(_scheduled(today, "Coffee", -100, "coffee"), frequency="daily")  # 0.10 per day
+    days_ahead = 5 * 365
+
+    expected = project_daily_balances_with_reasons([{"balance": 0}], [], [daily_coffee], days_ahead)
+    result = project_daily_balances_vectorized([{"balance": 0}], [], [daily_coffee], days_ahead)
+
+    last_day = result[(today + timedelta(days=days_ahead)).isoformat()]
+    # Summing 0.1 as floats 1826 times drifts away from 182.6
+    assert last_day["balance"] == -182.6
+    assert last_day["balance_diff"] == -0.1
+    assert result == expected
+
+
+def test_projection_ledger_balances():
+    start = datetime(2025, 1, 30).date()
+    ledger = ProjectionLedger(start, 5)
+    ledger.add(0, {"reason": "Initial Balance", "amount": 100.0, "category": "Starting Balance"})
+    ledger.add(3, {"reason": "Scheduled Transaction", "amount": -40.0, "category": "Rent"})
+    ledger.add(1, {"reason": "Scheduled Transaction", "amount": -10.0, "category": "Food"})
+    ledger.add(3, {"reason": "Scheduled Transaction", "amount": -5.0, "category": "Food"})
+
+    projection = ledger.to_projection()
+
+    assert list(projection.keys()) == ["2025-01-30", "2025-01-31", "2025-02-02"]
+    assert projection["2025-01-31"]["balance"] == 90.0
+    assert projection["2025-02-02"]["balance_diff"] == -45.0
+    assert projection["2025-02-02"]["balance"] == 45.0
+    assert [c["category"] for c in projection["2025-02-02"]["changes"]] == ["Rent", "Food"]
+
+
+def test_projection_ledger_offsets():
+    ledger = ProjectionLedger(datetime(2025, 1, 30).date(), 5)
+
+    assert ledger.offset_for(datetime(2025, 2, 4).date()) == 5
+    assert ledger.offset_for(datetime(2025, 2, 5).date()) is None
+    assert ledger.offset_for(datetime(2025, 1, 29).date()) is None
+    assert ledger.offset_for_iso("2025-02-01") == 2
+    assert ledger.offset_for_iso("20250201") is None
+    assert ledger.offset_for_iso("not a date") is None
+
+
+def test_project_scenarios_matches_full_projection_per_scenario(prediction_inputs):
+    accounts, categories, future_transactions, simulations = prediction_inputs
+    today = datetime.now().date()
+    scenarios = {
+        "Actual Balance": None,
+        "trip.json": simulations,
+        "first-day.json": [{"date": today.isoformat(), "amount": "-12.5", "reason": "Today"}],
+        "outside.json": [{"date": (today + timedelta(days=9999)).isoformat(), "amount": "5"}],
+    }
+
+    results = project_scenarios(accounts, categories, future_transactions, 300, scenarios)
+
+    assert list(results.keys()) == list(scenarios.keys())
+    for name, simulation in scenarios.items():
+        expected = project_daily_balances_with_reasons(accounts, categories, future_transactions, 300, simulation)
+        assert list(results[name].keys()) == list(expected.keys())
+        assert results[name] == expected
+
+
+def test_project_scenarios_skips_failing_scenario(prediction_inputs):
+    accounts, categories, future_transactions, _ = prediction_inputs
+    scenarios = {
+        "Actual Balance": None,
+        "broken.json": [{"date": datetime.now().date().isoformat(), "amount": "not a number"}],
+    }
+
+    results = project_scenarios(accounts, categories, future_transactions, 30, scenarios)
+
+    assert list(results.keys()) == ["Actual Balance"]
+
+
+def test_failing_baseline_raises_instead_of_caching_an_empty_result(prediction_inputs):
+    accounts, categories, future_transactions, _ = prediction_inputs
+    future_transactions = future_transactions + [dict(future_transactions[0], date_next="not a date")]
+    cache = PredictionCache(MemoryCacheBackend(max_size=10), ttl=60)
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("projection", lambda: project_scenarios(
+            accounts, categories, future_transactions, 30, {"Actual Balance": None}
+        ))
+
+    assert cache.get("projection") is None
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+from app.recurrence import expand_scheduled_transactions
+
+START = date(2026, 1, 10)
+
+
+def _scheduled(date_next, frequency, date_first=None):
+    return {"date_next": date_next, "date_first": date_first or date_next, "frequency": frequency}
+
+
+def _dates(future_transactions, days_ahead, start=START):
+    transaction_indexes, offsets = expand_scheduled_transactions(future_transactions, start, days_ahead)
+    dates = {}
+    for index, offset in zip(transaction_indexes.tolist(), offsets.tolist()):
+        dates.setdefault(index, []).append((start + timedelta(days=offset)).isoformat())
+    return dates
+
+
+def test_day_based_frequencies():
+    dates = _dates([
+        _scheduled("2026-01-12", "weekly"),
+        _scheduled("2026-01-10", "everyOtherWeek"),
+        _scheduled("2026-01-20", "every4Weeks"),
+        _scheduled("2026-01-18", "daily"),
+    ], 20)
+
+    assert dates[0] == ["2026-01-12", "2026-01-19", "2026-01-26"]
+    assert dates[1] == ["2026-01-10", "2026-01-24"]
+    assert dates[2] == ["2026-01-20"]
+    assert dates[3] == ["2026-01-18", "2026-01-19", "2026-01-20", "2026-01-21", "2026-01-22",
+                        "2026-01-23", "2026-01-24", "2026-01-25", "2026-01-26", "2026-01-27",
+                        "2026-01-28", "2026-01-29", "2026-01-30"]
+
+
+def test_month_based_frequencies_keep_the_day_of_date_first():
+    dates = _dates([
+        _scheduled("2026-01-31", "monthly"),
+        _scheduled("2026-02-28", "monthly", date_first="2025-12-31"),
+        _scheduled("2026-01-15", "every3Months"),
+        _scheduled("2026-03-01", "yearly"),
+        _scheduled("2026-02-01", "everyOtherYear"),
+    ], 800)
+
+    assert dates[0][:4] == ["2026-01-31", "2026-02-28", "2026-03-31", "2026-04-30"]
+    assert dates[1][:3] == ["2026-02-28", "2026-03-31", "2026-04-30"]
+    assert dates[2][:3] == ["2026-01-15", "2026-04-15", "2026-07-15"]
+    assert dates[3] == ["2026-03-01", "2027-03-01", "2028-03-01"]
+    assert dates[4] == ["2026-02-01", "2028-02-01"]
+
+
+def test_twice_a_month():
+    dates = _dates([
+        _scheduled("2026-01-15", "twiceAMonth", date_first="2025-12-15"),
+        _scheduled("2026-01-20", "twiceAMonth"),
+    ], 45)
+
+    assert dates[0] == ["2026-01-15", "2026-01-30", "2026-02-15"]
+    assert dates[1] == ["2026-01-20", "2026-02-05", "2026-02-20"]
+
+
+def test_twice_a_month_with_date_next_on_the_other_day():
+    dates = _dates([_scheduled("2026-11-01", "twiceAMonth", date_first="2026-01-16")], 75, start=date(2026, 10, 16))
+
+    assert dates[0] == ["2026-11-01", "2026-11-16", "2026-12-01", "2026-12-16"]
+
+
+def test_past_date_next_only_skips_past_occurrences_of_recurring_transactions():
+    dates = _dates([
+        _scheduled("2026-01-05", "weekly"),
+        _scheduled("2025-12-20", "monthly"),
+        _scheduled("2026-01-05", "never"),
+        {"date_next": "2026-01-11"},
+    ], 20)
+
+    assert dates[0] == ["2026-01-12", "2026-01-19", "2026-01-26"]
+    assert dates[1] == ["2026-01-20"]
+    assert 2 not in dates
+    assert dates[3] == ["2026-01-11"]
+
+
+def test_long_horizon_expands_all_occurrences():
+    future_transactions = [_scheduled(f"2026-01-{day:02d}", "weekly") for day in range(10, 30)]
+
+    transaction_indexes, offsets = expand_scheduled_transactions(future_transactions, START, 5 * 365)
+
+    assert len(offsets) > 20 * 250
+    assert offsets.min() >= 0 and offsets.max() <= 5 * 365
+    assert (transaction_indexes[1:] >= transaction_indexes[:-1]).all()
@@ -0,0 +1,89 @@
+import json
+import os
+from datetime import date
+import pytest
+from app.projection_engine import project_daily_balances_vectorized
+from app.simulation_registry import SimulationRegistry, normalize_simulation, BASELINE_SCENARIO
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _write(path, entries, mtime_ns=None):
+    path.write_text(json.dumps(entries))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_normalize_simulation_converts_amounts_and_dates():
+    normalized = normalize_simulation([{"date": "2026-11-02", "amount": "-150.5"}])
+
+    assert normalized == [{
+        "date": "2026-11-02",
+        "ordinal": date(2026, 11, 2).toordinal(),
+        "amount": -150.5,
+        "reason": "Simulation",
+        "category": "Miscellaneous",
+    }]
+
+
+@pytest.mark.parametrize("entries", [
+    {"date": "2026-11-02", "amount": 1},
+    [{"date": "2026-13-02", "amount": 1}],
+    [{"date": "2026-11-02", "amount": "abc"}],
+    [{"date": "2026-11-02", "amount": "nan"}],
+    [{"amount": 1}],
+])
+def test_normalize_simulation_rejects_invalid_entries(entries):
+    with pytest.raises(ValueError):
+        normalize_simulation(entries)
+
+
+def test_registry_reloads_only_when_files_change(tmp_path):
+    clock = FakeClock()
+    _write(tmp_path / "raise.json", [{"date": "2026-11-02", "amount": "100"}], mtime_ns=10**18)
+    (tmp_path / "broken.json").write_text("{not json")
+    registry = SimulationRegistry(str(tmp_path), reload_interval=5, clock=clock)
+
+    version, scenarios = registry.snapshot()
+    assert list(scenarios) == [BASELINE_SCENARIO, "raise.json"]
+    assert registry.scenarios() is scenarios
+
+    # Changed within the check interval: not noticed yet
+    _write(tmp_path / "raise.json", [{"date": "2026-11-02", "amount": "200"}], mtime_ns=2 * 10**18)
+    assert registry.scenarios() is scenarios
+
+    clock.now += 5
+    new_version, new_scenarios = registry.snapshot()
+    assert new_version != version
+    assert new_scenarios["raise.json"][0]["amount"] == 200.0
+
+    # Nothing changed: the parsed simulations are reused
+    clock.now += 5
+    assert registry.scenarios() is new_scenarios
+
+
+def test_registry_version_is_content_based(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    _write(first / "raise.json", [{"date": "2026-11-02", "amount": "100"}], mtime_ns=10**18)
+    _write(second / "raise.json", [{"date": "2026-11-02", "amount": 100}], mtime_ns=2 * 10**18)
+
+    assert SimulationRegistry(str(first)).version == SimulationRegistry(str(second)).version
+
+
+def test_normalized_simulation_projects_like_raw_simulation():
+    today = date(2026, 10, 16)
+    accounts = [{"balance": 1000000}]
+    raw = [{"date": "2026-10-20", "amount": "-250", "reason": "Simulation: car", "category": "Car"}]
+
+    expected = project_daily_balances_vectorized(accounts, [], [], 30, raw, today=today)
+    actual = project_daily_balances_vectorized(accounts, [], [], 30, normalize_simulation(raw), today=today)
+
+    assert actual == expected
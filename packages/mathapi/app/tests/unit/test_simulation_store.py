@@ -0,0 +1,110 @@
+from datetime import date, datetime
+from bson import ObjectId
+from app import simulation_store
+from app.prediction_cache import MemoryCacheBackend, PredictionCache
+from app.simulation_store import (
+    find_budget_simulations,
+    get_budget_simulations,
+    load_stored_scenarios,
+    parse_simulation_ids,
+    simulation_entries,
+)
+
+TODAY = date(2026, 10, 16)
+CATEGORIES = [{"uuid": "cat-groceries", "name": "Groceries", "target": {"goal_type": "NEED", "goal_target": 400000}}]
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.queries = []
+
+    def find(self, query, projection):
+        self.queries.append(query)
+        return iter(self.documents)
+
+
+def _use_collection(monkeypatch, documents):
+    collection = FakeCollection(documents)
+    monkeypatch.setattr(simulation_store, "get_DB", lambda: {"simulations": collection})
+    return collection
+
+
+def test_parse_simulation_ids_splits_stored_ids_and_file_names():
+    stored_id = ObjectId()
+
+    assert parse_simulation_ids(None) == (None, None)
+    assert parse_simulation_ids(f"{stored_id}, reduced-salary.json,") == ([stored_id], ["reduced-salary.json"])
+
+
+def test_find_budget_simulations_queries_active_or_selected(monkeypatch):
+    collection = _use_collection(monkeypatch, [])
+    budget_id, simulation_id = ObjectId(), ObjectId()
+
+    find_budget_simulations(budget_id)
+    find_budget_simulations(str(budget_id), [simulation_id])
+    assert find_budget_simulations(budget_id, []) == []
+
+    assert collection.queries == [
+        {"budgetId": budget_id, "isActive": True},
+        {"budgetId": budget_id, "_id": {"$in": [simulation_id]}},
+    ]
+
+
+def test_simulation_entries_apply_the_monthly_difference_within_the_horizon():
+    simulation = {"name": "Cheaper groceries", "categoryChanges": [{
+        "categoryUuid": "cat-groceries",
+        "startDate": datetime(2026, 9, 1),
+        "endDate": datetime(2027, 6, 30),
+        "targetAmount": 300,
+    }, {"categoryUuid": "unknown", "targetAmount": 10}]}
+
+    entries = simulation_entries(simulation, CATEGORIES, TODAY, 60)
+
+    assert [(entry["date"], entry["amount"]) for entry in entries] == [
+        ("2026-10-16", 100.0), ("2026-11-01", 100.0), ("2026-12-01", 100.0)
+    ]
+    assert entries[0]["reason"] == "Simulation: Cheaper groceries"
+    assert entries[0]["category"] == "Groceries"
+
+
+def test_budget_simulations_are_cached_until_the_budget_is_invalidated(monkeypatch):
+    cache = PredictionCache(MemoryCacheBackend(max_size=10), ttl=60)
+    monkeypatch.setattr(simulation_store, "get_prediction_cache", lambda: cache)
+    collection = _use_collection(monkeypatch, [{"_id": ObjectId(), "name": "Raise", "categoryChanges": []}])
+    budget_id = ObjectId()
+
+    first = get_budget_simulations("budget-uuid", budget_id)
+    assert get_budget_simulations("budget-uuid", budget_id) == first
+    assert len(collection.queries) == 1
+
+    selected = get_budget_simulations("budget-uuid", budget_id, [ObjectId()])
+    assert len(collection.queries) == 2
+    assert selected["version"] == first["version"]
+
+    collection.documents = []
+    cache.invalidate_budget("budget-uuid")
+    assert get_budget_simulations("budget-uuid", budget_id)["version"] != first["version"]
+
+
+def test_load_stored_scenarios_keeps_names_unique():
+    documents = [
+        {"_id": ObjectId(), "name": "Raise", "categoryChanges": []},
+        {"_id": ObjectId(), "name": "Raise", "categoryChanges": []},
+    ]
+
+    scenarios = load_stored_scenarios(documents, CATEGORIES, 30, today=TODAY)
+
+    assert list(scenarios) == ["Raise", f"Raise ({documents[1]['_id']})"]
+
+
+def test_load_stored_scenarios_treats_a_null_target_amount_as_zero():
+    documents = [{"_id": ObjectId(), "name": "No groceries", "categoryChanges": [
+        {"categoryUuid": "cat-groceries", "targetAmount": None},
+    ]}]
+
+    scenarios = load_stored_scenarios(documents, CATEGORIES, 20, today=TODAY)
+
+    assert [(entry["date"], entry["amount"]) for entry in scenarios["No groceries"]] == [
+        ("2026-10-16", 400.0), ("2026-11-01", 400.0)
+    ]
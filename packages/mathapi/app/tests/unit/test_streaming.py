@@ -0,0 +1,44 @@
+import json
+from datetime import date
+from app.projection_engine import iter_scenarios, project_scenarios
+from app.streaming import iter_json_object, iter_ndjson, stream_projections
+
+TODAY = date(2026, 10, 16)
+ACCOUNTS = [{"balance": 1500000}]
+TRANSACTIONS = [{
+    "date_next": "2026-10-20", "amount": -250000, "category_name": "Rent",
+    "account_name": "Checking", "payee_name": "Landlord", "memo": None, "id": "t1"
+}]
+SCENARIOS = {
+    "Actual Balance": None,
+    "raise.json": [{"date": "2026-10-25", "amount": "300", "reason": "Simulation: raise", "category": "Salary"}],
+}
+
+
+def _projections():
+    return iter_scenarios(ACCOUNTS, [], TRANSACTIONS, 30, SCENARIOS, today=TODAY)
+
+
+def test_streamed_json_matches_the_full_document():
+    expected = project_scenarios(ACCOUNTS, [], TRANSACTIONS, 30, SCENARIOS, today=TODAY)
+
+    chunks = list(iter_json_object(_projections(), chunk_size=64))
+
+    assert len(chunks) > 2
+    assert json.loads("".join(chunks)) == json.loads(json.dumps(expected))
+
+
+def test_streamed_json_of_no_projections_is_an_empty_object():
+    assert "".join(iter_json_object(iter([]))) == "{}"
+
+
+def test_ndjson_has_one_line_per_scenario():
+    lines = "".join(iter_ndjson(_projections())).splitlines()
+
+    assert [json.loads(line)["scenario"] for line in lines] == ["Actual Balance", "raise.json"]
+    assert json.loads(lines[1])["projection"]["2026-10-25"]["changes"][0]["is_simulation"] is True
+
+
+def test_stream_projections_sets_the_content_type():
+    assert stream_projections(iter([]), "ndjson").mimetype == "application/x-ndjson"
+    assert stream_projections(iter([]), "json").mimetype == "application/json"
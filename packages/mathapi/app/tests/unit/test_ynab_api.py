@@ -0,0 +1,218 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app import ynab_api
+from app.scheduled_transaction_store import MemoryScheduledTransactionStore
+from app.ynab_api import CircuitBreaker, fetch, get_scheduled_transactions
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def ynab_server(monkeypatch):
+    """Local YNAB stub replying with the queued (status, headers, body) responses, 200 once empty."""
+    state = {"responses": [], "requests": [], "client_ports": set()}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            if length:
+                self.rfile.read(length)
+            state["requests"].append((self.command, self.path))
+            state["client_ports"].add(self.client_address[1])
+            status, headers, body = state["responses"].pop(0) if state["responses"] else (200, {}, {"data": {}})
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = _reply
+        do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    sleeps = []
+    monkeypatch.setattr(ynab_api, "YNAB_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1/")
+    monkeypatch.setattr(ynab_api, "YNAB_BACKOFF_FACTOR", 0.01)
+    monkeypatch.setattr(ynab_api.time, "sleep", sleeps.append)
+    monkeypatch.setattr(ynab_api, "circuit_breaker", CircuitBreaker(failure_threshold=2, reset_timeout=30))
+    ynab_api.reset_session()
+    store = MemoryScheduledTransactionStore()
+    monkeypatch.setattr(ynab_api, "get_scheduled_transaction_store", lambda: store)
+    state["sleeps"] = sleeps
+    yield state
+    ynab_api.reset_session()
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_reuses_pooled_connection(ynab_server):
+    for _ in range(3):
+        assert fetch("GET", "budgets") == {"data": {}}
+
+    assert len(ynab_server["requests"]) == 3
+    assert len(ynab_server["client_ports"]) == 1
+
+
+def test_fetch_honors_retry_after_on_rate_limit(ynab_server):
+    ynab_server["responses"] = [
+        (429, {"Retry-After": "2"}, {"error": {"id": "429"}}),
+        (200, {}, {"data": {"ok": True}}),
+    ]
+
+    assert fetch("GET", "budgets") == {"data": {"ok": True}}
+    assert ynab_server["sleeps"] == [2.0]
+
+
+def test_fetch_does_not_wait_for_long_retry_after(ynab_server):
+    ynab_server["responses"] = [(429, {"Retry-After": "3600"}, {"error": {"id": "429"}})]
+
+    result = fetch("GET", "budgets")
+
+    assert "error" in result
+    assert ynab_server["sleeps"] == []
+    assert len(ynab_server["requests"]) == 1
+
+
+def test_fetch_does_not_retry_past_its_deadline(ynab_server):
+    ynab_server["responses"] = [(429, {"Retry-After": "5"}, {"error": {"id": "429"}})]
+
+    result = fetch("GET", "budgets", deadline=time.monotonic() + 2)
+
+    assert "error" in result
+    assert ynab_server["sleeps"] == []
+    assert len(ynab_server["requests"]) == 1
+
+
+def test_fetch_after_its_deadline_is_not_sent(ynab_server):
+    assert "error" in fetch("GET", "budgets", deadline=time.monotonic() - 1)
+    assert ynab_server["requests"] == []
+
+
+def test_fetch_retries_server_errors_only_for_idempotent_methods(ynab_server):
+    ynab_server["responses"] = [(503, {}, {}), (503, {}, {}), (200, {}, {"data": {}})]
+    assert fetch("GET", "budgets") == {"data": {}}
+    assert ynab_server["sleeps"] == [0.01, 0.02]
+
+    ynab_server["responses"] = [(503, {}, {})]
+    assert "error" in fetch("POST", "budgets", body={})
+    assert len(ynab_server["requests"]) == 4
+
+
+def test_fetch_client_errors_are_not_retried(ynab_server):
+    ynab_server["responses"] = [(404, {}, {"error": {"id": "404"}})]
+
+    assert "error" in fetch("GET", "budgets/unknown")
+    assert len(ynab_server["requests"]) == 1
+    assert ynab_api.circuit_breaker.state == "closed"
+
+
+def test_circuit_opens_and_fails_fast(ynab_server):
+    ynab_server["responses"] = [(500, {}, {})] * 6
+
+    fetch("GET", "budgets")
+    fetch("GET", "budgets")
+    requests_before = len(ynab_server["requests"])
+
+    assert ynab_api.circuit_breaker.state == "open"
+    assert fetch("GET", "budgets") == {"error": "YNAB API temporarily unavailable"}
+    assert len(ynab_server["requests"]) == requests_before
+
+
+def test_circuit_breaker_half_open_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    clock.now += 30
+    assert breaker.allow_request()
+    # Only one trial request at a time
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+
+def _scheduled(txn_id, amount, **fields):
+    return {"id": txn_id, "date_next": "2026-11-01", "amount": amount, "category_name": "Rent",
+            "account_name": "Checking", "payee_name": "Landlord", "memo": None, "deleted": False, **fields}
+
+
+def test_scheduled_transactions_are_synced_with_deltas(ynab_server):
+    ynab_server["responses"] = [
+        (200, {}, {"data": {"server_knowledge": 10, "scheduled_transactions": [
+            _scheduled("a", -1000), _scheduled("b", -2000), _scheduled("c", -3000)
+        ]}}),
+        (200, {}, {"data": {"server_knowledge": 12, "scheduled_transactions": [
+            _scheduled("b", -2500), _scheduled("c", -3000, deleted=True), _scheduled("d", -4000)
+        ]}}),
+        (200, {}, {"data": {"server_knowledge": 12, "scheduled_transactions": []}}),
+    ]
+
+    first = get_scheduled_transactions("budget-uuid")
+    second = get_scheduled_transactions("budget-uuid")
+    third = get_scheduled_transactions("budget-uuid")
+
+    assert [txn["id"] for txn in first] == ["a", "b", "c"]
+    assert [(txn["id"], txn["amount"]) for txn in second] == [("a", -1000), ("b", -2500), ("d", -4000)]
+    assert third == second
+    assert [path for _, path in ynab_server["requests"]] == [
+        "/v1/budgets/budget-uuid/scheduled_transactions",
+        "/v1/budgets/budget-uuid/scheduled_transactions?last_knowledge_of_server=10",
+        "/v1/budgets/budget-uuid/scheduled_transactions?last_knowledge_of_server=12",
+    ]
+
+
+def test_empty_delta_only_advances_the_server_knowledge(ynab_server, monkeypatch):
+    ynab_server["responses"] = [
+        (200, {}, {"data": {"server_knowledge": 10, "scheduled_transactions": [_scheduled("a", -1000)]}}),
+        (200, {}, {"data": {"server_knowledge": 11, "scheduled_transactions": []}}),
+        (200, {}, {"data": {"server_knowledge": 11, "scheduled_transactions": []}}),
+    ]
+    get_scheduled_transactions("budget-uuid")
+    store = ynab_api.get_scheduled_transaction_store()
+    monkeypatch.setattr(store, "put", pytest.fail)
+
+    assert [txn["id"] for txn in get_scheduled_transactions("budget-uuid")] == ["a"]
+    assert [txn["id"] for txn in get_scheduled_transactions("budget-uuid")] == ["a"]
+    assert store.get("budget-uuid")[0] == 11
+    assert ynab_server["requests"][-1][1].endswith("last_knowledge_of_server=11")
+
+
+def test_stored_scheduled_transactions_are_served_when_ynab_fails(ynab_server):
+    ynab_server["responses"] = [
+        (200, {}, {"data": {"server_knowledge": 10, "scheduled_transactions": [_scheduled("a", -1000)]}}),
+        (401, {}, {"error": {"id": "401"}}),
+        (401, {}, {"error": {"id": "401"}}),
+    ]
+
+    get_scheduled_transactions("budget-uuid")
+
+    assert [txn["id"] for txn in get_scheduled_transactions("budget-uuid")] == ["a"]
+    assert "error" in get_scheduled_transactions("other-budget")
@@ -1,17 +1,217 @@
 import os
+import threading
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from collections import OrderedDict
 import requests
+from requests.adapters import HTTPAdapter
 
 from dotenv import load_dotenv
+from app.scheduled_transaction_store import get_scheduled_transaction_store, apply_scheduled_transaction_delta
 
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Fetch the YNAB access token and base URL
 YNAB_ACCESS_TOKEN = os.getenv("YNAB_ACCESS_TOKEN")
 YNAB_BASE_URL = os.getenv("YNAB_BASE_URL")
 
-def fetch(method, path, body=None):
-    """Performs an HTTP request to the YNAB API with the specified method and path."""
+# HTTP client configuration
+YNAB_POOL_SIZE = int(os.getenv("YNAB_POOL_SIZE", 10))
+YNAB_CONNECT_TIMEOUT = float(os.getenv("YNAB_CONNECT_TIMEOUT", 3.05))
+YNAB_READ_TIMEOUT = float(os.getenv("YNAB_READ_TIMEOUT", 15))
+YNAB_MAX_RETRIES = int(os.getenv("YNAB_MAX_RETRIES", 2))
+YNAB_BACKOFF_FACTOR = float(os.getenv("YNAB_BACKOFF_FACTOR", 0.5))
+# Seconds a request may take in total, retries and their delays included (keep it below YNAB_INPUT_TIMEOUT)
+YNAB_TOTAL_TIMEOUT = float(os.getenv("YNAB_TOTAL_TIMEOUT", 15))
+# A Retry-After longer than this (seconds) is not waited for, the request fails instead
+YNAB_MAX_RETRY_AFTER = float(os.getenv("YNAB_MAX_RETRY_AFTER", 10))
+# Consecutive failures that open the circuit, and seconds before a trial request
+YNAB_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("YNAB_CIRCUIT_FAILURE_THRESHOLD", 5))
+YNAB_CIRCUIT_RESET_TIMEOUT = float(os.getenv("YNAB_CIRCUIT_RESET_TIMEOUT", 30))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Methods that are safe to resend after a server error or a dropped connection
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+class CircuitBreaker:
+    """
+    Fail fast while an upstream service is degraded.
+
+    - closed: requests pass, consecutive failures are counted
+    - open: after `failure_threshold` consecutive failures requests are rejected
+      for `reset_timeout` seconds
+    - half-open: then a single trial request is let through; its success closes
+      the circuit, its failure opens it again
+    """
+
+    def __init__(self, failure_threshold=YNAB_CIRCUIT_FAILURE_THRESHOLD, reset_timeout=YNAB_CIRCUIT_RESET_TIMEOUT,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self):
+        """Return whether a request may be sent now."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial_running:
+                    logger.warning(f"YNAB circuit opened after {self._failures} consecutive failures")
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+circuit_breaker = CircuitBreaker()
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the pooled HTTP session for the YNAB API.
+
+    Connections are kept alive and reused across requests. The session is
+    recreated when the process id changes so forked workers get their own
+    connections.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=YNAB_POOL_SIZE, pool_maxsize=YNAB_POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+            _session_pid = pid
+        return _session
+
+
+def reset_session():
+    """Close the pooled session; the next request creates a new one."""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
+
+
+def _retry_after_seconds(response):
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _request_with_retries(method, url, headers, body, deadline=None):
+    """
+    Send a request, retrying rate limits, server errors and dropped connections.
+
+    429 responses are retried for every method since the request was not
+    processed; server errors and connection errors only for idempotent methods.
+    The delay is the Retry-After header when present, exponential backoff otherwise.
+    All attempts and delays end by the deadline (a time.monotonic() value,
+    defaults to YNAB_TOTAL_TIMEOUT seconds from now): attempts get at most the
+    remaining time as timeouts and no retry is started that would end after it.
+    """
+    if deadline is None:
+        deadline = time.monotonic() + YNAB_TOTAL_TIMEOUT
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    for attempt in range(YNAB_MAX_RETRIES + 1):
+        last_attempt = attempt == YNAB_MAX_RETRIES
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise requests.exceptions.Timeout(f"YNAB request to {url} ran out of time")
+        try:
+            response = get_session().request(
+                method, url, headers=headers, json=body,
+                timeout=(min(YNAB_CONNECT_TIMEOUT, remaining), min(YNAB_READ_TIMEOUT, remaining))
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as err:
+            delay = YNAB_BACKOFF_FACTOR * (2 ** attempt)
+            if last_attempt or not idempotent or time.monotonic() + delay >= deadline:
+                raise
+            logger.warning(f"YNAB request to {url} failed ({err}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+            continue
+
+        retryable = response.status_code == 429 or (idempotent and response.status_code in RETRY_STATUSES)
+        if last_attempt or not retryable:
+            return response
+
+        delay = _retry_after_seconds(response)
+        if delay is None:
+            delay = YNAB_BACKOFF_FACTOR * (2 ** attempt)
+        elif delay > YNAB_MAX_RETRY_AFTER:
+            logger.warning(f"YNAB asked to retry after {delay:.0f}s, not waiting")
+            return response
+        if time.monotonic() + delay >= deadline:
+            logger.warning(f"YNAB responded {response.status_code} for {url}, no time left to retry")
+            return response
+        logger.warning(f"YNAB responded {response.status_code} for {url}, retrying in {delay:.2f}s")
+        time.sleep(delay)
+    return response
+
+
+def fetch(method, path, body=None, deadline=None):
+    """
+    Performs an HTTP request to the YNAB API with the specified method and path.
+
+    deadline is the time.monotonic() value by which the request and its
+    retries have to be done (defaults to YNAB_TOTAL_TIMEOUT seconds from now).
+    """
 
     # Define the full URL by combining the base URL and path
     url = f"{YNAB_BASE_URL}{path}"
@@ -19,38 +219,75 @@ def fetch(method, path, body=None):
         "Authorization": f"Bearer {YNAB_ACCESS_TOKEN}"
     }
 
+    if not circuit_breaker.allow_request():
+        logger.warning(f"YNAB circuit open, not fetching {url}")
+        return {"error": "YNAB API temporarily unavailable"}
+
     try:
         # Send the request using the specified HTTP method
-        print(f"Fetching data from {url} using method: {method}")
-        response = requests.request(method, url, headers=headers, json=body)
+        logger.info(f"Fetching data from {url} using method: {method}")
+        response = _request_with_retries(method, url, headers, body, deadline)
+        # Rate limits and server errors count as degradation, other client errors do not
+        if response.status_code in RETRY_STATUSES:
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.record_success()
         response.raise_for_status()  # Raise an HTTPError for bad responses
 
         # Return the parsed JSON response
         return response.json()
 
     except requests.exceptions.HTTPError as http_err:
-        print(f"HTTP error occurred: {http_err}")
+        logger.error(f"HTTP error occurred: {http_err}")
         return {"error": f"HTTP error occurred: {http_err}"}
     except Exception as err:
-        print(f"An error occurred: {err}")
+        circuit_breaker.record_failure()
+        logger.error(f"An error occurred: {err}")
         return {"error": "An unexpected error occurred"}
 
-def get_scheduled_transactions(budget_id):
-    """Fetches scheduled transactions for a given budget ID from the YNAB API."""
+def get_scheduled_transactions(budget_id, deadline=None):
+    """
+    Fetches scheduled transactions for a given budget ID from the YNAB API.
+
+    The transactions are kept in the scheduled transaction store. Once a budget
+    has been synced only the changes since the stored server_knowledge are
+    requested and merged in. When YNAB cannot be reached (or not before the
+    deadline, see fetch) the stored transactions are served.
+    """
 
     if not budget_id:
         raise ValueError("A budget ID is required")
 
+    store = get_scheduled_transaction_store()
+    server_knowledge, transactions = store.get(budget_id)
+
     # Define the path for scheduled transactions and use the fetch function
     path = f"budgets/{budget_id}/scheduled_transactions"
-    result = fetch("GET", path)
+    if server_knowledge is not None:
+        path += f"?last_knowledge_of_server={server_knowledge}"
+    result = fetch("GET", path, deadline=deadline)
 
-    # Extract only the scheduled transactions data if no error occurred
-    if "error" not in result:
-        return result.get("data", {}).get("scheduled_transactions", [])
-    else:
+    if "error" in result:
+        if server_knowledge is not None:
+            logger.warning(f"Serving stored scheduled transactions of budget {budget_id}: {result['error']}")
+            return list(transactions.values())
         return result
 
+    data = result.get("data", {})
+    delta = data.get("scheduled_transactions", [])
+    new_knowledge = data.get("server_knowledge")
+    if server_knowledge is not None and not delta:
+        # Nothing changed: only record the newer knowledge instead of rewriting the stored transactions
+        if new_knowledge is not None and new_knowledge != server_knowledge:
+            store.advance_server_knowledge(budget_id, server_knowledge, new_knowledge)
+        return list(transactions.values())
+
+    # A full fetch replaces whatever was stored
+    transactions = apply_scheduled_transaction_delta(transactions if server_knowledge is not None else OrderedDict(), delta)
+    if new_knowledge is not None:
+        store.put(budget_id, new_knowledge, transactions)
+    return list(transactions.values())
+
 def get_uncategorized_transactions(budget_id):
     """Fetch uncategorized transactions for a given budget ID."""
     if not budget_id:
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark the JSON providers on a 1,000-day, 10-scenario prediction response.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_json_provider.py
+"""
+from datetime import date
+import timeit
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.json_provider import FastJSONProvider, orjson
+from app.projection_engine import project_scenarios
+
+TODAY = date(2026, 10, 16)
+DAYS_AHEAD = 1000
+SCENARIOS = 10
+REPEAT = 5
+
+
+def build_payload():
+    accounts = [{"balance": 5000000}]
+    future_transactions = [
+        {"date_next": date.fromordinal(TODAY.toordinal() + offset).isoformat(), "amount": -12340 * (offset % 7 + 1),
+         "category_name": f"Category {offset % 25}", "account_name": "Checking", "payee_name": f"Payee {offset % 40}",
+         "memo": None, "id": f"txn-{offset}"}
+        for offset in range(0, DAYS_AHEAD, 2)
+    ]
+    categories = [
+        {"name": f"Need {index}", "balance": 25000, "target": {
+            "goal_type": "NEED", "goal_target": 150000 + index * 1000, "goal_cadence": 1, "goal_cadence_frequency": 1
+        }}
+        for index in range(30)
+    ]
+    scenarios = {"Actual Balance": None}
+    for index in range(1, SCENARIOS):
+        scenarios[f"scenario-{index}.json"] = [
+            {"date": date.fromordinal(TODAY.toordinal() + offset).isoformat(), "amount": str(-50 * index),
+             "reason": f"Simulation {index}", "category": "Salary"}
+            for offset in range(index, DAYS_AHEAD, 30)
+        ]
+    return project_scenarios(accounts, categories, future_transactions, DAYS_AHEAD, scenarios, today=TODAY)
+
+
+def time_provider(provider_class, payload):
+    app = Flask(__name__)
+    app.json_provider_class = provider_class
+    app.json = provider_class(app)
+    with app.app_context():
+        body = app.json.response(payload).get_data()
+        seconds = min(timeit.repeat(lambda: app.json.response(payload).get_data(), number=1, repeat=REPEAT))
+    return seconds, len(body)
+
+
+def main():
+    payload = build_payload()
+    default_seconds, default_size = time_provider(DefaultJSONProvider, payload)
+    print(f"default provider: {default_seconds * 1000:8.1f} ms  {default_size / 1024:8.0f} KB")
+    if orjson is None:
+        print("orjson is not installed, the fast provider falls back to the stdlib")
+        return
+    fast_seconds, fast_size = time_provider(FastJSONProvider, payload)
+    print(f"fast provider:    {fast_seconds * 1000:8.1f} ms  {fast_size / 1024:8.0f} KB")
+    print(f"speedup:          {default_seconds / fast_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
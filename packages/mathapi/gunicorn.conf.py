@@ -0,0 +1,100 @@
+"""
+Gunicorn configuration for the math API.
+
+Concurrency model:
+- The projection is CPU-bound (numpy plus Python loops holding the GIL), so
+  it scales with worker processes: one per CPU the container may use (its
+  CPU affinity and cgroup CPU limit, not the host's core count), at most
+  DEFAULT_MAX_WORKERS unless GUNICORN_WORKERS says otherwise.
+- Fetching inputs (MongoDB, YNAB) is I/O-bound, so every worker runs a few
+  threads that overlap those waits.
+
+The app is preloaded in the master and forked into the workers. The MongoDB
+client, the YNAB session and the input thread pool are never shared over a
+fork: post_fork drops the copies inherited from the master so each worker
+opens its own connections and threads.
+
+Every worker has its own caches. With more than one worker set
+PREDICTION_CACHE_BACKEND=redis, otherwise /cache/invalidate only reaches
+the worker that receives it.
+
+Start with: gunicorn --config gunicorn.conf.py app.app:app
+"""
+import math
+import multiprocessing
+import os
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Every worker holds its own caches and MongoDB pool, so the default stays small
+DEFAULT_MAX_WORKERS = 4
+
+
+def cgroup_cpu_limit(root="/sys/fs/cgroup"):
+    """CPU limit of the container from its cgroup (v2 or v1) CPU quota, or None when it is not limited."""
+    try:
+        with open(os.path.join(root, "cpu.max")) as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us")) as f:
+            quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us")) as f:
+            period = int(f.read())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus(root="/sys/fs/cgroup"):
+    """CPUs this process may run on, limited by the container's CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = multiprocessing.cpu_count()
+    limit = cgroup_cpu_limit(root)
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return cpus
+
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('GUNICORN_WORKERS') or min(available_cpus(), DEFAULT_MAX_WORKERS))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = "gthread"
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+# Recycle workers now and then; the jitter keeps them from restarting all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Long horizons with many scenarios can take a while, give them time to finish
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    if workers > 1 and os.getenv('PREDICTION_CACHE_BACKEND', 'memory') == 'memory':
+        server.log.warning(
+            f"{workers} workers with PREDICTION_CACHE_BACKEND=memory: every worker caches on its own and "
+            "/cache/invalidate only reaches one of them, use redis"
+        )
+
+
+def post_fork(server, worker):
+    """Give the new worker its own MongoDB client, YNAB session and input thread pool."""
+    from app import db, ynab_api, prediction_inputs
+
+    db.reset_client()
+    ynab_api.reset_session()
+    prediction_inputs.reset_input_executor()
+    worker.log.info(f"Worker {worker.pid} reset MongoDB client, YNAB session and input thread pool")